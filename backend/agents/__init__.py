@@ -2,5 +2,13 @@ from .researcher import ResearcherAgent
 from .critique import CritiqueAgent
 # Import both IdeaForge and ForgeUpdate from .forge
 from .forge import IdeaForge, ForgeUpdate
+from .sessions import SessionRegistry, QueueFullError
 
-__all__ = ["ResearcherAgent", "CritiqueAgent", "IdeaForge", "ForgeUpdate"]
+__all__ = [
+    "ResearcherAgent",
+    "CritiqueAgent",
+    "IdeaForge",
+    "ForgeUpdate",
+    "SessionRegistry",
+    "QueueFullError",
+]
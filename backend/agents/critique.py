@@ -1,7 +1,22 @@
 """Critique Agent - Stage 2 of the idea validation pipeline."""
+import asyncio
 import json
-from agno.agent import Agent
-from config import get_model_config
+import os
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from config import get_fallback_models, get_role_models
+from tools.cache import TTLCache
+from .llm import TokenCallback
+from .parsing import parse_or_repair
+from .routing import ModelRouter
+
+# Critique cache: scores are threshold-independent, so they are reused across thresholds
+CRITIQUE_CACHE_ENABLED = os.getenv("CRITIQUE_CACHE_ENABLED", "true").lower() == "true"
+CRITIQUE_CACHE_SIZE = int(os.getenv("CRITIQUE_CACHE_SIZE", "1024"))
+CRITIQUE_CACHE_TTL = float(os.getenv("CRITIQUE_CACHE_TTL", "86400"))
+CRITIQUE_CACHE_PATH = os.getenv("CRITIQUE_CACHE_PATH", "")
+# Ideas scored per model call by evaluate_ideas; 1 disables batching
+CRITIQUE_BATCH_SIZE = int(os.getenv("CRITIQUE_BATCH_SIZE", "4"))
 
 
 CRITIQUE_SYSTEM_PROMPT = """You are a harsh but fair hackathon judge and idea critic. Your job is to evaluate hackathon ideas with strict criteria.
@@ -49,37 +64,73 @@ CRITIQUE_PROMPT = """Evaluate this hackathon idea with your strict criteria.
 
 Track/Domain: {track}
 Problem Statement: {problem_statement}
-Threshold Required: {threshold}% (score of {threshold_score}/10 needed to pass)
 
 IDEA TO EVALUATE:
 {idea}
 
-Be harsh but constructive. This idea needs to score at least {threshold_score}/10 overall to pass.
-If it doesn't meet the threshold, provide specific feedback on how to improve it.
+Be harsh but constructive. Score the idea on its merits, then provide
+specific feedback on how to improve it.
 
 Respond with your evaluation in the specified JSON format.
 """
 
+BATCH_CRITIQUE_PROMPT = """Evaluate each of these hackathon ideas independently with your strict criteria.
+
+Track/Domain: {track}
+Problem Statement: {problem_statement}
+
+IDEAS TO EVALUATE:
+{ideas}
+
+Be harsh but constructive. Score each idea on its own merits, then provide
+specific feedback on how to improve it.
+
+Respond with a single JSON object of the form
+{{"evaluations": [{{"id": <idea id>, ...evaluation in the specified JSON format...}}, ...]}}
+containing exactly one evaluation per idea.
+"""
+
 
 class CritiqueAgent:
-    """Agent responsible for critiquing and scoring hackathon ideas."""
+    """
+    Agent responsible for critiquing and scoring hackathon ideas.
     
-    def __init__(self):
-        model, model_id = get_model_config()
-        self.model_id = model_id
-        self.agent = Agent(
-            name="Hackathon Critique",
-            model=model,
-            instructions=CRITIQUE_SYSTEM_PROMPT,
-            markdown=False,
-        )
+    Ideas are scored by the draft critique models. When separate final
+    models are configured (CRITIQUE_FINAL_MODEL), an idea the draft scores
+    at or above the threshold is re-scored by a final model, and that score
+    decides the verdict, so the strong model only sees likely winners.
+    """
+    
+    def __init__(self, cache: Optional[TTLCache] = None):
+        draft_models = get_role_models("critique_draft")
+        final_models = get_role_models("critique_final")
+        fallbacks = get_fallback_models()
+        if cache is None and CRITIQUE_CACHE_ENABLED:
+            cache = TTLCache(
+                max_size=CRITIQUE_CACHE_SIZE,
+                ttl=CRITIQUE_CACHE_TTL,
+                path=CRITIQUE_CACHE_PATH or None,
+                namespace="critique"
+            )
+        self.cache = cache
+        # Identical critiques already running, so concurrent duplicates share one call
+        self._inflight: dict = {}
+        # Shared model clients, each with a pool of per-call agents; calls go to the fastest model
+        # and fail over (or hedge) to the next one
+        self.draft = ModelRouter(draft_models, "Hackathon Critique", CRITIQUE_SYSTEM_PROMPT, fallbacks=fallbacks)
+        self.final: Optional[ModelRouter] = None
+        if [model_id for _, model_id in final_models] != [model_id for _, model_id in draft_models]:
+            self.final = ModelRouter(final_models, "Hackathon Critique", CRITIQUE_SYSTEM_PROMPT, fallbacks=fallbacks)
+        self.agents = self.draft
+        self.model_id = self.draft.model_id if self.final is None else f"{self.draft.model_id}>{self.final.model_id}"
     
-    def evaluate_idea(
+    async def evaluate_idea(
         self,
         idea: dict,
         track: str,
         problem_statement: str,
-        threshold: int = 7  # 1-9 slider maps to 10-90%, so 7 = 70% = 7/10
+        threshold: int = 7,  # 1-9 slider maps to 10-90%, so 7 = 70% = 7/10
+        on_token: Optional[TokenCallback] = None
     ) -> dict:
         """
         Evaluate an idea against the threshold.
@@ -89,43 +140,246 @@ class CritiqueAgent:
             track: Hackathon track/domain
             problem_statement: Original problem statement
             threshold: Score threshold (1-9, representing 10-90%)
+            on_token: Optional callback receiving partial model output
         
         Returns:
             Evaluation result with scores and verdict
         """
         threshold_score = threshold  # Direct mapping: slider 7 = need 7/10
-        threshold_percent = threshold * 10
         
+        evaluation, content = await self._cached_score(self.draft, idea, track, problem_statement, on_token)
+        if evaluation is not None and self.final is not None and evaluation.get("overall_score", 0) >= threshold_score:
+            evaluation = await self._confirm(idea, track, problem_statement, evaluation, on_token)
+        
+        if evaluation is None:
+            return self._fallback_evaluation(content)
+        
+        # Verdict is always derived from the score for the requested threshold
+        evaluation = dict(evaluation)
+        evaluation["verdict"] = "PASS" if evaluation.get("overall_score", 0) >= threshold_score else "FAIL"
+        return evaluation
+    
+    async def evaluate_ideas(
+        self,
+        ideas: List[dict],
+        track: str,
+        problem_statement: str,
+        threshold: int = 7,
+        batch_size: int = CRITIQUE_BATCH_SIZE,
+        token_sink: Optional[Callable[[str], Optional[TokenCallback]]] = None,
+        limiter: Optional[asyncio.Semaphore] = None
+    ) -> List[dict]:
+        """
+        Evaluate several ideas, scoring up to ``batch_size`` per model call.
+        
+        The rubric is sent once per batch instead of once per idea. Cached
+        ideas skip the model entirely, and any idea missing from a batch
+        reply, or from a batch whose call failed, is re-scored on its own
+        with evaluate_idea. Draft scores that
+        reach the threshold are confirmed by the final model, if one is set.
+        
+        Args:
+            ideas: Idea dictionaries from ResearcherAgent
+            track: Hackathon track/domain
+            problem_statement: Original problem statement
+            threshold: Score threshold (1-9, representing 10-90%)
+            batch_size: Maximum ideas per model call
+            token_sink: Optional factory returning the partial-output callback for
+                each call, given its label: "batch{n}" for the nth batch, or the
+                idea's index for a call scoring one idea
+            limiter: Optional semaphore bounding concurrent model calls
+        
+        Returns:
+            One evaluation per idea, in the same order
+        """
+        def sink_for(label) -> Optional[TokenCallback]:
+            # Concurrent calls stream side by side, so each gets its own label
+            return token_sink(str(label)) if token_sink else None
+        
+        evaluations: List[Optional[dict]] = [None] * len(ideas)
+        uncached = []
+        for index, idea in enumerate(ideas):
+            cached = self.cache.get(self._cache_key(idea, track, problem_statement)) if self.cache else None
+            if cached is not None:
+                evaluations[index] = cached
+            else:
+                uncached.append(index)
+        
+        if batch_size > 1 and len(uncached) > 1:
+            batches = [uncached[i:i + batch_size] for i in range(0, len(uncached), batch_size)]
+            results = await asyncio.gather(*(
+                _limited(limiter, self._score_batch(
+                    [ideas[i] for i in batch], track, problem_statement, sink_for(f"batch{n}")
+                ))
+                for n, batch in enumerate(batches)
+            ))
+            for batch, scored in zip(batches, results):
+                for index, evaluation in zip(batch, scored):
+                    if evaluation is not None:
+                        evaluations[index] = evaluation
+                        if self.cache is not None:
+                            self.cache.set(self._cache_key(ideas[index], track, problem_statement), evaluation)
+        
+        # Anything still unscored (unbatched, or dropped from a batch reply) goes one at a time
+        missing = [i for i, evaluation in enumerate(evaluations) if evaluation is None]
+        if missing and batch_size > 1 and len(uncached) > 1:
+            print(f"⚠️ Batch critique missed {len(missing)} idea(s), scoring them individually")
+        singles = await asyncio.gather(*(
+            _limited(limiter, self.evaluate_idea(
+                idea=ideas[i],
+                track=track,
+                problem_statement=problem_statement,
+                threshold=threshold,
+                on_token=sink_for(i)
+            ))
+            for i in missing
+        ))
+        for index, evaluation in zip(missing, singles):
+            evaluations[index] = evaluation
+        
+        if self.final is not None:
+            # evaluate_idea already confirmed the ones it scored
+            unconfirmed = [
+                i for i, evaluation in enumerate(evaluations)
+                if i not in missing and evaluation.get("overall_score", 0) >= threshold
+            ]
+            confirmed = await asyncio.gather(*(
+                _limited(limiter, self._confirm(ideas[i], track, problem_statement, evaluations[i], sink_for(i)))
+                for i in unconfirmed
+            ))
+            for index, evaluation in zip(unconfirmed, confirmed):
+                evaluations[index] = evaluation
+        
+        results = []
+        for evaluation in evaluations:
+            evaluation = dict(evaluation)
+            evaluation["verdict"] = "PASS" if evaluation.get("overall_score", 0) >= threshold else "FAIL"
+            results.append(evaluation)
+        return results
+    
+    def get_cache_stats(self) -> dict:
+        """Return critique cache counters (or ``{"enabled": False}``)."""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.stats()}
+    
+    def routing_stats(self) -> dict:
+        """Per-model latency and call counts for the draft and final critique models."""
+        stats = {"critique_draft": self.draft.stats()}
+        if self.final is not None:
+            stats["critique_final"] = self.final.stats()
+        return stats
+    
+    def _cache_key(self, idea: dict, track: str, problem_statement: str, model_id: Optional[str] = None) -> str:
+        return TTLCache.make_key(
+            _canonical(idea), _canonical(track), _canonical(problem_statement), model_id or self.draft.model_id
+        )
+    
+    async def _cached_score(
+        self,
+        router: ModelRouter,
+        idea: dict,
+        track: str,
+        problem_statement: str,
+        on_token: Optional[TokenCallback] = None
+    ) -> Tuple[Optional[dict], str]:
+        """Score with ``router``'s models through the cache, sharing identical in-flight calls."""
+        if self.cache is None:
+            return await self._score(idea, track, problem_statement, on_token, router)
+        
+        key = self._cache_key(idea, track, problem_statement, router.model_id)
+        evaluation = self.cache.get(key)
+        if evaluation is not None:
+            return evaluation, ""
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(
+                self._score(idea, track, problem_statement, on_token, router)
+            )
+            pending.add_done_callback(lambda task: self._store_result(key, task))
+            self._inflight[key] = pending
+        # Shielded so one caller's cancellation doesn't fail the others
+        return await asyncio.shield(pending)
+    
+    async def _confirm(
+        self,
+        idea: dict,
+        track: str,
+        problem_statement: str,
+        draft: dict,
+        on_token: Optional[TokenCallback] = None
+    ) -> dict:
+        """Re-score an idea the draft passed with the final model, whose score then counts."""
+        evaluation, _ = await self._cached_score(self.final, idea, track, problem_statement, on_token)
+        if evaluation is None:
+            print("⚠️ Final critique reply could not be parsed, keeping the draft score")
+            return draft
+        return evaluation
+    
+    def _store_result(self, key: str, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        # Failed parses are not cached so the next attempt gets a fresh call
+        if not task.cancelled() and task.exception() is None and task.result()[0] is not None:
+            self.cache.set(key, task.result()[0])
+    
+    async def _score(
+        self,
+        idea: dict,
+        track: str,
+        problem_statement: str,
+        on_token: Optional[TokenCallback] = None,
+        router: Optional[ModelRouter] = None
+    ) -> Tuple[Optional[dict], str]:
+        """Score an idea with the model, returning (evaluation or None if unparseable, raw reply)."""
+        router = router or self.draft
         prompt = CRITIQUE_PROMPT.format(
             track=track,
             problem_statement=problem_statement,
-            threshold=threshold_percent,
-            threshold_score=threshold_score,
             idea=json.dumps(idea, indent=2)
         )
         
-        response = self.agent.run(prompt)
-        evaluation = self._parse_evaluation(response.content, threshold_score)
-        
-        return evaluation
+        response = await router.run(prompt, on_token=on_token)
+        content = response.content or ""
+        evaluation = await parse_or_repair(content, router, required=("overall_score",))
+        return evaluation, content
     
-    def _parse_evaluation(self, content: str, threshold_score: int) -> dict:
-        """Parse the evaluation response."""
+    async def _score_batch(
+        self,
+        ideas: List[dict],
+        track: str,
+        problem_statement: str,
+        on_token: Optional[TokenCallback] = None
+    ) -> List[Optional[dict]]:
+        """Score ``ideas`` in one model call; entries the reply doesn't cover (or all, if the call fails) are None."""
+        numbered = "\n\n".join(
+            f"Idea id {i}:\n{json.dumps(idea, indent=2)}" for i, idea in enumerate(ideas, start=1)
+        )
+        prompt = BATCH_CRITIQUE_PROMPT.format(
+            track=track,
+            problem_statement=problem_statement,
+            ideas=numbered
+        )
+        
         try:
-            import re
-            json_match = re.search(r'\{[\s\S]*\}', content)
-            if json_match:
-                evaluation = json.loads(json_match.group())
-                # Ensure verdict is based on threshold
-                if evaluation.get("overall_score", 0) >= threshold_score:
-                    evaluation["verdict"] = "PASS"
-                else:
-                    evaluation["verdict"] = "FAIL"
-                return evaluation
-        except json.JSONDecodeError:
-            pass
-        
-        # Fallback
+            response = await self.draft.run(prompt, on_token=on_token)
+            reply = await parse_or_repair(response.content or "", self.draft, required=("evaluations",))
+        except Exception as e:
+            # Lose the batch, not the iteration: its ideas are scored one by one
+            print(f"⚠️ Batch critique call failed ({e!r}), scoring its {len(ideas)} idea(s) individually")
+            return [None] * len(ideas)
+        
+        by_id = {}
+        for entry in (reply or {}).get("evaluations") or []:
+            if not isinstance(entry, dict) or "overall_score" not in entry:
+                continue
+            try:
+                by_id[int(str(entry.pop("id")).split()[-1])] = entry
+            except (KeyError, ValueError):
+                continue
+        return [by_id.get(i) for i in range(1, len(ideas) + 1)]
+    
+    def _fallback_evaluation(self, content: str) -> dict:
+        """Zero-score FAIL used when the model's reply can't be parsed."""
         return {
             "scores": {
                 "innovation": 0,
@@ -165,3 +419,22 @@ class CritiqueAgent:
             feedback_parts.append(f"Focus on improving: {', '.join([f'{k} (scored {v})' for k, v in weakest])}")
         
         return " | ".join(feedback_parts)
+
+
+def _canonical(value):
+    """Normalize whitespace (and key order, via make_key) so equivalent ideas share a key."""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_canonical(v) for v in value]
+    return value
+
+
+async def _limited(limiter: Optional[asyncio.Semaphore], call: Awaitable[Any]) -> Any:
+    """Await ``call`` holding ``limiter``, if one is given."""
+    if limiter is None:
+        return await call
+    async with limiter:
+        return await call
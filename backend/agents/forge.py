@@ -1,11 +1,37 @@
 """IdeaForge - Main orchestrator for the two-stage idea generation system."""
 import asyncio
+import os
 from typing import Optional, Callable, AsyncGenerator
 from dataclasses import dataclass, field
 from enum import Enum
 
+import httpx
+
+from metrics import METRICS_MODE, RunTimings, bind_run, count, unbind_run
 from .researcher import ResearcherAgent
-from .critique import CritiqueAgent
+from .critique import CritiqueAgent, CRITIQUE_BATCH_SIZE
+from .history import IdeaHistory
+from .similarity import DuplicateFilter
+from .stopping import EARLY_STOP, EARLY_STOP_CUTOFF, EarlyStopper
+from .usage import RUN_TOKEN_BUDGET, RunUsage, bind_usage, unbind_usage
+
+
+# Iterations the depth search is queued ahead of the loop; 0 searches inline each iteration
+DEPTH_SEARCH_PREFETCH = int(os.getenv("DEPTH_SEARCH_PREFETCH", "1"))
+# Skip the critique for ideas that are near-duplicates of seeds or earlier ideas
+DUPLICATE_FILTER = os.getenv("DUPLICATE_FILTER", "true").lower() == "true"
+
+# Creative directions used to diversify beam candidates generated from the same context
+BEAM_VARIATIONS = [
+    "",
+    "Take a bolder, more unconventional angle than the obvious solution.",
+    "Prioritize feasibility and a polished, reliable live demo.",
+    "Target a specific, underserved user group with a sharp pain point.",
+    "Lean on a surprising technical insight or an unusual data source.",
+    "Design for a strong viral or network effect.",
+    "Combine two existing tools or APIs in a way nobody has tried.",
+    "Minimize scope to one killer feature executed extremely well.",
+]
 
 
 class ForgeMode(Enum):
@@ -21,9 +47,13 @@ class ForgeState:
     problem_statement: str = ""
     threshold: int = 7
     max_iterations: int = 10
+    beam_width: int = 1
+    token_budget: int = 0
+    early_stop: str = "off"
     current_iteration: int = 0
     ideas_generated: list = field(default_factory=list)
     evaluations: list = field(default_factory=list)
+    critique_calls_saved: int = 0
     is_running: bool = False
     is_interrupted: bool = False
     final_idea: Optional[dict] = None
@@ -34,10 +64,15 @@ class ForgeState:
 class ForgeUpdate:
     """Update message from the forge process."""
     iteration: int
-    stage: str  # "researching", "evaluating", "complete", "interrupted"
+    stage: str  # "researching", "evaluating", "complete", "interrupted", "token", ...
     idea: Optional[dict] = None
     evaluation: Optional[dict] = None
     message: str = ""
+    missing_sources: list = field(default_factory=list)
+    agent: str = ""  # token updates: which agent produced the text
+    delta: str = ""  # token updates: partial model output
+    timings: Optional[dict] = None  # ms per span kind since the previous update, plus "elapsed"
+    usage: Optional[dict] = None  # run token/cost totals so far, plus the current iteration's
 
 
 class IdeaForge:
@@ -54,10 +89,22 @@ class IdeaForge:
         - Iterates until threshold met or interrupted
     """
     
-    def __init__(self):
-        self.researcher = ResearcherAgent()
-        self.critique = CritiqueAgent()
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        researcher: Optional[ResearcherAgent] = None,
+        critique: Optional[CritiqueAgent] = None,
+        session_id: Optional[str] = None
+    ):
+        self.researcher = researcher or ResearcherAgent(http_client=http_client)
+        self.critique = critique or CritiqueAgent()
+        self.session_id = session_id
         self.state: Optional[ForgeState] = None
+        self.queued = False
+        self.cancel_requested = False
+        self.timings = RunTimings()
+        self.usage = RunUsage()
+        self.stopper: Optional[EarlyStopper] = None
     
     async def run_independent(
         self,
@@ -72,58 +119,200 @@ class IdeaForge:
             requirements: Additional requirements
         
         Returns:
-            Generated idea dictionary
+            Generated idea dictionary (``success`` is False and ``idea`` None if interrupted)
+        """
+        final = None
+        async for update in self.stream_independent(track, requirements):
+            final = update
+        return {
+            "success": final.stage == "complete",
+            "idea": final.idea,
+            "mode": "independent",
+            "missing_sources": final.missing_sources
+        }
+    
+    def stream_independent(
+        self,
+        track: str,
+        requirements: str = "",
+        stream_tokens: bool = False
+    ) -> AsyncGenerator[ForgeUpdate, None]:
         """
+        Run Independent Mode, yielding progress (and optionally token) updates.
+        
+        Args:
+            track: Hackathon track/domain
+            requirements: Additional requirements
+            stream_tokens: Yield "token" updates with partial model output
+        
+        Yields:
+            ForgeUpdate objects, ending with a "complete" update carrying the idea,
+            or an "interrupted" update if the run was stopped
+        """
+        return self._instrumented(self._stream_independent(track, requirements, stream_tokens))
+    
+    async def _stream_independent(
+        self,
+        track: str,
+        requirements: str,
+        stream_tokens: bool
+    ) -> AsyncGenerator[ForgeUpdate, None]:
         self.state = ForgeState(
             mode=ForgeMode.INDEPENDENT,
             track=track,
             problem_statement=requirements,
-            is_running=True
+            is_running=True,
+            is_interrupted=self.cancel_requested
         )
+        tokens = asyncio.Queue() if stream_tokens else None
         
         try:
-            idea = await self.researcher.generate_idea_independent(track, requirements)
+            if self.state.is_interrupted:
+                yield ForgeUpdate(iteration=1, stage="interrupted", message="Process interrupted by user")
+                return
+            yield ForgeUpdate(
+                iteration=1,
+                stage="researching",
+                message="Searching for real problems people face..."
+            )
+            search = await self.researcher.search_for_problems(track, requirements)
+            
+            if self.state.is_interrupted:
+                yield ForgeUpdate(
+                    iteration=1,
+                    stage="interrupted",
+                    message="Process interrupted by user",
+                    missing_sources=search.missing
+                )
+                return
+            yield ForgeUpdate(
+                iteration=1,
+                stage="generating",
+                message="Generating idea...",
+                missing_sources=search.missing
+            )
+            generation = asyncio.ensure_future(self.researcher.generate_idea_independent(
+                track,
+                requirements,
+                search=search,
+                on_token=self._token_sink(tokens, "researcher")
+            ))
+            async for update in self._stream_while(generation, tokens, 1):
+                yield update
+            idea = generation.result()
+            
             self.state.final_idea = idea
             self.state.ideas_generated.append(idea)
-            return {
-                "success": True,
-                "idea": idea,
-                "mode": "independent"
-            }
+            yield ForgeUpdate(
+                iteration=1,
+                stage="complete",
+                idea=idea,
+                message="✨ Idea generated",
+                missing_sources=search.missing
+            )
         finally:
             self.state.is_running = False
     
-    async def run_depth(
+    def run_depth(
         self,
         track: str,
         problem_statement: str,
         threshold: int = 7,
         max_iterations: int = 10,
+        beam_width: int = 1,
+        beam_keep: int = 2,
+        beam_concurrency: int = 4,
+        stream_tokens: bool = False,
+        token_budget: Optional[int] = None,
+        early_stop: Optional[str] = None,
+        early_stop_cutoff: Optional[float] = None,
         on_update: Optional[Callable[[ForgeUpdate], None]] = None
     ) -> AsyncGenerator[ForgeUpdate, None]:
         """
         Run Depth Mode - iterative idea generation with critique validation.
         
+        With ``beam_width`` > 1 each iteration generates that many candidates
+        concurrently, critiques them all in parallel, and carries the best
+        ``beam_keep`` forward as the previous ideas for the next round.
+        
         Args:
             track: Hackathon track/domain
             problem_statement: The problem statement to solve
             threshold: Score threshold (1-9, maps to 10-90%)
             max_iterations: Maximum iterations before stopping
+            beam_width: Candidates generated per iteration
+            beam_keep: Top candidates kept as context for the next iteration
+            beam_concurrency: Max concurrent model calls within this run
+            stream_tokens: Also yield "token" updates with partial model output
+            token_budget: End the run with the best idea so far once it has used
+                this many tokens (None uses RUN_TOKEN_BUDGET; 0 is unlimited)
+            early_stop: Stopping policy, "off" or "adaptive" (None uses EARLY_STOP);
+                "adaptive" ends the run with the best idea so far once the score
+                trend makes reaching the threshold unlikely
+            early_stop_cutoff: Chance of reaching the threshold below which an
+                adaptive run stops (None uses EARLY_STOP_CUTOFF)
             on_update: Optional callback for updates
         
         Yields:
             ForgeUpdate objects with progress information
         """
+        return self._instrumented(self._run_depth(
+            track, problem_statement, threshold, max_iterations,
+            beam_width, beam_keep, beam_concurrency, stream_tokens,
+            RUN_TOKEN_BUDGET if token_budget is None else token_budget,
+            EarlyStopper(
+                early_stop or EARLY_STOP, threshold, max_iterations,
+                EARLY_STOP_CUTOFF if early_stop_cutoff is None else early_stop_cutoff
+            )
+        ))
+    
+    async def _run_depth(
+        self,
+        track: str,
+        problem_statement: str,
+        threshold: int,
+        max_iterations: int,
+        beam_width: int,
+        beam_keep: int,
+        beam_concurrency: int,
+        stream_tokens: bool,
+        token_budget: int,
+        stopper: EarlyStopper
+    ) -> AsyncGenerator[ForgeUpdate, None]:
+        self.stopper = stopper
         self.state = ForgeState(
             mode=ForgeMode.DEPTH,
             track=track,
             problem_statement=problem_statement,
             threshold=threshold,
             max_iterations=max_iterations,
-            is_running=True
+            beam_width=beam_width,
+            token_budget=token_budget,
+            early_stop=stopper.policy,
+            is_running=True,
+            is_interrupted=self.cancel_requested
         )
         
         feedback = None
+        # Best (idea, evaluation) pairs carried into the next beam round
+        survivors: list = []
+        # Compressed summary of rejected ideas, reused across iterations
+        history = IdeaHistory()
+        duplicates = DuplicateFilter() if DUPLICATE_FILTER else None
+        # "Too similar" note for the researcher, consumed by the next generation
+        duplicate_note = None
+        limiter = asyncio.Semaphore(max(1, beam_concurrency))
+        tokens = asyncio.Queue() if stream_tokens else None
+        
+        # Search only depends on track/problem, so the next iteration's search
+        # runs while the current one generates and critiques
+        search_queue: Optional[asyncio.Queue] = None
+        prefetcher: Optional[asyncio.Task] = None
+        if DEPTH_SEARCH_PREFETCH > 0:
+            search_queue = asyncio.Queue(maxsize=DEPTH_SEARCH_PREFETCH)
+            prefetcher = asyncio.create_task(
+                self._prefetch_searches(track, problem_statement, search_queue, max_iterations)
+            )
         
         try:
             for iteration in range(1, max_iterations + 1):
@@ -135,7 +324,20 @@ class IdeaForge:
                     )
                     break
                 
+                used = self.usage.total.total_tokens
+                if token_budget and used >= token_budget:
+                    self._select_best()
+                    yield ForgeUpdate(
+                        iteration=iteration - 1,
+                        stage="budget_exceeded",
+                        idea=self.state.final_idea,
+                        evaluation=self.state.final_evaluation,
+                        message=f"Token budget reached ({used}/{token_budget} tokens). {self._best_note()}"
+                    )
+                    break
+                
                 self.state.current_iteration = iteration
+                self.usage.iteration = iteration
                 
                 # Stage 1: Research
                 yield ForgeUpdate(
@@ -144,29 +346,85 @@ class IdeaForge:
                     message=f"Iteration {iteration}: Searching for winning ideas..."
                 )
                 
-                idea = await self.researcher.generate_idea_depth(
-                    track=track,
-                    problem_statement=problem_statement,
-                    previous_ideas=self.state.ideas_generated[-3:] if self.state.ideas_generated else None,
-                    feedback=feedback
-                )
-                self.state.ideas_generated.append(idea)
+                if prefetcher is not None:
+                    search = await self._next_search(search_queue, prefetcher)
+                else:
+                    search = await self.researcher.search_for_winners(track, problem_statement)
+                if beam_width > 1:
+                    generation = asyncio.ensure_future(self._generate_beam(
+                        track, problem_statement, survivors, history, search, beam_width, limiter, tokens,
+                        note=duplicate_note
+                    ))
+                else:
+                    generation = asyncio.ensure_future(self._generate_one(
+                        track=track,
+                        problem_statement=problem_statement,
+                        history=history.render(),
+                        feedback=_join_feedback(feedback, duplicate_note),
+                        search=search,
+                        on_token=self._token_sink(tokens, "researcher")
+                    ))
+                async for update in self._stream_while(generation, tokens, iteration):
+                    yield update
+                candidates = generation.result()
+                duplicate_note = None
+                
+                if duplicates is not None:
+                    fresh = []
+                    skipped = []
+                    for candidate in candidates:
+                        match, similarity = duplicates.check(candidate)
+                        if match is None:
+                            fresh.append(candidate)
+                        else:
+                            skipped.append(f"'{_title(candidate)}' is {similarity:.0%} similar to '{match}'")
+                    if skipped:
+                        self.state.critique_calls_saved += len(skipped)
+                        duplicate_note = (
+                            "Too similar to earlier ideas, propose something substantially different: "
+                            + "; ".join(skipped)
+                        )
+                        yield ForgeUpdate(
+                            iteration=iteration,
+                            stage="duplicate",
+                            idea=candidates[0] if len(candidates) == 1 else None,
+                            message=f"Iteration {iteration}: Skipped critique - {'; '.join(skipped)}"
+                        )
+                    if not fresh:
+                        continue
+                    candidates = fresh
+                self.state.ideas_generated.extend(candidates)
                 
+                if len(candidates) == 1:
+                    message = f"Iteration {iteration}: Evaluating idea..."
+                else:
+                    message = f"Iteration {iteration}: Evaluating {len(candidates)} candidates..."
+                if search.missing:
+                    message += f" (search sources unavailable: {', '.join(search.missing)})"
                 yield ForgeUpdate(
                     iteration=iteration,
                     stage="evaluating",
-                    idea=idea,
-                    message=f"Iteration {iteration}: Evaluating idea..."
+                    idea=candidates[0] if len(candidates) == 1 else None,
+                    message=message,
+                    missing_sources=search.missing
                 )
                 
                 # Stage 2: Critique
-                evaluation = self.critique.evaluate_idea(
-                    idea=idea,
-                    track=track,
-                    problem_statement=problem_statement,
-                    threshold=threshold
+                critique = asyncio.ensure_future(self._evaluate_all(
+                    candidates, track, problem_statement, threshold, limiter, tokens
+                ))
+                async for update in self._stream_while(critique, tokens, iteration):
+                    yield update
+                evaluations = critique.result()
+                self.state.evaluations.extend(evaluations)
+                
+                ranked = sorted(
+                    zip(candidates, evaluations),
+                    key=lambda pair: pair[1].get("overall_score", 0),
+                    reverse=True
                 )
-                self.state.evaluations.append(evaluation)
+                idea, evaluation = ranked[0]
+                survivors = ranked[:max(1, beam_keep)]
                 
                 if evaluation["verdict"] == "PASS":
                     self.state.final_idea = idea
@@ -176,53 +434,277 @@ class IdeaForge:
                         stage="complete",
                         idea=idea,
                         evaluation=evaluation,
-                        message=f"🎉 Found winning idea! Score: {evaluation['overall_score']}/10"
+                        message=f"🎉 Found winning idea! Score: {evaluation['overall_score']}/10{self._savings_note()}"
                     )
                     break
                 else:
                     feedback = self.critique.get_improvement_feedback(evaluation)
+                    for rejected, rejected_evaluation in reversed(survivors):
+                        history.add(rejected, rejected_evaluation)
+                    scored = f"Score {evaluation['overall_score']}/10"
+                    if len(candidates) > 1:
+                        scored = f"Best of {len(candidates)} scored {evaluation['overall_score']}/10"
+                    stop = stopper.observe(iteration, evaluation)
+                    next_step = "" if stop else " Trying again..."
                     yield ForgeUpdate(
                         iteration=iteration,
                         stage="rejected",
                         idea=idea,
                         evaluation=evaluation,
-                        message=f"Iteration {iteration}: Score {evaluation['overall_score']}/10 - Below threshold {threshold}/10. Trying again..."
+                        message=f"Iteration {iteration}: {scored} - Below threshold {threshold}/10.{next_step}"
                     )
+                    if stop:
+                        self._select_best()
+                        yield ForgeUpdate(
+                            iteration=iteration,
+                            stage="early_stopped",
+                            idea=self.state.final_idea,
+                            evaluation=self.state.final_evaluation,
+                            message=(
+                                f"Stopped early: {stopper.describe()}. Saved {stopper.iterations_saved} "
+                                f"iteration(s). {self._best_note()}"
+                            )
+                        )
+                        break
             else:
                 # Max iterations reached
-                best_idx = max(range(len(self.state.evaluations)), 
-                              key=lambda i: self.state.evaluations[i].get("overall_score", 0))
-                self.state.final_idea = self.state.ideas_generated[best_idx]
-                self.state.final_evaluation = self.state.evaluations[best_idx]
-                
+                self._select_best()
                 yield ForgeUpdate(
                     iteration=max_iterations,
                     stage="max_iterations",
                     idea=self.state.final_idea,
                     evaluation=self.state.final_evaluation,
-                    message=f"Max iterations reached. Best idea scored {self.state.final_evaluation['overall_score']}/10"
+                    message=f"Max iterations reached. {self._best_note()}"
                 )
         
         finally:
+            if prefetcher is not None:
+                prefetcher.cancel()
+                await asyncio.gather(prefetcher, return_exceptions=True)
             self.state.is_running = False
     
+    async def _instrumented(self, updates: AsyncGenerator[ForgeUpdate, None]) -> AsyncGenerator[ForgeUpdate, None]:
+        """
+        Attribute the run's spans and model usage to this forge, and stamp
+        each status update with its timings and the usage so far.
+        """
+        self.timings.reset()
+        self.usage.reset()
+        token = bind_run(self.timings)
+        usage_token = bind_usage(self.usage)
+        try:
+            async for update in updates:
+                if METRICS_MODE != "off":
+                    count("updates_total", stage=update.stage)
+                    if update.stage != "token":
+                        update.timings = self.timings.drain()
+                if update.stage != "token":
+                    update.usage = self.usage.snapshot()
+                yield update
+        finally:
+            await updates.aclose()
+            unbind_usage(usage_token)
+            unbind_run(token)
+    
+    def _select_best(self) -> None:
+        """Make the best-scoring idea evaluated so far the final one (if any was evaluated)."""
+        if not self.state.evaluations:
+            return
+        best_idx = max(range(len(self.state.evaluations)), 
+                      key=lambda i: self.state.evaluations[i].get("overall_score", 0))
+        self.state.final_idea = self.state.ideas_generated[best_idx]
+        self.state.final_evaluation = self.state.evaluations[best_idx]
+    
+    def _best_note(self) -> str:
+        if self.state.final_evaluation is None:
+            return f"No new idea was evaluated{self._savings_note()}"
+        return f"Best idea scored {self.state.final_evaluation['overall_score']}/10{self._savings_note()}"
+    
+    async def _prefetch_searches(
+        self,
+        track: str,
+        problem_statement: str,
+        queue: asyncio.Queue,
+        count: int
+    ) -> None:
+        """Search once and hand the result to each of ``count`` iterations through the bounded queue."""
+        # The search only depends on track/problem, so every iteration reuses one fetch
+        search = await self.researcher.search_for_winners(track, problem_statement)
+        for _ in range(count):
+            await queue.put(search)
+    
+    async def _next_search(self, queue: asyncio.Queue, prefetcher: asyncio.Task):
+        """Take the next prefetched search, surfacing prefetcher failures."""
+        if not queue.empty():
+            return queue.get_nowait()
+        getter = asyncio.ensure_future(queue.get())
+        try:
+            await asyncio.wait({getter, prefetcher}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not getter.done():
+                getter.cancel()
+        if getter.done() and not getter.cancelled():
+            return getter.result()
+        prefetcher.result()
+        raise RuntimeError("Search prefetcher stopped unexpectedly")
+    
+    async def _generate_beam(
+        self,
+        track: str,
+        problem_statement: str,
+        survivors: list,
+        history: IdeaHistory,
+        search,
+        beam_width: int,
+        limiter: asyncio.Semaphore,
+        tokens: Optional[asyncio.Queue] = None,
+        note: Optional[str] = None
+    ) -> list:
+        """Generate ``beam_width`` diverse candidates concurrently."""
+        rendered_history = history.render()
+        
+        async def generate(index: int) -> dict:
+            # Spread candidates across survivors, each with its own critique feedback
+            feedback = None
+            if survivors:
+                feedback = self.critique.get_improvement_feedback(survivors[index % len(survivors)][1])
+            feedback = _join_feedback(feedback, note)
+            async with limiter:
+                return await self.researcher.generate_idea_depth(
+                    track=track,
+                    problem_statement=problem_statement,
+                    history=rendered_history,
+                    feedback=feedback,
+                    search=search,
+                    variation=BEAM_VARIATIONS[index % len(BEAM_VARIATIONS)],
+                    on_token=self._token_sink(tokens, f"researcher:{index}")
+                )
+        
+        results = await asyncio.gather(
+            *(generate(i) for i in range(beam_width)), return_exceptions=True
+        )
+        candidates = [r for r in results if not isinstance(r, BaseException)]
+        if not candidates:
+            raise results[0]
+        return candidates
+    
+    async def _evaluate_all(
+        self,
+        ideas: list,
+        track: str,
+        problem_statement: str,
+        threshold: int,
+        limiter: asyncio.Semaphore,
+        tokens: Optional[asyncio.Queue] = None
+    ) -> list:
+        """Critique every idea, preserving order - batched when several, else in parallel."""
+        if len(ideas) > 1 and CRITIQUE_BATCH_SIZE > 1:
+            # Several candidates share the rubric in one call per batch
+            return await self.critique.evaluate_ideas(
+                ideas=ideas,
+                track=track,
+                problem_statement=problem_statement,
+                threshold=threshold,
+                token_sink=lambda label: self._token_sink(tokens, f"critique:{label}"),
+                limiter=limiter
+            )
+        
+        async def evaluate(index: int, idea: dict) -> dict:
+            label = "critique" if len(ideas) == 1 else f"critique:{index}"
+            async with limiter:
+                return await self.critique.evaluate_idea(
+                    idea=idea,
+                    track=track,
+                    problem_statement=problem_statement,
+                    threshold=threshold,
+                    on_token=self._token_sink(tokens, label)
+                )
+        
+        return list(await asyncio.gather(*(evaluate(i, idea) for i, idea in enumerate(ideas))))
+    
+    async def _generate_one(self, **kwargs) -> list:
+        """Generate a single depth-mode idea, as a one-candidate list."""
+        return [await self.researcher.generate_idea_depth(**kwargs)]
+    
+    def _savings_note(self) -> str:
+        saved = self.state.critique_calls_saved
+        return f" ({saved} critique call(s) saved by duplicate detection)" if saved else ""
+    
+    @staticmethod
+    def _token_sink(tokens: Optional[asyncio.Queue], agent: str):
+        """Build an on_token callback feeding ``tokens``, or None when not streaming."""
+        if tokens is None:
+            return None
+        return lambda delta: tokens.put_nowait((agent, delta))
+    
+    async def _stream_while(
+        self,
+        task: asyncio.Future,
+        tokens: Optional[asyncio.Queue],
+        iteration: int
+    ) -> AsyncGenerator[ForgeUpdate, None]:
+        """Yield token updates until ``task`` finishes; cancel it if abandoned."""
+        try:
+            if tokens is None:
+                await task
+                return
+            while not task.done():
+                getter = asyncio.ensure_future(tokens.get())
+                try:
+                    await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    if not getter.done():
+                        getter.cancel()
+                if getter.done() and not getter.cancelled():
+                    agent, delta = getter.result()
+                    yield ForgeUpdate(iteration=iteration, stage="token", agent=agent, delta=delta)
+            while not tokens.empty():
+                agent, delta = tokens.get_nowait()
+                yield ForgeUpdate(iteration=iteration, stage="token", agent=agent, delta=delta)
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+    
     def interrupt(self):
-        """Interrupt the current depth mode process."""
+        """Interrupt the current run (or cancel it while queued)."""
         if self.state and self.state.is_running:
             self.state.is_interrupted = True
+        elif not self.state:
+            self.cancel_requested = True
     
     def get_status(self) -> dict:
         """Get current forge status."""
+        if self.queued:
+            return {"status": "queued", "session_id": self.session_id}
         if not self.state:
-            return {"status": "idle"}
+            return {"status": "idle", "session_id": self.session_id}
         
         return {
             "status": "running" if self.state.is_running else "stopped",
+            "session_id": self.session_id,
             "mode": self.state.mode.value,
             "iteration": self.state.current_iteration,
             "max_iterations": self.state.max_iterations,
+            "beam_width": self.state.beam_width,
             "ideas_count": len(self.state.ideas_generated),
+            "critique_calls_saved": self.state.critique_calls_saved,
             "threshold": self.state.threshold,
+            "token_budget": self.state.token_budget or None,
+            "early_stop": self.stopper.stats() if self.stopper else None,
             "final_idea": self.state.final_idea,
-            "final_evaluation": self.state.final_evaluation
+            "final_evaluation": self.state.final_evaluation,
+            "timings": self.timings.summary() if METRICS_MODE != "off" else None,
+            "usage": self.usage.summary()
         }
+
+
+def _title(idea: dict) -> str:
+    return idea.get("title") or idea.get("name") or "Untitled"
+
+
+def _join_feedback(feedback: Optional[str], note: Optional[str]) -> Optional[str]:
+    """Combine critique feedback with a duplicate note, either of which may be missing."""
+    if feedback and note:
+        return f"{feedback} | {note}"
+    return feedback or note
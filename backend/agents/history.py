@@ -0,0 +1,82 @@
+"""Idea history - rolling, compressed record of rejected depth-mode ideas."""
+import os
+from collections import deque
+from typing import Optional
+
+from tools.context import count_tokens
+
+# Hard cap on the previous-ideas section of a depth prompt
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "300"))
+# Lowest-scoring critique dimensions recorded per idea
+HISTORY_WEAKEST_DIMENSIONS = 2
+
+_TITLE_CHARS = 80
+_GIST_CHARS = 140
+
+
+class IdeaHistory:
+    """
+    Rolling summary of rejected ideas for depth-mode prompts.
+
+    Each rejected idea is reduced once to a single line - title, score,
+    weakest dimensions and a short gist - and the oldest lines are dropped
+    to stay within ``budget`` tokens. The rendered text is cached and only
+    rebuilt when an idea is added, so prompt size stays flat however many
+    iterations run.
+    """
+
+    def __init__(self, budget: int = HISTORY_TOKEN_BUDGET):
+        self.budget = budget
+        self._entries: deque = deque()  # (line, tokens)
+        self._tokens = 0
+        self._rendered: Optional[str] = None
+        self.total_added = 0
+
+    def add(self, idea: dict, evaluation: dict) -> None:
+        """Record a rejected idea and its evaluation, evicting the oldest to fit."""
+        line = summarize(idea, evaluation)
+        cost = count_tokens(line) + 1
+        self._entries.append((line, cost))
+        self._tokens += cost
+        self.total_added += 1
+        while self._tokens > self.budget and len(self._entries) > 1:
+            _, evicted = self._entries.popleft()
+            self._tokens -= evicted
+        self._rendered = None
+
+    def render(self) -> str:
+        """The history as prompt text, one line per remembered idea."""
+        if self._rendered is None:
+            self._rendered = "\n".join(line for line, _ in self._entries)
+        return self._rendered
+
+    @property
+    def tokens(self) -> int:
+        return self._tokens
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def summarize(idea: dict, evaluation: dict) -> str:
+    """One-line summary of a rejected idea: title, score, weakest dimensions and gist."""
+    title = _clip(idea.get("title") or idea.get("name") or "Untitled", _TITLE_CHARS)
+    line = f"- {title} [{evaluation.get('overall_score', '?')}/10]"
+
+    scores = evaluation.get("scores") or {}
+    numeric = [(k, v) for k, v in scores.items() if isinstance(v, (int, float))]
+    if numeric:
+        weakest = sorted(numeric, key=lambda item: item[1])[:HISTORY_WEAKEST_DIMENSIONS]
+        line += " weak: " + ", ".join(f"{k} {v}" for k, v in weakest)
+
+    gist = idea.get("unique_angle") or idea.get("solution") or ""
+    if gist:
+        line += f" - {_clip(gist, _GIST_CHARS)}"
+    return line
+
+
+def _clip(text, limit: int) -> str:
+    text = " ".join(str(text).split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "…"
@@ -0,0 +1,176 @@
+"""Async helpers for running agno agents without blocking the event loop."""
+import asyncio
+import inspect
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Optional
+
+from agno.agent import Agent
+
+from metrics import count, span
+from mocks import MockAgent, MockModel, record_llm
+from .usage import call_usage, record_usage
+
+# "native" awaits agent.arun(); "executor" always runs agent.run() in a thread
+LLM_ASYNC_MODE = os.getenv("LLM_ASYNC_MODE", "native").lower()
+LLM_EXECUTOR_WORKERS = int(os.getenv("LLM_EXECUTOR_WORKERS", "8"))
+# Agents kept per role; bounds concurrent model calls of that role
+LLM_AGENT_POOL_SIZE = int(os.getenv("LLM_AGENT_POOL_SIZE", "4"))
+
+# Stream events that carry partial content (agno 1.x and later naming)
+CONTENT_EVENTS = {"RunResponse", "RunResponseContent", "RunContent"}
+
+TokenCallback = Callable[[str], None]
+
+_executor: Optional[ThreadPoolExecutor] = None
+# Model classes whose async path is unimplemented; they go straight to the executor
+_sync_only_models: set = set()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=LLM_EXECUTOR_WORKERS,
+            thread_name_prefix="llm"
+        )
+    return _executor
+
+
+def shutdown_llm_executor() -> None:
+    """Shut down the bounded executor used for sync-only providers."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def build_agent(model: Any, name: str, instructions: str) -> Any:
+    """Create an agno Agent for ``model``, or a MockAgent for the offline mock."""
+    if isinstance(model, MockModel):
+        return MockAgent(name=name, model=model, instructions=instructions)
+    return Agent(name=name, model=model, instructions=instructions, markdown=False)
+
+
+@dataclass
+class StreamedRun:
+    """Minimal stand-in for an agno run response assembled from a stream."""
+    content: str
+    metrics: Any = None
+
+
+async def run_agent(agent: Any, prompt: str, on_token: Optional[TokenCallback] = None) -> Any:
+    """
+    Run an agent on ``prompt`` without blocking the event loop.
+
+    Uses the agent's native async entry point when available, and falls
+    back to a bounded thread pool for providers that only support sync calls.
+    Token usage and estimated cost are added to the run bound in this
+    context (see ``agents.usage``). With RECORD_FIXTURES on, live exchanges
+    are appended to the LLM fixtures.
+
+    Args:
+        agent: agno Agent instance
+        prompt: User prompt to send
+        on_token: Optional callback receiving partial content as it streams.
+            Sync-only providers deliver the whole response in one call.
+
+    Returns:
+        The agent's run response
+    """
+    # "Hackathon Researcher" -> "researcher"
+    role = (getattr(agent, "name", None) or "agent").split()[-1].lower()
+    with span("llm", role):
+        response = await _run(agent, prompt, on_token)
+    model_id = str(getattr(getattr(agent, "model", None), "id", None) or "unknown")
+    usage = call_usage(model_id, prompt, response, getattr(agent, "instructions", None) or "")
+    record_usage(role, model_id, usage)
+    count("llm_tokens_total", usage.input_tokens, role=role, kind="input")
+    count("llm_tokens_total", usage.output_tokens, role=role, kind="output")
+    if usage.cost_usd:
+        count("llm_cost_usd_total", usage.cost_usd, role=role)
+    if not isinstance(agent, MockAgent):
+        record_llm(agent.name, prompt, response.content)
+    return response
+
+
+async def _run(agent: Any, prompt: str, on_token: Optional[TokenCallback]) -> Any:
+    model_type = type(getattr(agent, "model", None))
+    if LLM_ASYNC_MODE != "executor" and model_type not in _sync_only_models:
+        try:
+            if on_token is not None:
+                return await _stream_agent(agent, prompt, on_token)
+            return await agent.arun(prompt)
+        except NotImplementedError:
+            _sync_only_models.add(model_type)
+
+    loop = asyncio.get_running_loop()
+    response = await loop.run_in_executor(_get_executor(), agent.run, prompt)
+    if on_token is not None and response.content:
+        on_token(response.content)
+    return response
+
+
+async def _stream_agent(agent: Any, prompt: str, on_token: TokenCallback) -> StreamedRun:
+    # yield_run_output makes agno append the final run output, which carries the token metrics
+    stream = agent.arun(prompt, stream=True, yield_run_output=True)
+    if inspect.isawaitable(stream):
+        stream = await stream
+    parts = []
+    metrics = None
+    async for event in stream:
+        name = getattr(event, "event", None)
+        if name is None and hasattr(event, "metrics"):
+            # The final run output repeats the whole content; only its metrics are new
+            metrics = event.metrics
+            continue
+        if name is not None and name not in CONTENT_EVENTS:
+            continue
+        delta = getattr(event, "content", None)
+        if isinstance(delta, str) and delta:
+            parts.append(delta)
+            on_token(delta)
+    if metrics is None:
+        # agno 1.x keeps the finished run on the agent instead
+        metrics = getattr(getattr(agent, "run_response", None), "metrics", None)
+    return StreamedRun(content="".join(parts), metrics=metrics)
+
+
+class AgentPool:
+    """
+    Fixed-size pool of interchangeable agno agents.
+
+    agno agents keep per-run state on the instance, so concurrent sessions
+    must not share one. The pool hands each call its own agent, creating
+    them lazily up to ``size`` and queueing callers beyond that.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = LLM_AGENT_POOL_SIZE):
+        self._factory = factory
+        self.size = max(1, size)
+        self._created = 0
+        self._idle: asyncio.Queue = asyncio.Queue()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """Borrow an agent for the duration of the block."""
+        if self._idle.empty() and self._created < self.size:
+            self._created += 1
+            try:
+                agent = self._factory()
+            except Exception:
+                self._created -= 1
+                raise
+        else:
+            agent = await self._idle.get()
+        try:
+            yield agent
+        finally:
+            self._idle.put_nowait(agent)
+
+    async def run(self, prompt: str, on_token: Optional[TokenCallback] = None) -> Any:
+        """Run ``prompt`` on a pooled agent without blocking the event loop."""
+        async with self.acquire() as agent:
+            return await run_agent(agent, prompt, on_token=on_token)
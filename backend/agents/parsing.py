@@ -0,0 +1,209 @@
+"""JSON extraction and repair for model responses."""
+import json
+import os
+from typing import Any, Iterator, Optional, Sequence
+
+from metrics import span
+
+# Ask the model once to fix an unparseable reply before falling back
+LLM_REPAIR_RETRY = os.getenv("LLM_REPAIR_RETRY", "true").lower() == "true"
+# Longest reply sent back in a repair request
+REPAIR_MAX_CHARS = 6000
+
+REPAIR_PROMPT = """Your previous reply could not be parsed as JSON.
+
+Return ONLY the corrected JSON object - no prose, no markdown fences.
+Keep all of its content; just fix the syntax.
+
+Previous reply:
+{content}
+"""
+
+_CLOSERS = {"{": "}", "[": "]"}
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+# Characters that may close a string opened by each quote; typographic
+# quotes only count as delimiters outside string literals
+_STRING_CLOSERS = {
+    '"': '"',
+    "'": "'",
+    "“": '”“"',
+    "”": '”“"',
+    "‘": "’‘",
+    "’": "’‘",
+}
+
+
+def extract_json(text: str, required: Sequence[str] = ()) -> Optional[dict]:
+    """
+    Find the first JSON object in ``text`` that has all ``required`` keys.
+
+    Candidates are found with a single string-aware, balanced-brace scan,
+    so braces in surrounding prose or inside string values don't confuse
+    it. Each candidate is parsed as-is, then again after repair_json.
+
+    Args:
+        text: Raw model output, possibly wrapped in prose or markdown
+        required: Keys the object must contain to be accepted
+
+    Returns:
+        The parsed object, or None if no acceptable object was found
+    """
+    if not text:
+        return None
+    for candidate in _candidates(text):
+        for attempt in (candidate, None):
+            try:
+                data = json.loads(attempt if attempt is not None else repair_json(candidate))
+            except (json.JSONDecodeError, ValueError):
+                continue
+            if isinstance(data, dict) and all(key in data for key in required):
+                return data
+            break
+    return None
+
+
+def repair_json(text: str) -> str:
+    """
+    Fix common LLM JSON mistakes in one pass.
+
+    Handles single-quoted and typographically quoted (“ ” ‘ ’) strings,
+    raw newlines inside strings, Python
+    literals (True/False/None), // and # comments, trailing commas, and
+    brackets left open by a truncated reply.
+    """
+    out = []
+    stack = []
+    closers = None  # delimiters that end the string being copied, if any
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if closers is not None:
+            if ch == "\\" and i + 1 < n:
+                nxt = text[i + 1]
+                # \' is not a valid JSON escape
+                out.append(nxt if nxt == "'" else ch + nxt)
+                i += 2
+                continue
+            if ch in closers:
+                out.append('"')
+                closers = None
+            elif ch == '"':
+                out.append('\\"')
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch == "\t":
+                out.append("\\t")
+            elif ch != "\r":
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in _STRING_CLOSERS:
+            closers = _STRING_CLOSERS[ch]
+            out.append('"')
+        elif ch in "{[":
+            stack.append(_CLOSERS[ch])
+            out.append(ch)
+        elif ch in "}]":
+            _drop_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(ch)
+        elif ch == "#" or text.startswith("//", i):
+            while i < n and text[i] != "\n":
+                i += 1
+            continue
+        elif ch.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            if word in _LITERALS:
+                word = _LITERALS[word]
+            elif text[j:].lstrip().startswith(":"):
+                word = f'"{word}"'  # unquoted key
+            out.append(word)
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    if closers is not None:
+        out.append('"')
+    _drop_trailing_comma(out)
+    out.extend(reversed(stack))
+    return "".join(out)
+
+
+def repair_prompt(content: str) -> str:
+    """Prompt asking the model to re-emit ``content`` as valid JSON."""
+    return REPAIR_PROMPT.format(content=content[:REPAIR_MAX_CHARS])
+
+
+async def parse_or_repair(content: str, agents: Any, required: Sequence[str] = ()) -> Optional[dict]:
+    """
+    Extract a JSON object from ``content``, asking the model to fix it once if needed.
+
+    Args:
+        content: Raw model output
+        agents: AgentPool used for the repair request
+        required: Keys the object must contain to be accepted
+
+    Returns:
+        The parsed object, or None if the reply (and its repair) had none
+        or the repair request failed
+    """
+    with span("parse"):
+        data = extract_json(content, required)
+    if data is None and LLM_REPAIR_RETRY and content:
+        print("⚠️ Unparseable model reply, requesting a JSON-only repair")
+        try:
+            response = await agents.run(repair_prompt(content))
+        except Exception as e:
+            # The caller's fallback idea/evaluation beats failing the whole call
+            print(f"⚠️ JSON repair request failed: {e!r}")
+            return None
+        with span("parse"):
+            data = extract_json(response.content, required)
+    return data
+
+
+def _candidates(text: str) -> Iterator[str]:
+    """Yield top-level ``{...}`` spans in order; an unclosed tail is yielded last."""
+    depth = 0
+    start = -1
+    closers = None  # delimiters that end the string being scanned, if any
+    escaped = False
+    for i, ch in enumerate(text):
+        if closers is not None:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch in closers:
+                closers = None
+        elif ch in '"“”':
+            # Single quotes aren't tracked: they double as apostrophes
+            if depth:
+                closers = _STRING_CLOSERS[ch]
+        elif ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                yield text[start:i + 1]
+    if depth:
+        # Truncated reply: let repair_json close the brackets
+        yield text[start:]
+
+
+def _drop_trailing_comma(out: list) -> None:
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] == ",":
+        del out[j]
@@ -1,10 +1,22 @@
 """Researcher Agent - Stage 1 of the idea generation pipeline."""
-import json
-from typing import Optional
-from agno.agent import Agent
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
 
 from tools.serper import search_reddit, search_hackathon_winners, search_tech_blogs
-from config import get_model_config
+from tools.context import CONTEXT_TOKEN_BUDGET, build_context
+from config import get_fallback_models, get_role_models
+from .llm import TokenCallback
+from .parsing import parse_or_repair
+from .retrieval import RETRIEVAL_MODE, RetrievalIndex
+from .routing import ModelRouter
+
+# Deadline for a single search query, and for a whole set of queries
+SEARCH_QUERY_TIMEOUT = float(os.getenv("SEARCH_QUERY_TIMEOUT", "8"))
+SEARCH_BUDGET = float(os.getenv("SEARCH_BUDGET", "12"))
 
 
 RESEARCHER_SYSTEM_PROMPT = """You are an expert hackathon idea researcher. Your job is to discover winning hackathon ideas and real problems people face.
@@ -76,88 +88,199 @@ Respond with the idea in the specified JSON format.
 """
 
 
+@dataclass
+class SearchResults:
+    """Results of a concurrent search fan-out, keyed by source name."""
+    results: dict = field(default_factory=dict)
+    missing: list = field(default_factory=list)
+
+
 class ResearcherAgent:
     """Agent responsible for researching and generating hackathon ideas."""
     
-    def __init__(self):
-        model, model_id = get_model_config()
-        self.model_id = model_id
-        self.agent = Agent(
-            name="Hackathon Researcher",
-            model=model,
-            instructions=RESEARCHER_SYSTEM_PROMPT,
-            markdown=False,
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        retrieval: Optional[RetrievalIndex] = None,
+        retrieval_mode: str = RETRIEVAL_MODE
+    ):
+        models = get_role_models("researcher")
+        self.http_client = http_client
+        self.retrieval = retrieval
+        self.retrieval_mode = retrieval_mode if retrieval is not None else "off"
+        # Shared model clients, each with a pool of per-call agents; calls go to the fastest model
+        # and fail over (or hedge) to the next one
+        self.agents = ModelRouter(
+            models, "Hackathon Researcher", RESEARCHER_SYSTEM_PROMPT, fallbacks=get_fallback_models()
         )
+        self.model_id = self.agents.model_id
+    
+    def routing_stats(self) -> dict:
+        """Per-model latency and call counts for the researcher models."""
+        return {"researcher": self.agents.stats()}
     
-    async def search_for_problems(self, track: str, requirements: str = "") -> dict:
+    async def search_for_problems(self, track: str, requirements: str = "") -> SearchResults:
         """Search Reddit and blogs for real problems in the given domain."""
-        reddit_results = await search_reddit(f"{track} problem frustrating help needed")
-        blog_results = await search_tech_blogs(f"{track} challenges solutions")
-        
-        return {
-            "reddit": reddit_results,
-            "blogs": blog_results
-        }
+        return await self._search_with_retrieval(track, f"{track} {requirements}", lambda: {
+            "reddit": search_reddit(
+                f"{track} problem frustrating help needed", client=self.http_client
+            ),
+            "blogs": search_tech_blogs(
+                f"{track} challenges solutions", client=self.http_client
+            ),
+        })
     
-    async def search_for_winners(self, track: str, requirements: str = "") -> dict:
+    async def search_for_winners(self, track: str, requirements: str = "") -> SearchResults:
         """Search for winning hackathon projects in the domain."""
-        winner_results = await search_hackathon_winners(f"{track} {requirements}")
-        blog_results = await search_tech_blogs(f"{track} hackathon project innovative")
+        return await self._search_with_retrieval(track, f"{track} {requirements}", lambda: {
+            "winners": search_hackathon_winners(
+                f"{track} {requirements}", client=self.http_client
+            ),
+            "blogs": search_tech_blogs(
+                f"{track} hackathon project innovative", client=self.http_client
+            ),
+        })
+    
+    async def _search_with_retrieval(
+        self,
+        track: str,
+        query: str,
+        live_queries: Callable[[], Dict[str, Awaitable[dict]]]
+    ) -> SearchResults:
+        """
+        Combine live search with the local retrieval index per ``retrieval_mode``.
         
-        return {
-            "winners": winner_results,
-            "blogs": blog_results
+        "local" answers from the index alone, "mixed" adds it as an extra
+        source, and "fallback" consults it only when a live source is missing.
+        """
+        if self.retrieval_mode == "local":
+            return await self.run_searches({"local": self.retrieval.search(query, track)})
+        
+        queries = live_queries()
+        if self.retrieval_mode == "mixed":
+            queries["local"] = self.retrieval.search(query, track)
+        outcome = await self.run_searches(queries)
+        
+        if self.retrieval_mode == "fallback" and outcome.missing:
+            try:
+                outcome.results["local"] = await self.retrieval.search(query, track)
+                print(f"📚 Filled in for {', '.join(outcome.missing)} from the local idea index")
+            except Exception as e:
+                print(f"⚠️ Local retrieval failed: {e!r}")
+        return outcome
+    
+    async def run_searches(
+        self,
+        queries: Dict[str, Awaitable[dict]],
+        query_timeout: float = SEARCH_QUERY_TIMEOUT,
+        budget: float = SEARCH_BUDGET
+    ) -> SearchResults:
+        """
+        Run a set of searches concurrently, tolerating partial failure.
+        
+        Args:
+            queries: Mapping of source name to a pending search coroutine
+            query_timeout: Deadline in seconds for each individual query
+            budget: Overall deadline in seconds for the whole set
+        
+        Returns:
+            SearchResults with every source that answered in time, plus the
+            names of sources that timed out or errored
+        """
+        tasks = {
+            asyncio.ensure_future(asyncio.wait_for(query, query_timeout)): source
+            for source, query in queries.items()
         }
+        done, pending = await asyncio.wait(tasks, timeout=budget)
+        for task in pending:
+            task.cancel()
+        
+        outcome = SearchResults()
+        for task, source in tasks.items():
+            if task not in done:
+                print(f"⚠️ Search source '{source}' exceeded the search budget")
+            elif isinstance(task.exception(), asyncio.TimeoutError):
+                print(f"⚠️ Search source '{source}' timed out after {query_timeout}s")
+            elif task.exception() is not None:
+                print(f"⚠️ Search source '{source}' failed: {task.exception()!r}")
+            else:
+                outcome.results[source] = task.result()
+                continue
+            outcome.missing.append(source)
+        
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        return outcome
     
-    async def generate_idea_independent(self, track: str, requirements: str = "") -> dict:
+    async def generate_idea_independent(
+        self,
+        track: str,
+        requirements: str = "",
+        search: Optional[SearchResults] = None,
+        on_token: Optional[TokenCallback] = None
+    ) -> dict:
         """Generate idea based on problem discovery (Independent Mode)."""
-        search_results = await self.search_for_problems(track, requirements)
+        if search is None:
+            search = await self.search_for_problems(track, requirements)
         
+        query = f"{track} {requirements}"
+        # Split the context budget 60/40 between Reddit threads and blog posts
+        reddit_budget = CONTEXT_TOKEN_BUDGET * 3 // 5
         prompt = PROBLEM_DISCOVERY_PROMPT.format(
             track=track,
             requirements=requirements,
-            reddit_results=json.dumps(search_results["reddit"], indent=2)[:3000],
-            blog_results=json.dumps(search_results["blogs"], indent=2)[:2000]
+            reddit_results=build_context(search.results, query, reddit_budget, sources=["reddit"]),
+            blog_results=build_context(
+                search.results, query, CONTEXT_TOKEN_BUDGET - reddit_budget, sources=["blogs", "local"]
+            )
         )
         
-        response = self.agent.run(prompt)
-        return self._parse_idea_response(response.content)
+        response = await self.agents.run(prompt, on_token=on_token)
+        return await self._parse_idea_response(response.content)
     
     async def generate_idea_depth(
         self, 
         track: str, 
         problem_statement: str,
-        previous_ideas: list = None,
-        feedback: str = None
+        history: Optional[str] = None,
+        feedback: str = None,
+        search: Optional[SearchResults] = None,
+        variation: Optional[str] = None,
+        on_token: Optional[TokenCallback] = None
     ) -> dict:
-        """Generate idea based on winning projects research (Depth Mode)."""
-        search_results = await self.search_for_winners(track, problem_statement)
+        """
+        Generate idea based on winning projects research (Depth Mode).
+        
+        Args:
+            history: Rendered summary of earlier rejected ideas (see IdeaHistory)
+            feedback: Critique feedback on the idea being improved
+        """
+        if search is None:
+            search = await self.search_for_winners(track, problem_statement)
         
         prev_ideas_str = ""
-        if previous_ideas:
-            prev_ideas_str = f"\n\nPrevious ideas that didn't meet threshold:\n{json.dumps(previous_ideas, indent=2)}"
-            if feedback:
-                prev_ideas_str += f"\n\nCritique feedback: {feedback}"
+        if history:
+            prev_ideas_str = f"\n\nPrevious ideas that didn't meet threshold:\n{history}"
+        # Feedback may arrive before any idea was rejected, e.g. a duplicate note
+        if feedback:
+            prev_ideas_str += f"\n\nCritique feedback: {feedback}"
+        if variation:
+            prev_ideas_str += f"\n\nCreative direction: {variation}"
         
         prompt = IDEA_GENERATION_PROMPT.format(
             track=track,
             requirements=problem_statement + prev_ideas_str,
-            search_results=json.dumps(search_results, indent=2)[:4000]
+            search_results=build_context(search.results, f"{track} {problem_statement}")
         )
         
-        response = self.agent.run(prompt)
-        return self._parse_idea_response(response.content)
+        response = await self.agents.run(prompt, on_token=on_token)
+        return await self._parse_idea_response(response.content)
     
-    def _parse_idea_response(self, content: str) -> dict:
-        """Parse the JSON response from the agent."""
-        try:
-            # Try to extract JSON from the response
-            import re
-            json_match = re.search(r'\{[\s\S]*\}', content)
-            if json_match:
-                return json.loads(json_match.group())
-        except json.JSONDecodeError:
-            pass
+    async def _parse_idea_response(self, content: str) -> dict:
+        """Parse the JSON response from the agent, asking once for a repair if needed."""
+        idea = await parse_or_repair(content, self.agents)
+        if idea is not None:
+            return idea
         
         # Fallback structure if parsing fails
         return {
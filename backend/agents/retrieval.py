@@ -0,0 +1,236 @@
+"""Local retrieval index over seed and previously generated ideas."""
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from metrics import span
+from .similarity import SEED_IDEAS_PATH, embed, idea_text
+
+# off: live search only; local: index only; mixed: both; fallback: index only when a search source fails
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "fallback").lower()
+RETRIEVAL_INDEX_DIR = os.getenv("RETRIEVAL_INDEX_DIR", "data/retrieval")
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "8"))
+# Seconds between incremental refreshes from the idea store
+RETRIEVAL_REFRESH_INTERVAL = float(os.getenv("RETRIEVAL_REFRESH_INTERVAL", "60"))
+# Hashed feature dimensions per indexed idea (4 KB per idea at float32)
+RETRIEVAL_DIM = 1024
+
+# Bonus added to the similarity of ideas from the queried track
+TRACK_BOOST = 0.1
+# Rows scored per matrix-vector product, bounding memory on large indexes
+QUERY_CHUNK_ROWS = 65536
+# Ideas newer than this are left for the next refresh, so batched store writes can't be skipped
+STORE_SETTLE_SECONDS = 5.0
+
+_SNIPPET_CHARS = 300
+
+
+class RetrievalIndex:
+    """
+    Append-only, memory-mapped vector index of ideas.
+
+    Vectors are raw float32 rows in ``vectors.f32``, read through
+    ``np.memmap``, so the index is never loaded into process memory. The
+    matching records live one JSON per line in ``records.jsonl``; only
+    their byte offsets stay in memory. Refreshes append what the idea
+    store gained since the last cursor in ``meta.json``.
+    """
+
+    def __init__(self, store=None, directory: str = RETRIEVAL_INDEX_DIR, dim: int = RETRIEVAL_DIM):
+        self.store = store
+        self.dir = Path(directory)
+        self.dim = dim
+        self._vectors_path = self.dir / "vectors.f32"
+        self._records_path = self.dir / "records.jsonl"
+        self._meta_path = self.dir / "meta.json"
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._last_refresh = 0.0
+        self._meta: dict = {}
+        # (memmap or None, record offsets) - swapped as a unit after each refresh
+        self._view = (None, np.zeros(0, dtype=np.int64))
+        self._open()
+
+    def __len__(self) -> int:
+        return len(self._view[1])
+
+    # -- building -------------------------------------------------------
+
+    def _open(self) -> None:
+        """Load the on-disk index, rebuilding it if missing or inconsistent."""
+        try:
+            self._meta = json.loads(self._meta_path.read_text())
+            count = self._meta["count"]
+            consistent = (
+                self._meta.get("dim") == self.dim
+                and self._vectors_path.stat().st_size == count * self.dim * 4
+            )
+        except (OSError, ValueError, KeyError):
+            consistent = False
+        if not consistent:
+            self.rebuild()
+            return
+        offsets = []
+        position = 0
+        with open(self._records_path, "rb") as f:
+            for line in f:
+                offsets.append(position)
+                position += len(line)
+        self._remap(np.array(offsets[:count], dtype=np.int64))
+
+    def rebuild(self) -> None:
+        """Rebuild the index from the seed ideas and the whole idea store."""
+        with self._lock:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            self._vectors_path.write_bytes(b"")
+            self._records_path.write_bytes(b"")
+            self._meta = {"dim": self.dim, "count": 0, "cursor": None}
+            self._view = (None, np.zeros(0, dtype=np.int64))
+            try:
+                with open(SEED_IDEAS_PATH) as f:
+                    seeds = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Could not load seed ideas from {SEED_IDEAS_PATH}: {e}")
+                seeds = []
+            self._append([_record(idea, track="", score=None, origin="seed") for idea in seeds])
+        self.refresh()
+
+    def refresh(self) -> int:
+        """Append ideas stored since the last refresh. Returns how many were added."""
+        self._last_refresh = time.monotonic()
+        if self.store is None:
+            return 0
+        added = 0
+        with self._lock:
+            while True:
+                cursor = self._meta.get("cursor")
+                rows = self.store.ideas_since(
+                    after=tuple(cursor) if cursor else None,
+                    before=time.time() - STORE_SETTLE_SECONDS,
+                    limit=1000
+                )
+                if not rows:
+                    break
+                self._append([
+                    _record(row["idea"], track=row["track"], score=row["score"], origin=row["run_id"])
+                    for row in rows
+                ])
+                self._meta["cursor"] = [rows[-1]["created_at"], rows[-1]["id"]]
+                self._write_meta()
+                added += len(rows)
+        if added:
+            print(f"📚 Retrieval index: +{added} idea(s), {len(self)} total")
+        return added
+
+    async def maybe_refresh(self, interval: float = RETRIEVAL_REFRESH_INTERVAL) -> None:
+        """Refresh in the background if the last refresh is older than ``interval``."""
+        if self._refreshing or time.monotonic() - self._last_refresh < interval:
+            return
+        self._refreshing = True
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.refresh)
+        except Exception as e:
+            print(f"⚠️ Retrieval index refresh failed: {e!r}")
+        finally:
+            self._refreshing = False
+
+    def _append(self, records: List[dict]) -> None:
+        if not records:
+            return
+        vectors = np.stack([embed(record.pop("text"), self.dim) for record in records])
+        with open(self._vectors_path, "ab") as f:
+            f.write(vectors.astype(np.float32).tobytes())
+        lines = [json.dumps(record).encode() + b"\n" for record in records]
+        with open(self._records_path, "ab") as f:
+            start = f.tell()
+            f.write(b"".join(lines))
+        new_offsets = start + np.cumsum([0] + [len(line) for line in lines[:-1]], dtype=np.int64)
+        self._meta["count"] = self._meta.get("count", 0) + len(records)
+        self._write_meta()
+        self._remap(np.concatenate([self._view[1], new_offsets]))
+
+    def _write_meta(self) -> None:
+        tmp = self._meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._meta))
+        os.replace(tmp, self._meta_path)
+
+    def _remap(self, offsets: np.ndarray) -> None:
+        count = len(offsets)
+        vectors = None
+        if count:
+            vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+        self._view = (vectors, offsets)
+
+    # -- querying -------------------------------------------------------
+
+    def query(self, text: str, track: str = "", k: int = RETRIEVAL_TOP_K) -> List[dict]:
+        """
+        Return the ``k`` indexed ideas most similar to ``text``.
+
+        Similarity is the cosine of hashed bag-of-words vectors, computed
+        in chunks over the memory-mapped matrix, plus a small boost for
+        ideas from the same track.
+        """
+        vectors, offsets = self._view
+        if vectors is None or not len(offsets):
+            return []
+        q = embed(text, self.dim)
+        scores = np.empty(len(offsets), dtype=np.float32)
+        for start in range(0, len(offsets), QUERY_CHUNK_ROWS):
+            scores[start:start + QUERY_CHUNK_ROWS] = vectors[start:start + QUERY_CHUNK_ROWS] @ q
+
+        k = min(k, len(scores))
+        # Over-fetch so the track boost can reorder near-ties
+        candidates = np.argpartition(-scores, min(len(scores) - 1, k * 4))[:k * 4]
+        records = self._read_records(offsets[candidates])
+        for record, score in zip(records, scores[candidates]):
+            record["similarity"] = float(score) + (TRACK_BOOST if track and record["track"] == track else 0.0)
+        records.sort(key=lambda r: r["similarity"], reverse=True)
+        return records[:k]
+
+    async def search(self, text: str, track: str = "", k: int = RETRIEVAL_TOP_K) -> dict:
+        """Query off the event loop, shaped like a Serper response for the context builder."""
+        await self.maybe_refresh()
+        with span("retrieval"):
+            records = await asyncio.get_running_loop().run_in_executor(None, self.query, text, track, k)
+        return {
+            "organic": [
+                {
+                    "title": record["title"],
+                    "snippet": record["snippet"],
+                    "link": "",
+                    "position": position
+                }
+                for position, record in enumerate(records, start=1)
+            ]
+        }
+
+    def _read_records(self, offsets: np.ndarray) -> List[dict]:
+        records = []
+        with open(self._records_path, "rb") as f:
+            for offset in offsets:
+                f.seek(int(offset))
+                records.append(json.loads(f.readline()))
+        return records
+
+
+def _record(idea: dict, track: str, score: Optional[float], origin: str) -> dict:
+    snippet = " ".join(
+        str(idea.get(field) or "") for field in ("problem", "solution", "unique_angle")
+    ).strip()
+    if len(snippet) > _SNIPPET_CHARS:
+        snippet = snippet[:_SNIPPET_CHARS].rsplit(" ", 1)[0] + "…"
+    return {
+        "title": idea.get("title") or idea.get("name") or "Untitled",
+        "snippet": snippet,
+        "track": track,
+        "score": score,
+        "origin": origin,
+        "text": f"{track} {idea_text(idea)}"
+    }
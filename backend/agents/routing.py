@@ -0,0 +1,275 @@
+"""Latency-aware routing of an agent role's model calls, with deadlines, hedging and failover."""
+import asyncio
+import os
+import random
+import time
+from typing import Any, List, Optional, Sequence, Tuple
+
+from config import get_provider
+from metrics import count
+from tools.resilience import LLM_RETRY_ATTEMPTS, get_upstream
+from .llm import AgentPool, TokenCallback, build_agent, run_agent
+
+# Weight of the newest call in each model's moving latency average
+ROUTER_EWMA_ALPHA = float(os.getenv("ROUTER_EWMA_ALPHA", "0.3"))
+# Share of calls sent to a random model so every model's average stays current
+ROUTER_EXPLORE_RATE = float(os.getenv("ROUTER_EXPLORE_RATE", "0.05"))
+# A failed call counts as this multiple of the model's average latency
+ROUTER_FAILURE_PENALTY = 2.0
+# Deadline in seconds for a single model call (0 = none)
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "90"))
+# Seconds a call may run before the same prompt is also sent to the next model (0 = no hedging)
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "0"))
+
+
+class ModelTimeoutError(asyncio.TimeoutError):
+    """A model call missed its deadline (see LLM_CALL_TIMEOUT)."""
+
+
+class TokenGate:
+    """
+    Streams one call's tokens across its attempts without mixing answers.
+
+    Each attempt asks for a callback; once any token has gone out, later
+    attempts (failover, hedges) get None, so clients never see part of
+    one answer followed by another.
+    """
+
+    def __init__(self, on_token: Optional[TokenCallback]):
+        self.on_token = on_token
+        self.emitted = False
+
+    def callback(self) -> Optional[TokenCallback]:
+        if self.on_token is None or self.emitted:
+            return None
+
+        def forward(delta: str) -> None:
+            self.emitted = True
+            self.on_token(delta)
+        return forward
+
+
+class ModelRoute:
+    """One model a role can call, with its agent pool and latency estimate."""
+
+    def __init__(self, model: Any, model_id: str, pool: AgentPool):
+        self.model = model
+        self.model_id = model_id
+        self.pool = pool
+        # Shared by every model of the provider: rate limit, retries and circuit breaker
+        self.upstream = get_upstream(get_provider(model), LLM_RETRY_ATTEMPTS)
+        self.latency: Optional[float] = None  # moving average of seconds per call
+        self.inflight = 0
+        self.calls = 0
+        self.failures = 0
+
+    def observe(self, seconds: float, alpha: float) -> None:
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency = alpha * seconds + (1 - alpha) * self.latency
+
+    def expected_latency(self) -> float:
+        """Average latency scaled up by how busy the model's agent pool is."""
+        return (self.latency or 0.0) * (1 + self.inflight / self.pool.size)
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model_id,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "inflight": self.inflight,
+            "calls": self.calls,
+            "failures": self.failures
+        }
+
+
+class ModelRouter:
+    """
+    Routes each call for a role to the model expected to answer soonest.
+
+    Keeps an exponentially weighted moving average of call latency per
+    model and picks the lowest, scaled by how many calls that model already
+    has in flight. Models that haven't answered yet are tried first, and a
+    small share of calls goes to a random model so a model that was slow
+    once gets another chance.
+
+    Every call has a deadline and goes through its provider's rate limit,
+    retry policy and circuit breaker (see ``tools.resilience``). A call that
+    still errors, times out or finds the circuit open fails over to the
+    role's next model, then to the fallback models. With a hedge
+    delay, a call still running after that long is also sent to the next
+    model; the first answer wins and the other call is cancelled. Tokens
+    stream from the first call only: the hedge never streams, and once
+    any token was sent, failover calls don't either.
+
+    Has AgentPool's ``run``, so it works anywhere a pool does (including
+    ``parse_or_repair``).
+    """
+
+    def __init__(
+        self,
+        models: List[Tuple[Any, str]],
+        name: str,
+        instructions: str,
+        fallbacks: Sequence[Tuple[Any, str]] = (),
+        timeout: float = LLM_CALL_TIMEOUT,
+        hedge_delay: float = LLM_HEDGE_DELAY,
+        alpha: float = ROUTER_EWMA_ALPHA,
+        explore_rate: float = ROUTER_EXPLORE_RATE,
+        rng: Optional[random.Random] = None
+    ):
+        if not models:
+            raise ValueError(f"No models configured for {name}")
+
+        def route(model: Any, model_id: str) -> ModelRoute:
+            return ModelRoute(model, model_id, AgentPool(lambda: build_agent(model, name, instructions)))
+
+        self.routes = [route(model, model_id) for model, model_id in models]
+        primary = [model for model, _ in models]
+        self.fallbacks = [
+            route(model, model_id) for model, model_id in fallbacks
+            if not any(model is other for other in primary)
+        ]
+        # "Hackathon Critique" -> "critique", matching the llm span labels
+        self.role = name.split()[-1].lower()
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        self.alpha = alpha
+        self.explore_rate = explore_rate
+        self._rng = rng or random.Random()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        self.timeouts = 0
+
+    @property
+    def model_id(self) -> str:
+        """The role's models, comma-separated (e.g. for cache keys)."""
+        return ",".join(route.model_id for route in self.routes)
+
+    def pick(self) -> ModelRoute:
+        if len(self.routes) == 1:
+            return self.routes[0]
+        untried = [route for route in self.routes if route.latency is None]
+        if untried:
+            return min(untried, key=lambda route: route.inflight)
+        if self._rng.random() < self.explore_rate:
+            return self._rng.choice(self.routes)
+        return min(self.routes, key=ModelRoute.expected_latency)
+
+    def candidates(self) -> List[ModelRoute]:
+        """Models in the order a call tries them: the pick, the role's others by latency, then fallbacks."""
+        first = self.pick()
+        others = sorted((route for route in self.routes if route is not first), key=ModelRoute.expected_latency)
+        return [first, *others, *self.fallbacks]
+
+    async def run(self, prompt: str, on_token: Optional[TokenCallback] = None) -> Any:
+        """
+        Run ``prompt`` on the fastest model, hedging and failing over as configured.
+
+        Raises:
+            The last model's error if every model failed
+        """
+        self.calls += 1
+        count("llm_calls_total", role=self.role)
+        candidates = self.candidates()
+        gate = TokenGate(on_token)
+        while True:
+            route = candidates.pop(0)
+            try:
+                if self.hedge_delay > 0 and candidates:
+                    return await self._hedged(route, candidates, prompt, gate)
+                return await self._attempt(route, prompt, gate)
+            except Exception as e:
+                if not candidates:
+                    raise
+                self.failovers += 1
+                count("llm_failovers_total", role=self.role)
+                print(f"⚠️ {self.role} call to {route.model_id} failed ({e!r}), failing over to {candidates[0].model_id}")
+
+    async def _hedged(
+        self,
+        route: ModelRoute,
+        candidates: List[ModelRoute],
+        prompt: str,
+        gate: TokenGate
+    ) -> Any:
+        """Run on ``route``; past the hedge delay also on the next candidate, taking the first answer."""
+        primary = asyncio.ensure_future(self._attempt(route, prompt, gate))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+            if done:
+                return primary.result()
+
+            backup = candidates.pop(0)
+            self.hedges += 1
+            count("llm_hedges_total", role=self.role)
+            hedge = asyncio.ensure_future(self._attempt(backup, prompt, TokenGate(None)))
+            tasks.append(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = "primary" if task is primary else "hedge"
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        count("llm_hedge_wins_total", role=self.role, winner=winner)
+                        return task.result()
+            # Both failed; report the first call's error
+            raise primary.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _attempt(self, route: ModelRoute, prompt: str, gate: TokenGate) -> Any:
+        """
+        One call on ``route``'s pooled agent, under the deadline, timed for routing.
+
+        The provider's retries ask ``gate`` for a fresh callback, so a retry
+        after partial output runs without streaming.
+        """
+        route.inflight += 1
+        try:
+            async with route.pool.acquire() as agent:
+                start = time.perf_counter()
+                try:
+                    response = await route.upstream.call(
+                        lambda: self._deadline(run_agent(agent, prompt, on_token=gate.callback()), route)
+                    )
+                except Exception:
+                    route.failures += 1
+                    elapsed = time.perf_counter() - start
+                    route.observe(max(elapsed, (route.latency or elapsed) * ROUTER_FAILURE_PENALTY), self.alpha)
+                    raise
+                route.observe(time.perf_counter() - start, self.alpha)
+                return response
+        finally:
+            route.inflight -= 1
+            route.calls += 1
+
+    async def _deadline(self, call, route: ModelRoute) -> Any:
+        if not self.timeout:
+            return await call
+        try:
+            return await asyncio.wait_for(call, self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            count("llm_timeouts_total", role=self.role, model=route.model_id)
+            raise ModelTimeoutError(f"{route.model_id} did not answer within {self.timeout:g}s") from None
+
+    def stats(self) -> dict:
+        """Call, hedge, failover and timeout counts, plus per-model latency."""
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "timeouts": self.timeouts,
+            "models": [route.stats() for route in self.routes],
+            "fallbacks": [route.stats() for route in self.fallbacks]
+        }
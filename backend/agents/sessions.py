@@ -0,0 +1,181 @@
+"""Session registry - runs many forge sessions side by side."""
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Optional
+
+import httpx
+
+from .researcher import ResearcherAgent
+from .critique import CritiqueAgent
+from .forge import IdeaForge, ForgeUpdate
+from .retrieval import RetrievalIndex
+from store import IdeaStore, RunRecorder
+
+# Runs executing at once; further runs wait in a FIFO queue
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", "4"))
+# Runs allowed to wait for a slot before new ones are turned away
+MAX_QUEUED_RUNS = int(os.getenv("MAX_QUEUED_RUNS", "64"))
+# Finished sessions kept around for /api/status/{id}
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "256"))
+# Sessions that were created but never started are dropped after this many seconds
+SESSION_START_GRACE = 60.0
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the run queue is at capacity."""
+
+
+class SessionRegistry:
+    """
+    Registry of forge sessions sharing one set of agents.
+
+    Each run gets its own IdeaForge (and so its own ForgeState), addressed
+    by a session ID. The researcher and critique agents - and their pooled
+    model agents - are shared across sessions. A global semaphore caps how
+    many runs execute at once; the rest wait their turn.
+    """
+
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        store: Optional[IdeaStore] = None,
+        retrieval: Optional[RetrievalIndex] = None,
+        max_concurrent_runs: int = MAX_CONCURRENT_RUNS,
+        max_queued_runs: int = MAX_QUEUED_RUNS,
+        max_sessions: int = MAX_SESSIONS
+    ):
+        self.researcher = ResearcherAgent(http_client=http_client, retrieval=retrieval)
+        self.critique = CritiqueAgent()
+        self.store = store
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_queued_runs = max_queued_runs
+        self.max_sessions = max_sessions
+        self.sessions: "OrderedDict[str, IdeaForge]" = OrderedDict()
+        self._created_at: dict = {}
+        self._slots = asyncio.Semaphore(max_concurrent_runs)
+        self._active = 0
+        self._queued = 0
+
+    def create(self) -> IdeaForge:
+        """Create a new session and return its forge."""
+        if self._queued >= self.max_queued_runs and self._slots.locked():
+            raise QueueFullError("Run queue is full, try again later")
+        self._prune()
+        session_id = uuid.uuid4().hex[:12]
+        forge = IdeaForge(
+            researcher=self.researcher,
+            critique=self.critique,
+            session_id=session_id
+        )
+        self.sessions[session_id] = forge
+        self._created_at[session_id] = time.monotonic()
+        return forge
+
+    def get(self, session_id: str) -> Optional[IdeaForge]:
+        """Look up a session by ID."""
+        return self.sessions.get(session_id)
+
+    async def run_independent(self, forge: IdeaForge, **kwargs) -> dict:
+        """Run Independent Mode for ``forge`` once a slot is free."""
+        async with self._slot(forge):
+            recorder = RunRecorder(self.store, forge) if self.store else None
+            try:
+                result = await forge.run_independent(**kwargs)
+            except Exception:
+                if recorder:
+                    recorder.finish("error")
+                raise
+            if recorder:
+                recorder.finish("complete")
+            return result
+
+    def run_depth(self, forge: IdeaForge, **kwargs) -> AsyncGenerator[ForgeUpdate, None]:
+        """Run Depth Mode for ``forge`` once a slot is free, yielding its updates."""
+        return self._queued_stream(forge, forge.run_depth, **kwargs)
+
+    def stream_independent(self, forge: IdeaForge, **kwargs) -> AsyncGenerator[ForgeUpdate, None]:
+        """Run Independent Mode for ``forge`` once a slot is free, yielding its updates."""
+        return self._queued_stream(forge, forge.stream_independent, **kwargs)
+
+    def get_status(self) -> dict:
+        """Summarize the registry and every known session."""
+        return {
+            "status": "running" if self._active else "idle",
+            "active_runs": self._active,
+            "queued_runs": self._queued,
+            "max_concurrent_runs": self.max_concurrent_runs,
+            "models": {**self.researcher.routing_stats(), **self.critique.routing_stats()},
+            "sessions": [
+                {
+                    "session_id": session_id,
+                    "status": forge.get_status()["status"],
+                    "mode": forge.state.mode.value if forge.state else None,
+                    "track": forge.state.track if forge.state else None,
+                    "iteration": forge.state.current_iteration if forge.state else 0
+                }
+                for session_id, forge in self.sessions.items()
+            ]
+        }
+
+    async def _queued_stream(self, forge: IdeaForge, run, **kwargs) -> AsyncGenerator[ForgeUpdate, None]:
+        if self._slots.locked():
+            yield ForgeUpdate(
+                iteration=0,
+                stage="queued",
+                message=f"Waiting for a free slot ({self._queued + 1} run(s) queued)..."
+            )
+        async with self._slot(forge):
+            recorder = RunRecorder(self.store, forge) if self.store else None
+            status = None
+            updates = run(**kwargs)
+            try:
+                async for update in updates:
+                    if recorder:
+                        recorder.observe(update)
+                    yield update
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                # A client that stops reading must not leave the run's search prefetch behind
+                await updates.aclose()
+                if recorder:
+                    recorder.finish(status)
+
+    @asynccontextmanager
+    async def _slot(self, forge: IdeaForge) -> AsyncIterator[None]:
+        forge.queued = True
+        self._queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+            forge.queued = False
+        self._active += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._slots.release()
+
+    def _prune(self) -> None:
+        """Drop the oldest finished sessions once over ``max_sessions``."""
+        excess = len(self.sessions) - self.max_sessions + 1
+        if excess <= 0:
+            return
+        now = time.monotonic()
+        for session_id in list(self.sessions):
+            forge = self.sessions[session_id]
+            if forge.queued or (forge.state and forge.state.is_running):
+                continue
+            if not forge.state and now - self._created_at[session_id] < SESSION_START_GRACE:
+                continue
+            del self.sessions[session_id]
+            del self._created_at[session_id]
+            excess -= 1
+            if excess <= 0:
+                break
@@ -0,0 +1,131 @@
+"""Near-duplicate detection for generated ideas using hashed bag-of-words vectors."""
+import json
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Cosine similarity at or above which a new idea counts as a near-duplicate
+SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.85"))
+# Hashed feature dimensions per idea vector
+SIMILARITY_DIM = 4096
+
+SEED_IDEAS_PATH = Path(__file__).resolve().parent.parent / "seed_ideas.json"
+
+_WORD = re.compile(r"[a-z0-9]+")
+_TEXT_FIELDS = ("title", "problem", "solution", "unique_angle")
+
+_seed_index: Optional["IdeaIndex"] = None
+
+
+def idea_text(idea: dict) -> str:
+    """The parts of an idea that define it - not its name or self-reported scores."""
+    parts = [str(idea.get(field) or "") for field in _TEXT_FIELDS]
+    parts.extend(str(tech) for tech in idea.get("tech_stack") or [])
+    return " ".join(parts)
+
+
+def embed(text: str, dim: int = SIMILARITY_DIM) -> np.ndarray:
+    """
+    Embed text as an L2-normalized hashed bag of words and bigrams.
+
+    Counts are sublinear (sqrt) so a repeated buzzword doesn't dominate.
+    """
+    words = _WORD.findall(text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    vector = np.zeros(dim, dtype=np.float32)
+    if not features:
+        return vector
+    buckets = np.fromiter((zlib.crc32(f.encode()) % dim for f in features), dtype=np.int64, count=len(features))
+    np.add.at(vector, buckets, 1.0)
+    np.sqrt(vector, out=vector)
+    vector /= np.linalg.norm(vector)
+    return vector
+
+
+class IdeaIndex:
+    """
+    In-memory similarity index over ideas.
+
+    Vectors live in one growable matrix, so a lookup is a single
+    matrix-vector product against everything indexed so far.
+    """
+
+    def __init__(self, dim: int = SIMILARITY_DIM, capacity: int = 32):
+        self.dim = dim
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.labels: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def add(self, idea: dict, vector: Optional[np.ndarray] = None) -> None:
+        """Index an idea (optionally with its precomputed vector)."""
+        if vector is None:
+            vector = embed(idea_text(idea), self.dim)
+        if len(self.labels) == len(self._vectors):
+            grown = np.zeros((len(self._vectors) * 2, self.dim), dtype=np.float32)
+            grown[:len(self.labels)] = self._vectors
+            self._vectors = grown
+        self._vectors[len(self.labels)] = vector
+        self.labels.append(idea.get("title") or idea.get("name") or "Untitled")
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        """Return the label and cosine similarity of the closest indexed idea."""
+        if not self.labels:
+            return None, 0.0
+        scores = self._vectors[:len(self.labels)] @ vector
+        best = int(np.argmax(scores))
+        return self.labels[best], float(scores[best])
+
+    def copy(self) -> "IdeaIndex":
+        clone = IdeaIndex(self.dim, capacity=max(len(self._vectors), 1))
+        clone._vectors[:len(self.labels)] = self._vectors[:len(self.labels)]
+        clone.labels = list(self.labels)
+        return clone
+
+
+def load_seed_index(path: Path = SEED_IDEAS_PATH) -> IdeaIndex:
+    """Index of the bundled seed ideas, built once and copied per run."""
+    global _seed_index
+    if _seed_index is None:
+        index = IdeaIndex()
+        try:
+            with open(path) as f:
+                for idea in json.load(f):
+                    index.add(idea)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not load seed ideas from {path}: {e}")
+        _seed_index = index
+    return _seed_index.copy()
+
+
+class DuplicateFilter:
+    """
+    Flags generated ideas that are near-duplicates of seeds or earlier ideas.
+
+    Ideas that pass are added to the index, so later candidates - including
+    others from the same beam - are compared against them too.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.index = load_seed_index()
+
+    def check(self, idea: dict) -> Tuple[Optional[str], float]:
+        """
+        Check an idea against everything indexed so far.
+
+        Returns:
+            (title of the idea it duplicates, similarity) for a near-duplicate,
+            otherwise (None, best similarity) after indexing the idea
+        """
+        vector = embed(idea_text(idea), self.index.dim)
+        match, similarity = self.index.nearest(vector)
+        if match is not None and similarity >= self.threshold:
+            return match, similarity
+        self.index.add(idea, vector)
+        return None, similarity
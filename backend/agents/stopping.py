@@ -0,0 +1,185 @@
+"""Adaptive early stopping for depth runs, from the trajectory of critique scores."""
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+
+# Default stopping policy: "off" runs until PASS or max_iterations, "adaptive" also stops once PASS looks out of reach
+EARLY_STOP = os.getenv("EARLY_STOP", "off").lower()
+# Stop when the predicted chance of any remaining iteration reaching the threshold falls below this
+EARLY_STOP_CUTOFF = float(os.getenv("EARLY_STOP_CUTOFF", "0.05"))
+# Scored iterations needed before a run may be stopped early
+EARLY_STOP_MIN_ITERATIONS = int(os.getenv("EARLY_STOP_MIN_ITERATIONS", "3"))
+# Share of the score trend kept for each further iteration projected (1 = straight line)
+EARLY_STOP_TREND_DAMPING = float(os.getenv("EARLY_STOP_TREND_DAMPING", "0.5"))
+# Least score noise assumed (points), since even similar ideas are scored differently
+EARLY_STOP_MIN_SPREAD = float(os.getenv("EARLY_STOP_MIN_SPREAD", "0.5"))
+
+STOP_POLICIES = ("off", "adaptive")
+
+# Gauss-Hermite nodes and weights for averaging over a standard normal
+_QUADRATURE = (
+    (-2.856970, 0.011257),
+    (-1.355626, 0.222076),
+    (0.0, 0.533333),
+    (1.355626, 0.222076),
+    (2.856970, 0.011257),
+)
+
+
+def fit_trend(scores: List[float]) -> Tuple[float, float, float]:
+    """
+    Least-squares line through ``scores``, one point per iteration.
+
+    Returns:
+        (fitted score at the latest iteration, slope per iteration, residual standard deviation)
+    """
+    n = len(scores)
+    x_mean = (n - 1) / 2
+    y_mean = sum(scores) / n
+    sxx = sum((x - x_mean) ** 2 for x in range(n))
+    slope = sum((x - x_mean) * (y - y_mean) for x, y in enumerate(scores)) / sxx if sxx else 0.0
+    level = y_mean + slope * (n - 1 - x_mean)
+    spread = 0.0
+    if n > 2:
+        residuals = [y - (y_mean + slope * (x - x_mean)) for x, y in enumerate(scores)]
+        spread = math.sqrt(sum(r * r for r in residuals) / (n - 2))
+    return level, slope, spread
+
+
+def chance_to_reach(
+    scores: List[float],
+    threshold: float,
+    remaining: int,
+    damping: float = EARLY_STOP_TREND_DAMPING,
+    min_spread: float = EARLY_STOP_MIN_SPREAD
+) -> float:
+    """
+    Probability that at least one of the next ``remaining`` scores reaches ``threshold``.
+
+    Each future score is the fitted trend, projected with a damped slope,
+    plus independent normal noise of the residual spread. The trend's own
+    uncertainty is shared by every future iteration, so it is averaged
+    over rather than counted once per iteration.
+    """
+    if remaining <= 0 or not scores:
+        return 0.0
+    n = len(scores)
+    level, slope, spread = fit_trend(scores)
+    sigma = max(spread, min_spread)
+    x_mean = (n - 1) / 2
+    sxx = sum((x - x_mean) ** 2 for x in range(n))
+
+    # (projected mean, trend standard error) for each remaining iteration
+    projections = []
+    horizon = 0.0
+    for k in range(1, remaining + 1):
+        horizon += damping ** k
+        leverage = (n - 1 + horizon - x_mean) ** 2 / sxx if sxx else 0.0
+        projections.append((level + slope * horizon, sigma * math.sqrt(1 / n + leverage)))
+
+    chance = 0.0
+    for z, weight in _QUADRATURE:
+        miss = 1.0
+        for mean, error in projections:
+            miss *= 1 - _normal_sf((threshold - mean - z * error) / sigma)
+        chance += weight * (1 - miss)
+    return min(1.0, max(0.0, chance))
+
+
+def _normal_sf(z: float) -> float:
+    """P(Z >= z) for a standard normal Z."""
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+class EarlyStopper:
+    """
+    Decides when a depth run should give up on reaching its threshold.
+
+    Tracks the best ``overall_score`` of each scored iteration (and each
+    critique dimension of that idea), fits a trend, and estimates the
+    chance that any remaining iteration passes. Under the "adaptive"
+    policy the run stops once that chance falls below ``cutoff``. The
+    estimate is kept under "off" too, for the status endpoint.
+    """
+
+    def __init__(
+        self,
+        policy: str,
+        threshold: float,
+        max_iterations: int,
+        cutoff: float = EARLY_STOP_CUTOFF,
+        min_iterations: int = EARLY_STOP_MIN_ITERATIONS
+    ):
+        if policy not in STOP_POLICIES:
+            raise ValueError(f"Unknown early stop policy '{policy}' (expected one of {', '.join(STOP_POLICIES)})")
+        self.policy = policy
+        self.threshold = threshold
+        self.max_iterations = max_iterations
+        self.cutoff = cutoff
+        self.min_iterations = max(2, min_iterations)
+        self.scores: List[float] = []
+        self.dimensions: Dict[str, List[float]] = {}
+        self.probability: Optional[float] = None
+        self.remaining = max_iterations
+        self.iterations_saved = 0
+
+    def observe(self, iteration: int, evaluation: dict) -> bool:
+        """
+        Record the best evaluation of ``iteration``.
+
+        Returns:
+            True if the run should stop now
+        """
+        self.remaining = self.max_iterations - iteration
+        score = evaluation.get("overall_score", 0)
+        # A score of 0 is the placeholder for an unparseable critique, not a real data point
+        if not isinstance(score, (int, float)) or score <= 0:
+            return False
+        self.scores.append(float(score))
+        for name, value in (evaluation.get("scores") or {}).items():
+            if isinstance(value, (int, float)) and value > 0:
+                self.dimensions.setdefault(name, []).append(float(value))
+
+        if len(self.scores) < self.min_iterations or self.remaining <= 0:
+            return False
+        self.probability = chance_to_reach(self.scores, self.threshold, self.remaining)
+        if self.policy == "adaptive" and self.probability < self.cutoff:
+            self.iterations_saved = self.remaining
+            return True
+        return False
+
+    def weakest(self, limit: int = 2) -> List[Tuple[str, float, float]]:
+        """The ``limit`` dimensions with the lowest fitted level, as (name, level, slope)."""
+        fitted = []
+        for name, values in self.dimensions.items():
+            level, slope, _ = fit_trend(values)
+            fitted.append((name, level, slope))
+        return sorted(fitted, key=lambda entry: entry[1])[:limit]
+
+    def describe(self) -> str:
+        """Why the run stopped, for the "early_stopped" update."""
+        _, slope, _ = fit_trend(self.scores)
+        recent = ", ".join(f"{score:g}" for score in self.scores[-6:])
+        note = (
+            f"{self.probability:.0%} chance of reaching {self.threshold}/10 in the remaining "
+            f"{self.remaining} iteration(s) (scores {recent}, trend {slope:+.2f}/iteration"
+        )
+        weakest = self.weakest()
+        if weakest:
+            note += "; weakest: " + ", ".join(f"{name} {level:.1f} ({trend:+.2f})" for name, level, trend in weakest)
+        return note + ")"
+
+    def stats(self) -> dict:
+        trend = fit_trend(self.scores) if self.scores else None
+        return {
+            "policy": self.policy,
+            "cutoff": self.cutoff,
+            "scores": list(self.scores),
+            "trend": round(trend[1], 3) if trend else None,
+            "probability": round(self.probability, 4) if self.probability is not None else None,
+            "dimensions": {
+                name: {"level": round(level, 2), "trend": round(slope, 3)}
+                for name, level, slope in self.weakest(len(self.dimensions))
+            },
+            "iterations_saved": self.iterations_saved
+        }
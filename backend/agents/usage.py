@@ -0,0 +1,166 @@
+"""Token and cost accounting for model calls, per call, per iteration and per run."""
+import os
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import estimate_cost
+from tools.context import count_tokens
+
+# Default per-run token budget for depth runs (0 = unlimited)
+RUN_TOKEN_BUDGET = int(os.getenv("RUN_TOKEN_BUDGET", "0"))
+# Calls kept in a run's call log
+MAX_CALLS_PER_RUN = 500
+
+
+@dataclass
+class Usage:
+    """Token counts and estimated cost of one or more model calls."""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: Optional[float] = 0.0  # None once any call's model had no price
+    calls: int = 0
+    estimated: bool = False  # some counts were estimated locally, not reported by the provider
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add(self, other: "Usage") -> None:
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        if self.cost_usd is None or other.cost_usd is None:
+            self.cost_usd = None
+        else:
+            self.cost_usd += other.cost_usd
+        self.calls += other.calls
+        self.estimated = self.estimated or other.estimated
+
+    def to_dict(self) -> dict:
+        return {
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.total_tokens,
+            "cost_usd": round(self.cost_usd, 6) if self.cost_usd is not None else None,
+            "calls": self.calls,
+            "estimated": self.estimated
+        }
+
+
+def reported_tokens(metrics: Any) -> Optional[Tuple[int, int]]:
+    """
+    (input, output) token counts from an agno response's ``metrics``.
+
+    agno 2.x and later expose a metrics object with ``input_tokens`` and
+    ``output_tokens``; agno 1.x uses a dict whose values are lists with
+    one entry per model request.
+
+    Returns:
+        The counts, or None if the provider reported no usage
+    """
+    if metrics is None:
+        return None
+    if isinstance(metrics, dict):
+        get = metrics.get
+    else:
+        def get(key, default=None):
+            return getattr(metrics, key, default)
+
+    def total(*keys) -> int:
+        for key in keys:
+            value = get(key)
+            if isinstance(value, (list, tuple)):
+                value = sum(v for v in value if isinstance(v, (int, float)))
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value:
+                return int(value)
+        return 0
+
+    counts = total("input_tokens", "prompt_tokens"), total("output_tokens", "completion_tokens")
+    return counts if any(counts) else None
+
+
+def call_usage(model_id: str, prompt: str, response: Any, instructions: str = "") -> Usage:
+    """
+    Usage of one model call, estimated from the text when the provider didn't report it.
+
+    Args:
+        model_id: Model the call went to, for pricing
+        prompt: User prompt sent
+        response: The agent's run response
+        instructions: System instructions sent along with the prompt
+    """
+    counts = reported_tokens(getattr(response, "metrics", None))
+    estimated = counts is None
+    if estimated:
+        content = getattr(response, "content", None)
+        counts = (
+            count_tokens(instructions or "") + count_tokens(prompt),
+            count_tokens(content if isinstance(content, str) else "")
+        )
+    input_tokens, output_tokens = counts
+    return Usage(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cost_usd=estimate_cost(model_id, input_tokens, output_tokens),
+        calls=1,
+        estimated=estimated
+    )
+
+
+class RunUsage:
+    """
+    Model usage accumulated by one forge run.
+
+    The forge sets ``iteration`` as each depth iteration starts, so calls
+    are attributed to the iteration that made them.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.total = Usage()
+        self.by_iteration: Dict[int, Usage] = {}
+        self.calls: List[dict] = []
+        self.iteration = 0
+
+    def record(self, role: str, model_id: str, usage: Usage) -> None:
+        self.total.add(usage)
+        self.by_iteration.setdefault(self.iteration, Usage()).add(usage)
+        if len(self.calls) < MAX_CALLS_PER_RUN:
+            self.calls.append({"iteration": self.iteration, "role": role, "model": model_id, **usage.to_dict()})
+
+    def snapshot(self) -> dict:
+        """Run totals plus the current iteration's totals, for a ForgeUpdate."""
+        return {**self.total.to_dict(), "iteration": self.by_iteration.get(self.iteration, Usage()).to_dict()}
+
+    def summary(self) -> dict:
+        """Run totals, per-iteration totals and the call log, for the status endpoint."""
+        return {
+            "totals": self.total.to_dict(),
+            "by_iteration": {iteration: usage.to_dict() for iteration, usage in sorted(self.by_iteration.items())},
+            "calls": list(self.calls)
+        }
+
+
+_current_usage: ContextVar[Optional[RunUsage]] = ContextVar("current_usage", default=None)
+
+
+def bind_usage(usage: RunUsage) -> Token:
+    """Attribute model calls in this context (and tasks it creates) to ``usage``."""
+    return _current_usage.set(usage)
+
+
+def unbind_usage(token: Token) -> None:
+    try:
+        _current_usage.reset(token)
+    except ValueError:
+        # Finalized from another context (e.g. a garbage-collected generator)
+        pass
+
+
+def record_usage(role: str, model_id: str, usage: Usage) -> None:
+    """Add one call's usage to the run bound in this context, if any."""
+    run = _current_usage.get()
+    if run is not None:
+        run.record(role, model_id, usage)
@@ -0,0 +1 @@
+"""Benchmarks for Idea Forge. Run as modules from the backend directory."""
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Benchmark: end-to-end latency and throughput of the API against mock providers.
+
+Runs the FastAPI app under uvicorn on its own event loop in a background
+thread, with ``USE_MOCK=true`` so every search and model call goes to the
+offline stand-ins (see ``mocks/``). Drives ``/api/independent``,
+``/api/independent/stream`` and ``/api/depth`` with ``--runs`` runs each at
+``--concurrency``, and reports time to first event, per-stage latency,
+p50/p95/p99 run latency, runs/s and the server loop's lag.
+
+Usage (from backend/):
+    python -m benchmarks.bench_e2e --runs 50 --concurrency 10
+    python -m benchmarks.bench_e2e --save results/e2e.json
+    python -m benchmarks.bench_e2e --compare results/e2e.json
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from .common import (
+    DEFAULT_TOLERANCE,
+    LoopLagMonitor,
+    compare_results,
+    distribution,
+    report_regressions,
+    save_results,
+)
+
+SCENARIOS = {
+    "independent": "/api/independent",
+    "independent-stream": "/api/independent/stream",
+    "depth": "/api/depth",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def configure_environment(args) -> None:
+    """Point the app at the mock providers before it is imported."""
+    os.environ["USE_MOCK"] = "true"
+    os.environ["MOCK_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["MOCK_SEARCH_LATENCY_MS"] = str(args.search_latency_ms)
+    os.environ.setdefault("MOCK_SEED", "benchmark")
+    os.environ.setdefault("STORE_ENABLED", "false")
+    os.environ.setdefault("RETRIEVAL_MODE", "off")
+    os.environ.setdefault("MAX_CONCURRENT_RUNS", str(args.concurrency))
+    os.environ.setdefault("MAX_QUEUED_RUNS", str(max(64, args.concurrency * 2)))
+
+
+class ServerThread:
+    """uvicorn serving the app on a separate event loop, so client work doesn't skew loop lag."""
+
+    def __init__(self, port: int):
+        import uvicorn
+        import main
+
+        self.port = port
+        self.server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+        self.loop = asyncio.new_event_loop()
+        self.lag = LoopLagMonitor()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def _serve(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.create_task(self.lag.run())
+        self.loop.run_until_complete(self.server.serve())
+
+    def start(self) -> None:
+        self._thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self.lag.stop()
+        self.server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+def stage_latencies(stages: list) -> dict:
+    """Time from each status update to the next one, keyed by the earlier stage."""
+    latencies = defaultdict(list)
+    for (start, stage), (end, _) in zip(stages, stages[1:]):
+        latencies[stage].append(end - start)
+    return latencies
+
+
+async def run_one(client, url: str, payload: dict, streaming: bool) -> dict:
+    """One run; streaming endpoints also yield TTFE and stage timings."""
+    from verify_stream import read_stream
+
+    if streaming:
+        stats = await read_stream(client, url, payload)
+        failed = any(stage == "error" for _, stage in stats["stages"])
+        return {"duration": stats["duration"], "ttfe": stats["ttfe"], "stages": stats["stages"], "failed": failed}
+
+    start = time.perf_counter()
+    response = await client.post(url, json=payload, timeout=120)
+    duration = time.perf_counter() - start
+    return {"duration": duration, "ttfe": None, "stages": [], "failed": response.status_code != 200}
+
+
+async def run_scenario(base_url: str, scenario: str, args, server: ServerThread) -> dict:
+    import httpx
+
+    url = base_url + SCENARIOS[scenario]
+    streaming = scenario != "independent"
+
+    def payload(i: int) -> dict:
+        # A distinct track per run keeps the search and critique caches from turning runs into hits
+        body = {"track": f"Benchmark track {i}", "stream_tokens": args.tokens}
+        if scenario == "depth":
+            body.update(
+                problem_statement="End-to-end throughput",
+                threshold=args.threshold,
+                max_iterations=args.iterations,
+                beam_width=args.beam_width,
+            )
+        return body
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    runs = []
+
+    async def one(i: int):
+        async with semaphore:
+            try:
+                runs.append(await run_one(client, url, payload(i), streaming))
+            except Exception as e:
+                print(f"⚠️ {scenario} run {i} failed: {e!r}")
+                runs.append({"duration": None, "ttfe": None, "stages": [], "failed": True})
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        await run_one(client, url, payload(-1), streaming)  # warm-up
+        server.lag.reset()
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.runs)))
+        wall = time.perf_counter() - start
+
+    ok = [run for run in runs if not run["failed"] and run["duration"] is not None]
+    stages = defaultdict(list)
+    for run in ok:
+        for stage, values in stage_latencies(run["stages"]).items():
+            stages[stage].extend(values)
+
+    return {
+        "name": scenario,
+        "runs": len(runs),
+        "errors": len(runs) - len(ok),
+        "concurrency": args.concurrency,
+        "wall_s": round(wall, 3),
+        "runs_per_s": round(len(ok) / wall, 2),
+        "latency_ms": distribution([run["duration"] for run in ok]),
+        "ttfe_ms": distribution([run["ttfe"] for run in ok if run["ttfe"] is not None]),
+        "stage_ms": {stage: distribution(values) for stage, values in sorted(stages.items())},
+        "loop_lag_ms": distribution(list(server.lag.samples)),
+    }
+
+
+def print_result(result: dict) -> None:
+    latency, ttfe, lag = result["latency_ms"], result["ttfe_ms"], result["loop_lag_ms"]
+    print(
+        f"\n{result['name']}: {result['runs']} runs x{result['concurrency']}  "
+        f"{result['wall_s']:.2f}s  {result['runs_per_s']:.2f} runs/s  errors {result['errors']}"
+    )
+    if latency:
+        print(f"  run latency   p50 {latency['p50']:>9.1f}ms  p95 {latency['p95']:>9.1f}ms  p99 {latency['p99']:>9.1f}ms")
+    if ttfe:
+        print(f"  first event   p50 {ttfe['p50']:>9.1f}ms  p95 {ttfe['p95']:>9.1f}ms  p99 {ttfe['p99']:>9.1f}ms")
+    for stage, stats in result["stage_ms"].items():
+        print(f"  {stage:<13} p50 {stats['p50']:>9.1f}ms  p95 {stats['p95']:>9.1f}ms  p99 {stats['p99']:>9.1f}ms")
+    if lag:
+        print(f"  loop lag      p50 {lag['p50']:>9.2f}ms  p99 {lag['p99']:>9.2f}ms  max {lag['max']:>9.2f}ms")
+
+
+async def main_async(args) -> list:
+    port = _free_port()
+    server = ServerThread(port)
+    server.start()
+    results = []
+    try:
+        for scenario in args.scenarios:
+            result = await run_scenario(f"http://127.0.0.1:{port}", scenario, args, server)
+            print_result(result)
+            results.append(result)
+    finally:
+        server.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end API benchmark against mock providers")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--runs", "-n", type=int, default=50, help="Runs per scenario")
+    parser.add_argument("--concurrency", "-c", type=int, default=10, help="Runs in flight")
+    parser.add_argument("--iterations", "-i", type=int, default=3, help="Depth iterations per run")
+    parser.add_argument("--beam-width", "-b", type=int, default=1, help="Depth candidates per iteration")
+    parser.add_argument("--threshold", type=int, default=9, help="Depth score threshold (high = more iterations)")
+    parser.add_argument("--tokens", action="store_true", help="Stream token events")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="Mean mock model latency")
+    parser.add_argument("--search-latency-ms", type=float, default=100.0, help="Mean mock search latency")
+    parser.add_argument("--save", metavar="PATH", help="Write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="Fail on regressions against saved results")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    results = asyncio.run(main_async(args))
+    config = {key: value for key, value in vars(args).items() if key not in ("save", "compare", "tolerance")}
+    if args.save:
+        save_results(args.save, "e2e", results, config)
+    if args.compare:
+        sys.exit(report_regressions(compare_results(results, args.compare, args.tolerance), args.compare))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark: micro-benchmarks for the per-iteration hot paths.
+
+Times response parsing (clean, prose-wrapped and truncated replies),
+prompt building (search context packing, history rendering, prompt
+formatting) and SSE serialization (status and token updates, coalescing)
+in-process, with no server or providers involved.
+
+Usage (from backend/):
+    python -m benchmarks.bench_micro
+    python -m benchmarks.bench_micro --save results/micro.json
+    python -m benchmarks.bench_micro --compare results/micro.json
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from .common import DEFAULT_TOLERANCE, compare_results, distribution, report_regressions, save_results
+
+
+def build_cases() -> dict:
+    """Name -> zero-argument callable for every hot path."""
+    from agents.forge import ForgeUpdate
+    from agents.history import IdeaHistory
+    from agents.parsing import extract_json
+    from agents.researcher import IDEA_GENERATION_PROMPT
+    from mocks.provider import synthetic_evaluation, synthetic_idea
+    from mocks.serper_stub import synthetic_search
+    from sse import coalesce, encode_update
+    from tools.context import build_context
+
+    rng = random.Random(0)
+    idea = synthetic_idea(rng, "Healthcare")
+    evaluation = synthetic_evaluation(rng)
+    reply = json.dumps(idea, indent=2)
+    wrapped = f"Sure! Here is an idea {{as requested}}:\n```json\n{reply}\n```\nLet me know if you want changes."
+    truncated = reply.replace('"', "'")[:-40]
+
+    results = {
+        "reddit": synthetic_search("site:reddit.com healthcare clinic wait times problem", 10),
+        "blogs": synthetic_search("healthcare clinic wait times challenges solutions", 10),
+        "winners": synthetic_search("healthcare hackathon winner project devpost", 10),
+    }
+    query = "Healthcare clinic wait times"
+    history = IdeaHistory()
+    for _ in range(20):
+        history.add(synthetic_idea(rng, "Healthcare"), synthetic_evaluation(rng))
+
+    def build_prompt():
+        return IDEA_GENERATION_PROMPT.format(
+            track="Healthcare",
+            requirements=query + history.render(),
+            search_results=build_context(results, query)
+        )
+
+    status = ForgeUpdate(iteration=3, stage="rejected", idea=idea, evaluation=evaluation, message="Score 6.5/10")
+    token = ForgeUpdate(iteration=3, stage="token", agent="researcher", delta="tok ")
+    tokens = [
+        ForgeUpdate(iteration=3, stage="token", agent=("researcher", "critique")[i % 2], delta="tok ")
+        for i in range(64)
+    ]
+
+    return {
+        "parse.clean": lambda: extract_json(reply),
+        "parse.wrapped": lambda: extract_json(wrapped),
+        "parse.repair": lambda: extract_json(truncated),
+        "prompt.context": lambda: build_context(results, query),
+        "prompt.history": lambda: history.render(),
+        "prompt.full": build_prompt,
+        "serialize.status": lambda: encode_update("session", status),
+        "serialize.token": lambda: encode_update("session", token),
+        "serialize.coalesce64": lambda: coalesce(tokens),
+    }
+
+
+def time_case(fn, duration: float, batch: int = 0) -> dict:
+    """
+    Time ``fn`` in batches for about ``duration`` seconds.
+
+    The batch size is calibrated so each batch takes ~1ms, which keeps
+    timer overhead out of fast cases while still giving a distribution.
+    """
+    if not batch:
+        batch = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(batch):
+                fn()
+            if time.perf_counter() - start > 0.001 or batch >= 1 << 20:
+                break
+            batch *= 2
+
+    samples = []
+    calls = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        for _ in range(batch):
+            fn()
+        samples.append((time.perf_counter() - start) / batch)
+        calls += batch
+
+    stats = distribution(samples, scale=1e6, digits=3)
+    return {
+        "calls": calls,
+        "ops_per_s": round(1 / (sum(samples) / len(samples))),
+        "p50_us": stats["p50"],
+        "p99_us": stats["p99"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path micro-benchmarks")
+    parser.add_argument("--duration", "-d", type=float, default=0.5, help="Seconds per case")
+    parser.add_argument("--filter", "-k", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--save", metavar="PATH", help="Write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="Fail on regressions against saved results")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    results = []
+    for name, fn in build_cases().items():
+        if args.filter not in name:
+            continue
+        result = {"name": name, **time_case(fn, args.duration)}
+        results.append(result)
+        print(
+            f"{name:<22} {result['ops_per_s']:>10} ops/s  "
+            f"p50 {result['p50_us']:>9.2f}us  p99 {result['p99_us']:>9.2f}us"
+        )
+
+    if args.save:
+        save_results(args.save, "micro", results, {"duration": args.duration})
+    if args.compare:
+        sys.exit(report_regressions(compare_results(results, args.compare, args.tolerance), args.compare))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Benchmark: per-request Serper clients vs the shared pooled client.
+
+Starts a local stub of the Serper API and issues the same queries twice:
+once opening a fresh ``httpx.AsyncClient`` per query (the old behaviour) and
+once through the pooled client from ``tools.serper``.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serper --requests 200 --concurrency 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from mocks import start_stub_server
+
+
+async def run_batch(search, total: int, concurrency: int) -> list:
+    """Run ``total`` searches with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await search(f"benchmark query {i}")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return latencies
+
+
+def summarize(name: str, latencies: list, wall: float) -> dict:
+    """Print and return latency statistics for one mode."""
+    ordered = sorted(latencies)
+    stats = {
+        "mode": name,
+        "requests": len(ordered),
+        "wall_s": round(wall, 3),
+        "req_per_s": round(len(ordered) / wall, 1),
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 2),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+    }
+    print(
+        f"{name:<12} {stats['requests']:>5} req  {stats['wall_s']:>7.3f}s  "
+        f"{stats['req_per_s']:>8.1f} req/s  p50 {stats['p50_ms']:>7.2f}ms  "
+        f"p95 {stats['p95_ms']:>7.2f}ms"
+    )
+    return stats
+
+
+async def main_async(args) -> list:
+    server = start_stub_server(args.latency_ms, args.failure_rate)
+    host, port = server.server_address
+    os.environ["SERPER_BASE_URL"] = f"http://{host}:{port}"
+    os.environ.setdefault("SERPER_API_KEY", "benchmark")
+
+    import httpx
+    from tools import serper
+
+    async def per_request(query: str):
+        # Mirrors the pre-pooling implementation
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{serper.SERPER_BASE_URL}/search",
+                json={"q": query, "num": 10},
+                headers={"X-API-KEY": serper.SERPER_API_KEY},
+            )
+            response.raise_for_status()
+            return response.json()
+
+    results = []
+    try:
+        start = time.perf_counter()
+        latencies = await run_batch(per_request, args.requests, args.concurrency)
+        results.append(summarize("per-request", latencies, time.perf_counter() - start))
+
+        async with serper.create_search_client(max_connections=args.concurrency) as client:
+            async def pooled(query: str):
+                return await serper.search_web(query, client=client)
+
+            await pooled("warmup")
+            start = time.perf_counter()
+            latencies = await run_batch(pooled, args.requests, args.concurrency)
+            results.append(summarize("pooled", latencies, time.perf_counter() - start))
+    finally:
+        server.shutdown()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serper client pooling benchmark")
+    parser.add_argument("--requests", "-n", type=int, default=200, help="Searches per mode")
+    parser.add_argument("--concurrency", "-c", type=int, default=10, help="Searches in flight")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated server latency")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of stub 503s")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Benchmark: SSE transport throughput for /api/depth.
+
+Runs the FastAPI app in-process under uvicorn with instant stand-in agents
+that stream ``--tokens`` tokens per model call, then opens ``--streams``
+concurrent depth-mode streams using verify_stream.read_stream. Reports
+events/s, time to first event and bytes on the wire, with and without gzip.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sse --streams 20 --iterations 5 --tokens 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import time
+
+os.environ["SSE_GZIP"] = "true"
+os.environ.setdefault("STORE_ENABLED", "false")
+os.environ.setdefault("RETRIEVAL_MODE", "off")
+# The stand-in agents never call a provider, but the app needs one configured
+os.environ["USE_MOCK"] = "true"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def install_stand_ins(registry, tokens: int, token_delay: float) -> None:
+    """Replace the registry's search and model calls with instant fakes."""
+    from agents.researcher import SearchResults
+
+    async def emit(on_token, text: str):
+        if on_token is None:
+            return
+        for i in range(tokens):
+            on_token(text[i % len(text)])
+            if token_delay:
+                await asyncio.sleep(token_delay)
+            elif i % 50 == 0:
+                await asyncio.sleep(0)
+
+    async def search(*args, **kwargs):
+        return SearchResults(results={"winners": {"organic": []}})
+
+    async def generate(*args, on_token=None, **kwargs):
+        await emit(on_token, "generating idea ")
+        return {"name": "bench_idea", "title": "Benchmark Idea", "tech_stack": ["python"] * 5}
+
+    async def evaluate(idea, threshold=7, on_token=None, **kwargs):
+        await emit(on_token, "scoring ")
+        return {"scores": {"innovation": 5}, "overall_score": 5, "verdict": "FAIL",
+                "weaknesses": ["benchmark"], "improvement_suggestions": ["none"]}
+
+    registry.researcher.search_for_winners = search
+    registry.researcher.generate_idea_depth = generate
+    registry.critique.evaluate_idea = evaluate
+
+
+async def run_streams(url: str, payload: dict, streams: int, gzip: bool) -> dict:
+    import httpx
+    from verify_stream import read_stream
+
+    headers = {"Accept-Encoding": "gzip" if gzip else "identity"}
+    async with httpx.AsyncClient(timeout=120) as client:
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(read_stream(client, url, payload, headers=headers) for _ in range(streams))
+        )
+        wall = time.perf_counter() - start
+
+    events = sum(r["events"] for r in results)
+    ttfe = sorted(r["ttfe"] for r in results if r["ttfe"] is not None)
+    return {
+        "gzip": gzip,
+        "streams": streams,
+        "events": events,
+        "token_events": sum(r["token_events"] for r in results),
+        "wall_s": round(wall, 3),
+        "events_per_s": round(events / wall, 1),
+        "ttfe_p50_ms": round(statistics.median(ttfe) * 1000, 2),
+        "ttfe_max_ms": round(ttfe[-1] * 1000, 2),
+        "bytes_per_stream": int(statistics.mean(r["bytes"] for r in results)),
+    }
+
+
+async def main_async(args) -> list:
+    import uvicorn
+    import main
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    install_stand_ins(main.registry, args.tokens, args.token_delay_ms / 1000)
+    url = f"http://127.0.0.1:{port}/api/depth"
+    payload = {
+        "track": "Benchmark",
+        "problem_statement": "Throughput",
+        "threshold": 9,
+        "max_iterations": args.iterations,
+        "stream_tokens": True,
+    }
+
+    results = []
+    try:
+        for gzip in (False, True):
+            stats = await run_streams(url, payload, args.streams, gzip)
+            results.append(stats)
+            print(
+                f"gzip={str(gzip):<5} {stats['events']:>6} events  {stats['wall_s']:>7.3f}s  "
+                f"{stats['events_per_s']:>9.1f} events/s  ttfe p50 {stats['ttfe_p50_ms']:>7.2f}ms  "
+                f"{stats['bytes_per_stream']:>8} B/stream"
+            )
+    finally:
+        server.should_exit = True
+        await serve
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE transport throughput benchmark")
+    parser.add_argument("--streams", "-n", type=int, default=20, help="Concurrent depth streams")
+    parser.add_argument("--iterations", "-i", type=int, default=5, help="Depth iterations per stream")
+    parser.add_argument("--tokens", "-t", type=int, default=200, help="Tokens streamed per model call")
+    parser.add_argument("--token-delay-ms", type=float, default=0.0, help="Delay between tokens")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Shared helpers for the benchmark suite: statistics, loop-lag probing and result files."""
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Allowed relative slowdown before a metric counts as a regression
+DEFAULT_TOLERANCE = 0.10
+# Differences smaller than this (in the metric's own unit) are noise, not regressions
+MIN_ABSOLUTE_CHANGE = 1.0
+
+
+def distribution(values: List[float], scale: float = 1000.0, digits: int = 2) -> dict:
+    """p50/p95/p99/mean/max of ``values`` (seconds by default, reported in ms)."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "p50": round(pick(0.50) * scale, digits),
+        "p95": round(pick(0.95) * scale, digits),
+        "p99": round(pick(0.99) * scale, digits),
+        "mean": round(sum(ordered) / len(ordered) * scale, digits),
+        "max": round(ordered[-1] * scale, digits),
+    }
+
+
+class LoopLagMonitor:
+    """
+    Samples event-loop lag: how late a short sleep wakes up.
+
+    Run ``monitor.run()`` as a task on the loop being measured; lag well
+    above zero means something is blocking that loop.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._running = True
+
+    async def run(self) -> None:
+        while self._running:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def stop(self) -> None:
+        self._running = False
+
+    def reset(self) -> None:
+        self.samples = []
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def save_results(path: str, benchmark: str, results: List[dict], config: dict) -> None:
+    """Write results with enough metadata to compare runs across releases."""
+    document = {
+        "benchmark": benchmark,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"💾 Results saved to {path}")
+
+
+def flatten(result: dict, prefix: str = "") -> Dict[str, float]:
+    """Flatten nested metrics to ``a.b.c`` keys, keeping numbers only."""
+    flat = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def _direction(metric: str) -> int:
+    """+1 if higher is better, -1 if lower is better, 0 if not comparable."""
+    if metric.endswith(".max"):
+        return 0  # a single outlier; too noisy to gate on
+    if "per_s" in metric:
+        return 1
+    if metric.split(".")[0].endswith(("_ms", "_us", "_s")):
+        return -1
+    return 0
+
+
+def compare_results(
+    results: List[dict],
+    baseline_path: str,
+    tolerance: float = DEFAULT_TOLERANCE
+) -> List[str]:
+    """
+    Compare ``results`` with a saved baseline, matching entries by ``name``.
+
+    Returns:
+        One line per metric that got worse by more than ``tolerance``
+    """
+    with open(baseline_path) as f:
+        baseline = {entry["name"]: flatten(entry) for entry in json.load(f)["results"]}
+
+    regressions = []
+    for entry in results:
+        previous = baseline.get(entry["name"])
+        if previous is None:
+            continue
+        for metric, value in flatten(entry).items():
+            direction = _direction(metric)
+            old = previous.get(metric)
+            if not direction or not old or abs(value - old) < MIN_ABSOLUTE_CHANGE:
+                continue
+            change = (value - old) / old
+            if change * direction < -tolerance:
+                regressions.append(f"{entry['name']} {metric}: {old} -> {value} ({change:+.0%})")
+    return regressions
+
+
+def report_regressions(regressions: List[str], baseline_path: str) -> int:
+    """Print the comparison outcome and return a process exit code."""
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against {baseline_path}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\n✅ No regressions against {baseline_path}")
+    return 0
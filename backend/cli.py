@@ -9,6 +9,18 @@ load_dotenv()
 
 from agents import IdeaForge
 from config import get_model_name
+from tools import create_search_client
+
+
+def format_usage(usage: dict) -> str:
+    """One-line token and cost summary, e.g. ``1,234 tokens (1,000 in / 234 out), $0.0042``."""
+    cost = usage.get("cost_usd")
+    cost_text = f"${cost:.4f}" if cost is not None else "cost unknown"
+    estimated = " (estimated)" if usage.get("estimated") else ""
+    return (
+        f"{usage['total_tokens']:,} tokens ({usage['input_tokens']:,} in / {usage['output_tokens']:,} out), "
+        f"{cost_text}{estimated}"
+    )
 
 
 async def run_independent(track: str, requirements: str = ""):
@@ -20,11 +32,13 @@ async def run_independent(track: str, requirements: str = ""):
     print(f"Requirements: {requirements or 'None'}")
     print("-" * 50)
     
-    forge = IdeaForge()
-    result = await forge.run_independent(track, requirements)
+    async with create_search_client() as search_client:
+        forge = IdeaForge(http_client=search_client)
+        result = await forge.run_independent(track, requirements)
     
     print("\n✨ Generated Idea:")
     print(json.dumps(result["idea"], indent=2))
+    print(f"\n🪙 Usage: {format_usage(forge.usage.total.to_dict())}")
     return result
 
 
@@ -32,7 +46,13 @@ async def run_depth(
     track: str,
     problem_statement: str,
     threshold: int = 7,
-    max_iterations: int = 10
+    max_iterations: int = 10,
+    beam_width: int = 1,
+    beam_keep: int = 2,
+    beam_concurrency: int = 4,
+    token_budget: int = None,
+    early_stop: str = None,
+    early_stop_cutoff: float = None
 ):
     """Run depth mode from CLI."""
     model_name = get_model_name()
@@ -42,31 +62,55 @@ async def run_depth(
     print(f"Problem: {problem_statement}")
     print(f"Threshold: {threshold}/10 ({threshold * 10}%)")
     print(f"Max Iterations: {max_iterations}")
+    if beam_width > 1:
+        print(f"Beam: {beam_width} candidates, keep {beam_keep}, concurrency {beam_concurrency}")
+    if token_budget:
+        print(f"Token Budget: {token_budget:,}")
+    if early_stop:
+        print(f"Early Stop: {early_stop}" + (f" (cutoff {early_stop_cutoff:.0%})" if early_stop_cutoff else ""))
     print("-" * 50)
     
-    forge = IdeaForge()
-    
-    async for update in forge.run_depth(
-        track=track,
-        problem_statement=problem_statement,
-        threshold=threshold,
-        max_iterations=max_iterations
-    ):
-        print(f"\n[Iteration {update.iteration}] {update.stage.upper()}")
-        print(f"  {update.message}")
+    async with create_search_client() as search_client:
+        forge = IdeaForge(http_client=search_client)
         
-        if update.evaluation:
-            print(f"  Score: {update.evaluation['overall_score']}/10")
-            print(f"  Verdict: {update.evaluation['verdict']}")
+        updates = forge.run_depth(
+            track=track,
+            problem_statement=problem_statement,
+            threshold=threshold,
+            max_iterations=max_iterations,
+            beam_width=beam_width,
+            beam_keep=beam_keep,
+            beam_concurrency=beam_concurrency,
+            token_budget=token_budget,
+            early_stop=early_stop,
+            early_stop_cutoff=early_stop_cutoff
+        )
+        try:
+            async for update in updates:
+                print(f"\n[Iteration {update.iteration}] {update.stage.upper()}")
+                print(f"  {update.message}")
+                
+                if update.evaluation:
+                    print(f"  Score: {update.evaluation['overall_score']}/10")
+                    print(f"  Verdict: {update.evaluation['verdict']}")
+                if update.usage and update.usage["calls"]:
+                    print(f"  Tokens: {format_usage(update.usage)}")
+                
+                if update.stage in ["complete", "max_iterations", "budget_exceeded", "early_stopped", "interrupted"]:
+                    print("\n" + "=" * 50)
+                    print("FINAL RESULT:")
+                    print(json.dumps(update.idea, indent=2))
+                    if update.evaluation:
+                        print("\nEVALUATION:")
+                        print(json.dumps(update.evaluation, indent=2))
+                    break
+        finally:
+            # Breaking out leaves the run suspended; closing it cancels its search prefetch
+            await updates.aclose()
         
-        if update.stage in ["complete", "max_iterations", "interrupted"]:
-            print("\n" + "=" * 50)
-            print("FINAL RESULT:")
-            print(json.dumps(update.idea, indent=2))
-            if update.evaluation:
-                print("\nEVALUATION:")
-                print(json.dumps(update.evaluation, indent=2))
-            break
+        print(f"\n🪙 Usage: {format_usage(forge.usage.total.to_dict())}")
+        for iteration, usage in sorted(forge.usage.by_iteration.items()):
+            print(f"  Iteration {iteration}: {format_usage(usage.to_dict())}")
 
 
 def main():
@@ -86,6 +130,12 @@ def main():
     depth_parser.add_argument("--problem", "-p", required=True, help="Problem statement")
     depth_parser.add_argument("--threshold", "-th", type=int, default=7, help="Score threshold (1-9)")
     depth_parser.add_argument("--max-iter", "-m", type=int, default=10, help="Max iterations")
+    depth_parser.add_argument("--beam-width", "-b", type=int, default=1, help="Candidates generated per iteration")
+    depth_parser.add_argument("--beam-keep", "-k", type=int, default=2, help="Top candidates kept between iterations")
+    depth_parser.add_argument("--beam-concurrency", "-c", type=int, default=4, help="Max concurrent model calls")
+    depth_parser.add_argument("--token-budget", type=int, default=None, help="Stop with the best idea after this many tokens")
+    depth_parser.add_argument("--early-stop", choices=["off", "adaptive"], default=None, help="Stop once the threshold looks out of reach")
+    depth_parser.add_argument("--early-stop-cutoff", type=float, default=None, help="Chance of passing below which to stop early")
     
     args = parser.parse_args()
     
@@ -96,7 +146,13 @@ def main():
             args.track,
             args.problem,
             args.threshold,
-            args.max_iter
+            args.max_iter,
+            args.beam_width,
+            args.beam_keep,
+            args.beam_concurrency,
+            args.token_budget,
+            args.early_stop,
+            args.early_stop_cutoff
         ))
     else:
         parser.print_help()
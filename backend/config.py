@@ -1,67 +1,270 @@
 """Configuration module for model selection."""
+import json
 import os
-from typing import Tuple, Any
+from typing import Any, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Ask providers for JSON-only output where the configured model supports it
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() == "true"
+# Per-model price overrides as JSON, USD per 1M tokens: {"model-id": [input, output], ...}
+LLM_PRICES = os.getenv("LLM_PRICES", "")
 
-def get_model_config() -> Tuple[Any, str]:
+# List prices in USD per 1M tokens as (input, output); used for cost estimates only
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gemini-2.0-flash-exp": (0.0, 0.0),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "mixtral-8x7b-32768": (0.24, 0.24),
+    "mock": (0.0, 0.0),
+}
+
+
+# Providers: (API key variable, model variable, default model)
+PROVIDERS = {
+    "openai": ("OPENAI_API_KEY", "OPENAI_MODEL", "gpt-4o"),
+    "gemini": ("GEMINI_API_KEY", "GEMINI_MODEL", "gemini-2.0-flash-exp"),
+    "groq": ("GROQ_API_KEY", "GROQ_MODEL", "llama-3.3-70b-versatile"),
+}
+
+# Per-role model variables, first one set wins; roles with none set use the default model
+ROLE_MODEL_VARS = {
+    "researcher": ("RESEARCHER_MODEL",),
+    "critique_draft": ("CRITIQUE_DRAFT_MODEL", "CRITIQUE_MODEL"),
+    "critique_final": ("CRITIQUE_FINAL_MODEL", "CRITIQUE_MODEL"),
+}
+# Models every role hedges to or fails over to after its own (comma-separated provider:model specs)
+LLM_FALLBACK_MODEL_VAR = "LLM_FALLBACK_MODEL"
+
+# Model objects by (provider, model id) and SDK clients by provider, shared by every role
+_models: Dict[Tuple[str, str], Any] = {}
+_clients: Dict[str, Dict[str, Any]] = {}
+
+
+def _use_mock() -> bool:
+    return os.getenv("USE_MOCK", "false").lower() == "true"
+
+
+def get_default_provider() -> str:
     """
-    Get the configured model based on environment variables.
-    
-    Returns:
-        Tuple of (client, model_id)
+    The provider selected by the USE_* flags ("mock" when USE_MOCK is on).
     
     Raises:
-        ValueError: If no model is configured or multiple models are enabled
+        ValueError: If no provider or more than one provider is enabled
     """
-    use_openai = os.getenv("USE_OPENAI", "false").lower() == "true"
-    use_gemini = os.getenv("USE_GEMINI", "false").lower() == "true"
-    use_groq = os.getenv("USE_GROQ", "false").lower() == "true"
+    # The offline mock replaces whichever provider is configured
+    if _use_mock():
+        return "mock"
     
-    # Count how many are enabled
-    enabled_count = sum([use_openai, use_gemini, use_groq])
+    enabled = [name for name in PROVIDERS if os.getenv(f"USE_{name.upper()}", "false").lower() == "true"]
     
-    if enabled_count == 0:
+    if not enabled:
         raise ValueError(
             "No model configured. Set one of USE_OPENAI, USE_GEMINI, or USE_GROQ to true in .env"
         )
     
-    if enabled_count > 1:
+    if len(enabled) > 1:
         raise ValueError(
             "Multiple models enabled. Only one of USE_OPENAI, USE_GEMINI, or USE_GROQ should be true"
         )
     
-    if use_openai:
-        from agno.models.openai import OpenAIChat
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not set in environment")
-        model_id = os.getenv("OPENAI_MODEL", "gpt-4o")
-        return OpenAIChat(id=model_id, api_key=api_key), model_id
+    return enabled[0]
+
+
+def _default_model_id(provider: str) -> str:
+    if provider == "mock":
+        return "mock"
+    _, model_var, default = PROVIDERS[provider]
+    return os.getenv(model_var, default)
+
+
+def get_model_config() -> Tuple[Any, str]:
+    """
+    Get the default model based on environment variables.
     
-    elif use_gemini:
-        from agno.models.google import Gemini
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not set in environment")
-        model_id = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")
-        return Gemini(id=model_id, api_key=api_key), model_id
+    Returns:
+        Tuple of (client, model_id)
     
-    elif use_groq:
+    Raises:
+        ValueError: If no model is configured or multiple models are enabled
+    """
+    provider = get_default_provider()
+    model_id = _default_model_id(provider)
+    return get_model(provider, model_id), model_id
+
+
+def parse_model_spec(spec: str) -> Tuple[str, str]:
+    """
+    Split a ``provider:model`` spec, e.g. ``groq:llama-3.1-8b-instant``.
+    
+    A bare model id uses the provider selected by the USE_* flags.
+    
+    Raises:
+        ValueError: If the provider is unknown
+    """
+    provider, separator, model_id = spec.strip().partition(":")
+    if not separator:
+        return get_default_provider(), provider
+    provider = provider.strip().lower()
+    if provider not in PROVIDERS and provider != "mock":
+        raise ValueError(f"Unknown provider '{provider}' in model spec '{spec}'")
+    return provider, model_id.strip()
+
+
+def _specs(var: str) -> list:
+    return [spec for spec in os.getenv(var, "").split(",") if spec.strip()]
+
+
+def _role_specs(role: str) -> list:
+    for var in ROLE_MODEL_VARS[role]:
+        specs = _specs(var)
+        if specs:
+            return specs
+    return []
+
+
+def _models_for(specs: list) -> List[Tuple[Any, str]]:
+    models = []
+    for spec in specs:
+        provider, model_id = parse_model_spec(spec)
+        if _use_mock():
+            provider = "mock"
+        models.append((get_model(provider, model_id), model_id))
+    return models
+
+
+def get_role_models(role: str) -> List[Tuple[Any, str]]:
+    """
+    Models configured for ``role``: "researcher", "critique_draft" or "critique_final".
+    
+    Each role variable holds one or more comma-separated ``provider:model``
+    specs; the agent routes every call to whichever answers fastest. Models
+    shared between roles share one model object, and every model of a
+    provider shares that provider's SDK client. With USE_MOCK on, each spec
+    becomes a mock model with the same name, so routing and cost estimates
+    can be exercised offline.
+    
+    Returns:
+        List of (client, model_id); the default model if the role is not configured
+    """
+    specs = _role_specs(role)
+    if not specs:
+        return [get_model_config()]
+    return _models_for(specs)
+
+
+def get_fallback_models() -> List[Tuple[Any, str]]:
+    """
+    Models from LLM_FALLBACK_MODEL, used by every role for hedged requests
+    and failover once its own models are exhausted.
+    
+    Returns:
+        List of (client, model_id); empty if no fallback is configured
+    """
+    return _models_for(_specs(LLM_FALLBACK_MODEL_VAR))
+
+
+def get_model(provider: str, model_id: str) -> Any:
+    """
+    The shared model object for ``model_id`` on ``provider``, created on first use.
+    
+    Raises:
+        ValueError: If the provider's API key is not set
+    """
+    key = (provider, model_id)
+    if key not in _models:
+        model = _create_model(provider, model_id)
+        # Every role parses JSON replies, so the shared model asks for JSON once
+        enable_json_mode(model)
+        _models[key] = model
+    return _models[key]
+
+
+def get_provider(model: Any) -> str:
+    """The provider a model from ``get_model`` belongs to (its class name for other models)."""
+    for (provider, _), known in _models.items():
+        if known is model:
+            return provider
+    return type(model).__name__.lower()
+
+
+def _create_model(provider: str, model_id: str) -> Any:
+    if provider == "mock":
+        from mocks import MockModel
+        return MockModel(model_id=model_id)
+    
+    key_var = PROVIDERS[provider][0]
+    api_key = os.getenv(key_var)
+    if not api_key:
+        raise ValueError(f"{key_var} not set in environment")
+    clients = _provider_clients(provider, api_key)
+    
+    if provider == "openai":
+        from agno.models.openai import OpenAIChat
+        return OpenAIChat(id=model_id, api_key=api_key, **clients)
+    elif provider == "gemini":
+        from agno.models.google import Gemini
+        return Gemini(id=model_id, api_key=api_key, **clients)
+    elif provider == "groq":
         from agno.models.groq import Groq
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY not set in environment")
-        model_id = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
-        return Groq(id=model_id, api_key=api_key), model_id
+        return Groq(id=model_id, api_key=api_key, **clients)
     
     raise ValueError("Invalid model configuration")
 
 
+def _provider_clients(provider: str, api_key: str) -> Dict[str, Any]:
+    """SDK clients for ``provider``, created once so all of its models share one connection pool."""
+    if provider not in _clients:
+        if provider == "openai":
+            from openai import AsyncOpenAI, OpenAI
+            _clients[provider] = {"client": OpenAI(api_key=api_key), "async_client": AsyncOpenAI(api_key=api_key)}
+        elif provider == "groq":
+            from groq import AsyncGroq, Groq as GroqClient
+            _clients[provider] = {"client": GroqClient(api_key=api_key), "async_client": AsyncGroq(api_key=api_key)}
+        elif provider == "gemini":
+            from google import genai
+            _clients[provider] = {"client": genai.Client(api_key=api_key)}
+        else:
+            _clients[provider] = {}
+    return _clients[provider]
+
+
+def enable_json_mode(model: Any) -> bool:
+    """
+    Switch ``model`` to provider-native JSON output where supported.
+    
+    OpenAI gets ``response_format=json_object`` and Gemini gets the
+    ``application/json`` response MIME type. Groq's JSON mode does not
+    support streamed responses, so Groq keeps free-form output.
+    
+    Returns:
+        True if JSON mode was enabled
+    """
+    if not LLM_JSON_MODE:
+        return False
+    provider = type(model).__name__
+    if provider == "OpenAIChat":
+        model.request_params = {**(model.request_params or {}), "response_format": {"type": "json_object"}}
+    elif provider == "Gemini":
+        model.generation_config = {**(model.generation_config or {}), "response_mime_type": "application/json"}
+    else:
+        return False
+    return True
+
+
 def get_model_name() -> str:
     """Get the name of the currently configured model."""
+    if _use_mock():
+        return "mock"
+    
     use_openai = os.getenv("USE_OPENAI", "false").lower() == "true"
     use_gemini = os.getenv("USE_GEMINI", "false").lower() == "true"
     use_groq = os.getenv("USE_GROQ", "false").lower() == "true"
@@ -74,3 +277,54 @@ def get_model_name() -> str:
         return os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
     
     return "unknown"
+
+
+def get_role_model_names() -> Dict[str, List[str]]:
+    """Model specs per role as configured (roles left unset use the default model)."""
+    names = {role: [spec.strip() for spec in _role_specs(role)] or [get_model_name()] for role in ROLE_MODEL_VARS}
+    names["fallback"] = [spec.strip() for spec in _specs(LLM_FALLBACK_MODEL_VAR)]
+    return names
+
+
+def get_model_price(model_id: str) -> Optional[Tuple[float, float]]:
+    """
+    Price of ``model_id`` in USD per 1M (input, output) tokens.
+    
+    Entries in LLM_PRICES override the table for their model only; dated
+    model ids such as ``gpt-4o-2024-08-06`` fall back to their base entry.
+    
+    Returns:
+        The price pair, or None if the model is not priced
+    """
+    prices = {**MODEL_PRICES, **_price_overrides()}
+    if model_id in prices:
+        return prices[model_id]
+    base = max((known for known in prices if model_id.startswith(known + "-")), key=len, default=None)
+    return prices[base] if base else None
+
+
+_overrides: Optional[Dict[str, Tuple[float, float]]] = None
+
+
+def _price_overrides() -> Dict[str, Tuple[float, float]]:
+    """LLM_PRICES parsed once; malformed input is reported and ignored."""
+    global _overrides
+    if _overrides is None:
+        _overrides = {}
+        if LLM_PRICES:
+            try:
+                _overrides = {
+                    model_id: (float(price[0]), float(price[1]))
+                    for model_id, price in json.loads(LLM_PRICES).items()
+                }
+            except (ValueError, TypeError, AttributeError, IndexError, KeyError) as e:
+                print(f"⚠️ Ignoring LLM_PRICES, expected {{\"model-id\": [input, output]}}: {e}")
+    return _overrides
+
+
+def estimate_cost(model_id: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    """Estimated cost in USD of one call, or None if the model is not priced."""
+    price = get_model_price(model_id)
+    if price is None:
+        return None
+    return (input_tokens * price[0] + output_tokens * price[1]) / 1_000_000
@@ -1,36 +1,66 @@
 """FastAPI backend for Idea Forge."""
 import asyncio
-from typing import Optional
+from typing import Literal, Optional
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-import json
 
 load_dotenv()
 
-from agents import IdeaForge, ForgeUpdate
-from config import get_model_name
+from agents import SessionRegistry, QueueFullError, ForgeUpdate
+from agents.llm import shutdown_llm_executor
+from agents.retrieval import RETRIEVAL_MODE, RetrievalIndex
+from config import get_model_name, get_role_model_names
+from metrics import METRICS_MODE, render_metrics
+from sse import sse_response
+from store import IdeaStore, STORE_ENABLED, STORE_PATH
+from tools import (
+    create_search_client,
+    set_search_client,
+    close_search_client,
+    get_search_cache_stats,
+    get_upstream_stats,
+)
 
-# Global forge instance
-forge: Optional[IdeaForge] = None
+# Global session registry
+registry: Optional[SessionRegistry] = None
+# Persistent run/idea history (None when STORE_ENABLED=false)
+store: Optional[IdeaStore] = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global forge
+    global registry, store
+    search_client = create_search_client()
+    set_search_client(search_client)
     try:
-        forge = IdeaForge()
+        store = IdeaStore(STORE_PATH) if STORE_ENABLED else None
+        retrieval = None
+        if RETRIEVAL_MODE != "off":
+            # Opening may rebuild the index from the store, so keep it off the loop
+            retrieval = await asyncio.get_running_loop().run_in_executor(None, RetrievalIndex, store)
+            print(f"📚 Retrieval index ready ({len(retrieval)} ideas, mode: {RETRIEVAL_MODE})")
+        registry = SessionRegistry(http_client=search_client, store=store, retrieval=retrieval)
         model_name = get_model_name()
         print(f"✅ Idea Forge initialized with model: {model_name}")
     except Exception as e:
         print(f"❌ Failed to initialize Idea Forge: {e}")
+        await close_search_client()
         raise
-    yield
-    forge = None
+    try:
+        yield
+    finally:
+        registry = None
+        await close_search_client()
+        shutdown_llm_executor()
+        if store is not None:
+            # Commits outstanding writes; runs off the loop since it joins the writer thread
+            await asyncio.get_running_loop().run_in_executor(None, store.close)
+            store = None
 
 
 app = FastAPI(
@@ -46,12 +76,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Session-Id"],
 )
 
 
 class IndependentRequest(BaseModel):
     track: str = Field(..., description="Hackathon track/domain")
     requirements: str = Field("", description="Additional requirements")
+    stream_tokens: bool = Field(True, description="Stream partial model output (SSE endpoint only)")
 
 
 class DepthRequest(BaseModel):
@@ -59,13 +91,22 @@ class DepthRequest(BaseModel):
     problem_statement: str = Field(..., description="Problem statement to solve")
     threshold: int = Field(7, ge=1, le=9, description="Score threshold (1-9)")
     max_iterations: int = Field(10, ge=1, le=20, description="Max iterations")
+    beam_width: int = Field(1, ge=1, le=8, description="Candidates generated per iteration")
+    beam_keep: int = Field(2, ge=1, le=8, description="Top candidates carried to the next iteration")
+    beam_concurrency: int = Field(4, ge=1, le=8, description="Max concurrent model calls per run")
+    stream_tokens: bool = Field(False, description="Stream partial model output as 'token' events")
+    token_budget: Optional[int] = Field(None, ge=1, description="Stop with the best idea once the run has used this many tokens")
+    early_stop: Optional[Literal["off", "adaptive"]] = Field(None, description="'adaptive' stops with the best idea once scores show the threshold is out of reach")
+    early_stop_cutoff: Optional[float] = Field(None, gt=0, lt=1, description="Chance of reaching the threshold below which an adaptive run stops")
 
 
 class IdeaResponse(BaseModel):
     success: bool
-    idea: dict
+    idea: Optional[dict] = None
     mode: str
     evaluation: Optional[dict] = None
+    missing_sources: list = []
+    session_id: Optional[str] = None
 
 
 @app.get("/")
@@ -74,90 +115,201 @@ async def root():
     return {
         "message": "Idea Forge API",
         "status": "running",
-        "model": model_name
+        "model": model_name,
+        "models": get_role_model_names()
     }
 
 
 @app.get("/api/status")
 async def get_status():
-    """Get current forge status."""
-    if not forge:
+    """Get status of every forge session."""
+    if not registry:
         return {"status": "not_initialized"}
+    return {
+        **registry.get_status(),
+        "search_cache": get_search_cache_stats(),
+        "critique_cache": registry.critique.get_cache_stats(),
+        "upstreams": get_upstream_stats()
+    }
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Prometheus metrics: span latency histograms, counters and run gauges."""
+    if METRICS_MODE == "off":
+        raise HTTPException(status_code=503, detail="Metrics are disabled")
+    gauges = {}
+    if registry:
+        status = registry.get_status()
+        gauges["active_runs"] = status["active_runs"]
+        gauges["queued_runs"] = status["queued_runs"]
+        gauges["sessions"] = len(status["sessions"])
+        for name, stats in (
+            ("search_cache", get_search_cache_stats()),
+            ("critique_cache", registry.critique.get_cache_stats())
+        ):
+            if stats["enabled"]:
+                gauges[f"{name}_size"] = stats["size"]
+                gauges[f"{name}_hit_rate"] = stats["hit_rate"]
+        gauges["open_circuits"] = sum(
+            stats["state"] != "closed" for stats in get_upstream_stats().values()
+        )
+    return PlainTextResponse(render_metrics(gauges), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/status/{session_id}")
+async def get_session_status(session_id: str):
+    """Get status of a single forge session."""
+    forge = _get_session(session_id)
     return forge.get_status()
 
 
+def _get_session(session_id: str):
+    if not registry:
+        raise HTTPException(status_code=500, detail="Forge not initialized")
+    forge = registry.get(session_id)
+    if not forge:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return forge
+
+
+def _create_session():
+    if not registry:
+        raise HTTPException(status_code=500, detail="Forge not initialized")
+    try:
+        return registry.create()
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+def _get_store() -> IdeaStore:
+    if not store:
+        raise HTTPException(status_code=503, detail="History store is disabled")
+    return store
+
+
+@app.get("/api/history/runs")
+async def list_runs(
+    track: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None
+):
+    """List past runs, newest first. Pass ``next_cursor`` back as ``cursor`` for the next page."""
+    try:
+        return await _get_store().list_runs(track=track, status=status, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/history/runs/{run_id}")
+async def get_run(run_id: str):
+    """Get a past run with its ideas, evaluations and stage timings."""
+    run = await _get_store().get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Unknown run")
+    return run
+
+
+@app.get("/api/history/ideas")
+async def list_ideas(
+    track: Optional[str] = None,
+    min_score: Optional[float] = None,
+    verdict: Optional[str] = None,
+    sort: str = Query("recent", pattern="^(recent|score)$"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None
+):
+    """List generated ideas across runs, newest or highest scored first."""
+    try:
+        return await _get_store().list_ideas(
+            track=track, min_score=min_score, verdict=verdict, sort=sort, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.post("/api/independent")
 async def run_independent(request: IndependentRequest) -> IdeaResponse:
     """
     Run Independent Mode - generates idea from problem discovery.
     Searches Reddit and tech communities for real problems.
     """
-    if not forge:
-        raise HTTPException(status_code=500, detail="Forge not initialized")
-    
-    if forge.state and forge.state.is_running:
-        raise HTTPException(status_code=409, detail="Another process is running")
+    forge = _create_session()
     
     try:
-        result = await forge.run_independent(
+        result = await registry.run_independent(
+            forge,
             track=request.track,
             requirements=request.requirements
         )
-        return IdeaResponse(**result)
+        return IdeaResponse(**result, session_id=forge.session_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/independent/stream")
+async def stream_independent(request: IndependentRequest, http_request: Request):
+    """
+    Run Independent Mode as a Server-Sent Events stream.
+    Emits progress updates, "token" events with partial model output,
+    and a final "complete" update carrying the idea.
+    """
+    forge = _create_session()
+    updates = registry.stream_independent(
+        forge,
+        track=request.track,
+        requirements=request.requirements,
+        stream_tokens=request.stream_tokens
+    )
+    return sse_response(http_request, forge, updates)
+
+
 @app.post("/api/depth")
-async def run_depth(request: DepthRequest):
+async def run_depth(request: DepthRequest, http_request: Request):
     """
     Run Depth Mode - iterative idea generation with critique.
     Returns Server-Sent Events stream of updates.
     """
-    if not forge:
-        raise HTTPException(status_code=500, detail="Forge not initialized")
-    
-    if forge.state and forge.state.is_running:
-        raise HTTPException(status_code=409, detail="Another process is running")
-    
-    async def event_generator():
-        try:
-            async for update in forge.run_depth(
-                track=request.track,
-                problem_statement=request.problem_statement,
-                threshold=request.threshold,
-                max_iterations=request.max_iterations
-            ):
-                data = {
-                    "iteration": update.iteration,
-                    "stage": update.stage,
-                    "message": update.message,
-                    "idea": update.idea,
-                    "evaluation": update.evaluation
-                }
-                yield f"data: {json.dumps(data)}\n\n"
-                await asyncio.sleep(0.1)
-        except Exception as e:
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
-    
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
+    forge = _create_session()
+    updates = registry.run_depth(
+        forge,
+        track=request.track,
+        problem_statement=request.problem_statement,
+        threshold=request.threshold,
+        max_iterations=request.max_iterations,
+        beam_width=request.beam_width,
+        beam_keep=request.beam_keep,
+        beam_concurrency=request.beam_concurrency,
+        stream_tokens=request.stream_tokens,
+        token_budget=request.token_budget,
+        early_stop=request.early_stop,
+        early_stop_cutoff=request.early_stop_cutoff
     )
+    return sse_response(http_request, forge, updates)
 
 
-@app.post("/api/depth/stop")
-async def stop_depth():
-    """Stop the current depth mode process."""
-    if not forge:
-        raise HTTPException(status_code=500, detail="Forge not initialized")
-    
+@app.post("/api/depth/{session_id}/stop")
+async def stop_depth_session(session_id: str):
+    """Stop a single depth mode session."""
+    forge = _get_session(session_id)
     forge.interrupt()
-    return {"message": "Interrupt signal sent"}
+    return {"message": "Interrupt signal sent", "session_id": session_id}
+
+
+@app.post("/api/depth/stop")
+async def stop_depth(
+    session_id: Optional[str] = Query(None),
+    x_session_id: Optional[str] = Header(None)
+):
+    """Stop the depth mode session named by ``session_id`` or the X-Session-Id header."""
+    session_id = session_id or x_session_id
+    if not session_id:
+        raise HTTPException(
+            status_code=400,
+            detail="session_id is required (query parameter or X-Session-Id header)"
+        )
+    return await stop_depth_session(session_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,239 @@
+"""Timing spans, per-run stage timings and Prometheus metrics."""
+import asyncio
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar, Token
+from typing import Dict, List, Optional, Tuple
+
+# off: no instrumentation; basic: histograms, counters and per-update timings; full: also keep every span per run
+METRICS_MODE = os.getenv("METRICS_MODE", "basic").lower()
+# Spans kept per run in full mode
+MAX_SPANS_PER_RUN = 2000
+
+# Histogram bucket upper bounds in seconds (+Inf is implicit)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PREFIX = "ideaforge"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Exceptions that end a span without it counting as an error
+_NOT_ERRORS = (asyncio.CancelledError, GeneratorExit)
+
+
+class RunTimings:
+    """
+    Span time accumulated by one forge run.
+
+    ``drain`` returns what was spent since the previous call, so each
+    ForgeUpdate carries the work done in the stage it closes. Spans that
+    overlap (concurrent searches, beam candidates) each count in full.
+    """
+
+    def __init__(self, keep_spans: bool = METRICS_MODE == "full"):
+        self.keep_spans = keep_spans
+        self.reset()
+
+    def reset(self) -> None:
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.spans: List[dict] = []
+        self._pending: Dict[str, float] = defaultdict(float)
+        self._started = time.perf_counter()
+        self._last_drain = self._started
+
+    def add(self, key: str, start: float, seconds: float) -> None:
+        self._pending[key] += seconds
+        self.totals[key] += seconds
+        if self.keep_spans and len(self.spans) < MAX_SPANS_PER_RUN:
+            self.spans.append({
+                "span": key,
+                "start_ms": round((start - self._started) * 1000, 2),
+                "duration_ms": round(seconds * 1000, 2)
+            })
+
+    def drain(self) -> Dict[str, float]:
+        """Milliseconds per span kind since the last drain, plus the wall time as ``elapsed``."""
+        now = time.perf_counter()
+        timings = {key: round(seconds * 1000, 2) for key, seconds in self._pending.items()}
+        timings["elapsed"] = round((now - self._last_drain) * 1000, 2)
+        self._pending.clear()
+        self._last_drain = now
+        return timings
+
+    def summary(self) -> dict:
+        """Run totals in milliseconds (and the span log in full mode)."""
+        summary = {"totals_ms": {key: round(seconds * 1000, 2) for key, seconds in self.totals.items()}}
+        if self.keep_spans:
+            summary["spans"] = list(self.spans)
+        return summary
+
+
+_current_run: ContextVar[Optional[RunTimings]] = ContextVar("current_run", default=None)
+
+
+def bind_run(timings: RunTimings) -> Token:
+    """Attribute spans in this context (and tasks it creates) to ``timings``."""
+    return _current_run.set(timings)
+
+
+def unbind_run(token: Token) -> None:
+    try:
+        _current_run.reset(token)
+    except ValueError:
+        # Finalized from another context (e.g. a garbage-collected generator)
+        pass
+
+
+class MetricsRegistry:
+    """Thread-safe histograms and counters, rendered in Prometheus text format."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (name, labels) -> [bucket counts..., +Inf count], sum
+        self._histograms: Dict[Tuple[str, Labels], list] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = defaultdict(float)
+        self._help: Dict[str, Tuple[str, str]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._help[name] = (kind, help_text)
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._histograms.get((name, labels))
+            if entry is None:
+                entry = self._histograms[(name, labels)] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1.0) -> None:
+        with self._lock:
+            self._counters[(name, labels)] += value
+
+    def render(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus text exposition of everything recorded so far."""
+        with self._lock:
+            histograms = {key: (list(counts), total) for key, (counts, total) in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        for name in sorted({name for name, _ in histograms}):
+            self._header(lines, name, "histogram")
+            for (family, labels), (counts, total) in sorted(histograms.items()):
+                if family != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{PREFIX}_{name}_bucket{_format(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{PREFIX}_{name}_sum{_format(labels)} {total:.6f}")
+                lines.append(f"{PREFIX}_{name}_count{_format(labels)} {cumulative}")
+        for name in sorted({name for name, _ in counters}):
+            self._header(lines, name, "counter")
+            for (family, labels), value in sorted(counters.items()):
+                if family == name:
+                    lines.append(f"{PREFIX}_{name}{_format(labels)} {value:g}")
+        for name, value in sorted((gauges or {}).items()):
+            self._header(lines, name, "gauge")
+            lines.append(f"{PREFIX}_{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: list, name: str, kind: str) -> None:
+        _, help_text = self._help.get(name, (kind, name.replace("_", " ")))
+        lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+
+def _format(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+registry = MetricsRegistry()
+registry.describe("span_duration_seconds", "histogram", "Time spent in instrumented operations")
+registry.describe("span_errors_total", "counter", "Instrumented operations that raised")
+registry.describe("updates_total", "counter", "Forge updates emitted, by stage")
+registry.describe("sse_bytes_total", "counter", "Bytes written to SSE streams (before gzip)")
+registry.describe("search_cache_total", "counter", "Search lookups by cache result")
+registry.describe("llm_tokens_total", "counter", "Model tokens by agent role and kind (input/output)")
+registry.describe("llm_cost_usd_total", "counter", "Estimated model spend in USD by agent role")
+registry.describe("llm_calls_total", "counter", "Routed model calls by agent role (before hedging and failover)")
+registry.describe("llm_hedges_total", "counter", "Calls also sent to a second model after the hedge delay")
+registry.describe("llm_hedge_wins_total", "counter", "Hedged calls by which request answered first")
+registry.describe("llm_failovers_total", "counter", "Calls retried on another model after an error or timeout")
+registry.describe("llm_timeouts_total", "counter", "Model calls that missed their deadline, by model")
+registry.describe("upstream_errors_total", "counter", "Failed upstream requests counted by the circuit breaker")
+registry.describe("upstream_retries_total", "counter", "Upstream requests retried after a transient error")
+registry.describe("upstream_rejected_total", "counter", "Upstream requests refused because the circuit was open")
+registry.describe("upstream_circuit_opens_total", "counter", "Times an upstream's circuit opened")
+
+
+class _Span:
+    __slots__ = ("name", "labels", "key", "start")
+
+    def __init__(self, name: str, labels: Labels, key: str):
+        self.name = name
+        self.labels = labels
+        self.key = key
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        seconds = time.perf_counter() - self.start
+        registry.observe("span_duration_seconds", self.labels, seconds)
+        if exc_type is not None and not issubclass(exc_type, _NOT_ERRORS):
+            registry.inc("span_errors_total", self.labels)
+        run = _current_run.get()
+        if run is not None:
+            run.add(self.key, self.start, seconds)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, label: str = ""):
+    """
+    Time a block as ``name`` (optionally qualified by ``label``, e.g. the agent role).
+
+    Durations go into the ``span_duration_seconds`` histogram and, inside a
+    bound run, into that run's RunTimings as ``name`` or ``name.label``.
+    """
+    if METRICS_MODE == "off":
+        return _NOOP
+    if label:
+        return _Span(name, (("span", name), ("label", label)), f"{name}.{label}")
+    return _Span(name, (("span", name),), name)
+
+
+def count(name: str, value: float = 1.0, **labels: str) -> None:
+    """Increment counter ``name`` (no-op when metrics are off)."""
+    if METRICS_MODE != "off":
+        registry.inc(name, tuple(sorted(labels.items())), value)
+
+
+def render_metrics(gauges: Optional[Dict[str, float]] = None) -> str:
+    """The Prometheus exposition for /api/metrics."""
+    return registry.render(gauges)
@@ -0,0 +1,20 @@
+"""Offline stand-ins for Serper and the LLM providers, with record/replay fixtures."""
+from .fixtures import FIXTURES_DIR, RECORD_FIXTURES, record_llm, record_search
+from .latency import LatencyProfile
+from .provider import USE_MOCK, MockAgent, MockModel, MockProviderError
+from .serper_stub import MockSearchError, mock_search, start_stub_server
+
+__all__ = [
+    "FIXTURES_DIR",
+    "RECORD_FIXTURES",
+    "record_llm",
+    "record_search",
+    "LatencyProfile",
+    "USE_MOCK",
+    "MockAgent",
+    "MockModel",
+    "MockProviderError",
+    "MockSearchError",
+    "mock_search",
+    "start_stub_server",
+]
@@ -0,0 +1,4 @@
+"""Run the stub Serper server: ``python -m mocks --port 8787``."""
+from .serper_stub import main
+
+main()
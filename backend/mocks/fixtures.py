@@ -0,0 +1,100 @@
+"""Record/replay fixtures for search and model exchanges."""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+# Directory holding llm.jsonl and search.jsonl
+FIXTURES_DIR = os.getenv("FIXTURES_DIR", "fixtures")
+# Capture every live search and model exchange into FIXTURES_DIR
+RECORD_FIXTURES = os.getenv("RECORD_FIXTURES", "false").lower() == "true"
+
+LLM_FIXTURES = "llm.jsonl"
+SEARCH_FIXTURES = "search.jsonl"
+
+
+def llm_key(agent_name: str, prompt: str) -> str:
+    """Fixture key for one model call."""
+    return hashlib.sha256(f"{agent_name}\n{prompt}".encode()).hexdigest()
+
+
+def search_key(query: str, search_type: str, num_results: int) -> str:
+    """Fixture key for one search request."""
+    normalized = " ".join(query.lower().split())
+    return hashlib.sha256(f"{search_type}\n{num_results}\n{normalized}".encode()).hexdigest()
+
+
+class FixtureFile:
+    """
+    Append-only JSONL fixture file, loaded into a dict by key on first use.
+
+    Recording appends one ``{"key", ...}`` object per line; replay looks
+    entries up by key. The latest recording of a key wins.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[dict] = None
+
+    def get(self, key: str) -> Optional[dict]:
+        if self._entries is None:
+            self._load()
+        return self._entries.get(key)
+
+    def record(self, key: str, **fields) -> None:
+        entry = {"key": key, **fields}
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line)
+            if self._entries is not None:
+                self._entries[key] = entry
+
+    def __len__(self) -> int:
+        if self._entries is None:
+            self._load()
+        return len(self._entries)
+
+    def _load(self) -> None:
+        entries = {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entries[entry["key"]] = entry
+        except FileNotFoundError:
+            pass
+        self._entries = entries
+
+
+_files: dict = {}
+
+
+def fixture_file(name: str, directory: str = FIXTURES_DIR) -> FixtureFile:
+    """Shared FixtureFile for ``name`` in ``directory``."""
+    path = Path(directory) / name
+    if path not in _files:
+        _files[path] = FixtureFile(path)
+    return _files[path]
+
+
+def record_llm(agent_name: str, prompt: str, content: Optional[str]) -> None:
+    """Record a live model exchange when RECORD_FIXTURES is on."""
+    if RECORD_FIXTURES and content:
+        fixture_file(LLM_FIXTURES).record(
+            llm_key(agent_name, prompt), agent=agent_name, prompt=prompt, content=content
+        )
+
+
+def record_search(query: str, search_type: str, num_results: int, response: dict) -> None:
+    """Record a live search response when RECORD_FIXTURES is on."""
+    if RECORD_FIXTURES:
+        fixture_file(SEARCH_FIXTURES).record(
+            search_key(query, search_type, num_results),
+            query=query, search_type=search_type, num_results=num_results, response=response
+        )
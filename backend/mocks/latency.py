@@ -0,0 +1,54 @@
+"""Latency and failure injection shared by the mock provider and the Serper stub."""
+import math
+import os
+import random
+import threading
+from typing import Optional, Tuple
+
+# fixed | uniform | lognormal
+MOCK_LATENCY = os.getenv("MOCK_LATENCY", "lognormal").lower()
+# Relative spread: half-width for uniform, sigma for lognormal
+MOCK_LATENCY_SPREAD = float(os.getenv("MOCK_LATENCY_SPREAD", "0.5"))
+# Seed for latency and failure draws; empty means nondeterministic timing
+MOCK_SEED = os.getenv("MOCK_SEED", "")
+
+
+class LatencyProfile:
+    """
+    Draws per-call delays and injected failures.
+
+    Every distribution has mean ``latency_ms``; the lognormal one adds the
+    long tail real providers show. With a seed, the sequence of draws is
+    reproducible.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float,
+        failure_rate: float = 0.0,
+        distribution: str = MOCK_LATENCY,
+        spread: float = MOCK_LATENCY_SPREAD,
+        seed: Optional[str] = MOCK_SEED or None
+    ):
+        if distribution not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown MOCK_LATENCY '{distribution}' (expected fixed, uniform or lognormal)")
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.distribution = distribution
+        self.spread = spread
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, bool]:
+        """Draw (delay in seconds, whether this call fails) for one call."""
+        with self._lock:
+            if self.distribution == "fixed" or self.latency_ms <= 0:
+                delay = self.latency_ms
+            elif self.distribution == "uniform":
+                delay = self.latency_ms * self._rng.uniform(1 - self.spread, 1 + self.spread)
+            else:
+                # Median chosen so the distribution's mean is latency_ms
+                sigma = self.spread
+                delay = self._rng.lognormvariate(math.log(self.latency_ms) - sigma * sigma / 2, sigma)
+            failed = self._rng.random() < self.failure_rate
+        return max(delay, 0.0) / 1000, failed
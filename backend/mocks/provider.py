@@ -0,0 +1,209 @@
+"""Offline stand-in for the LLM providers, replaying fixtures or synthesizing replies."""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from .fixtures import LLM_FIXTURES, fixture_file, llm_key
+from .latency import LatencyProfile
+
+# Replace the configured provider with the mock (overrides USE_OPENAI/USE_GEMINI/USE_GROQ)
+USE_MOCK = os.getenv("USE_MOCK", "false").lower() == "true"
+# Mean time to first token per call, in milliseconds
+MOCK_LATENCY_MS = float(os.getenv("MOCK_LATENCY_MS", "200"))
+# Fraction of calls that raise MockProviderError
+MOCK_FAILURE_RATE = float(os.getenv("MOCK_FAILURE_RATE", "0"))
+# Characters per streamed chunk
+MOCK_CHUNK_CHARS = 24
+
+_TRACK = re.compile(r"^Track/Domain:\s*(.+)$", re.MULTILINE)
+_BATCH_ID = re.compile(r"^Idea id (\d+):", re.MULTILINE)
+
+_ADJECTIVES = [
+    "Adaptive", "Ambient", "Civic", "Collaborative", "Edge", "Federated", "Frugal", "Local-first",
+    "Offline", "Open", "Predictive", "Privacy-preserving", "Realtime", "Self-healing", "Voice-driven",
+]
+_NOUNS = [
+    "Assistant", "Atlas", "Beacon", "Compass", "Copilot", "Dashboard", "Ledger", "Lens", "Mesh",
+    "Monitor", "Navigator", "Pulse", "Radar", "Relay", "Sentinel", "Tracker",
+]
+_USERS = [
+    "students", "small clinics", "farmers", "renters", "volunteers", "field technicians",
+    "first-time founders", "caregivers", "commuters", "open-source maintainers",
+]
+_PAINS = [
+    "lose hours to manual paperwork", "miss critical alerts", "can't find trustworthy data",
+    "juggle five disconnected tools", "waste money on idle resources", "have no offline access",
+    "struggle to coordinate in emergencies", "get buried in notifications",
+]
+_METHODS = [
+    "an on-device model", "a shared event log", "semantic search over public records",
+    "computer vision on phone cameras", "a rules engine with LLM summaries", "peer-to-peer sync",
+    "anomaly detection on sensor streams", "a conversational agent with tool calls",
+]
+_TECH = [
+    "Python", "FastAPI", "React", "Next.js", "SQLite", "PostgreSQL", "Redis", "WebSockets",
+    "TensorFlow Lite", "PyTorch", "LangChain", "Supabase", "Flutter", "Rust", "Go", "MQTT",
+]
+_STRENGTHS = [
+    "Clear, relatable problem", "Tight scope for a weekend", "Strong live demo moment",
+    "Uses data judges haven't seen", "Solid technical core",
+]
+_WEAKNESSES = [
+    "Crowded space", "Unclear path to users", "Demo depends on live data",
+    "Heavy model dependency", "Thin differentiation",
+]
+_SCORE_KEYS = ("innovation", "feasibility", "impact", "demo_potential", "technical_depth", "market_fit")
+
+
+class MockProviderError(RuntimeError):
+    """Injected provider failure (see MOCK_FAILURE_RATE)."""
+    status_code = 503  # transient, like a provider outage
+
+
+@dataclass
+class MockMetrics:
+    """Token usage reported by MockAgent, shaped like agno's run metrics (~4 characters per token)."""
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @classmethod
+    def for_exchange(cls, prompt: str, content: str) -> "MockMetrics":
+        return cls(input_tokens=math.ceil(len(prompt) / 4), output_tokens=math.ceil(len(content) / 4))
+
+
+@dataclass
+class MockRunResponse:
+    """Run response returned by MockAgent, shaped like agno's."""
+    content: str
+    metrics: Optional[MockMetrics] = None
+
+
+@dataclass
+class MockRunEvent:
+    """Stream event yielded by MockAgent, shaped like agno's RunContent events."""
+    content: str
+    event: str = "RunContent"
+
+
+class MockModel:
+    """
+    Model stand-in selected by ``USE_MOCK=true``.
+
+    Holds the latency and failure profile; MockAgent does the work. The id
+    is "mock" unless a role is configured with named models (see
+    ``config.get_role_models``).
+    """
+
+    def __init__(self, profile: Optional[LatencyProfile] = None, model_id: str = "mock"):
+        self.id = model_id
+        self.profile = profile or LatencyProfile(MOCK_LATENCY_MS, MOCK_FAILURE_RATE)
+
+
+class MockAgent:
+    """
+    Drop-in for an agno Agent backed by a MockModel.
+
+    Replies come from recorded fixtures when the (agent name, prompt) pair
+    was recorded, otherwise from a synthetic reply seeded by the prompt, so
+    the same prompt always gets the same answer.
+    """
+
+    def __init__(self, name: str, model: MockModel, instructions: str = "", **kwargs):
+        self.name = name
+        self.model = model
+        self.instructions = instructions
+
+    def arun(self, prompt: str, stream: bool = False, yield_run_output: bool = False, **kwargs):
+        if stream:
+            return self._stream(prompt, yield_run_output)
+        return self._arun(prompt)
+
+    def run(self, prompt: str, **kwargs) -> MockRunResponse:
+        delay, failed = self.model.profile.draw()
+        time.sleep(delay)
+        if failed:
+            raise MockProviderError(f"Injected failure in mock provider ({self.name})")
+        return self._response(prompt)
+
+    async def _arun(self, prompt: str) -> MockRunResponse:
+        delay, failed = self.model.profile.draw()
+        await asyncio.sleep(delay)
+        if failed:
+            raise MockProviderError(f"Injected failure in mock provider ({self.name})")
+        return self._response(prompt)
+
+    async def _stream(self, prompt: str, yield_run_output: bool = False) -> AsyncIterator[MockRunEvent]:
+        delay, failed = self.model.profile.draw()
+        await asyncio.sleep(delay)
+        if failed:
+            raise MockProviderError(f"Injected failure in mock provider ({self.name})")
+        response = self._response(prompt)
+        content = response.content
+        for start in range(0, len(content), MOCK_CHUNK_CHARS):
+            yield MockRunEvent(content=content[start:start + MOCK_CHUNK_CHARS])
+            await asyncio.sleep(0)
+        if yield_run_output:
+            yield response
+
+    def _response(self, prompt: str) -> MockRunResponse:
+        content = self.reply(prompt)
+        return MockRunResponse(content=content, metrics=MockMetrics.for_exchange(self.instructions + prompt, content))
+
+    def reply(self, prompt: str) -> str:
+        """The recorded reply to ``prompt``, or a deterministic synthetic one."""
+        key = llm_key(self.name, prompt)
+        recorded = fixture_file(LLM_FIXTURES).get(key)
+        if recorded is not None:
+            return recorded["content"]
+        rng = random.Random(key)
+        match = _TRACK.search(prompt)
+        track = match.group(1).strip() if match else "General"
+        if "Critique" in self.name:
+            ids = _BATCH_ID.findall(prompt)
+            if ids:
+                return json.dumps({"evaluations": [{"id": int(i), **synthetic_evaluation(rng)} for i in ids]})
+            return json.dumps(synthetic_evaluation(rng))
+        return json.dumps(synthetic_idea(rng, track))
+
+
+def synthetic_idea(rng: random.Random, track: str) -> dict:
+    """A plausible, schema-complete researcher idea."""
+    adjective, noun = rng.choice(_ADJECTIVES), rng.choice(_NOUNS)
+    users, pain, method = rng.choice(_USERS), rng.choice(_PAINS), rng.choice(_METHODS)
+    title = f"{adjective} {track} {noun}"
+    return {
+        "name": re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_"),
+        "title": title,
+        "problem": f"In {track}, {users} {pain}.",
+        "solution": f"{title} uses {method} so {users} can act without the busywork.",
+        "tech_stack": rng.sample(_TECH, 4),
+        "unique_angle": f"Combines {method} with {rng.choice(_METHODS)} for {users}.",
+        "demo_potential": f"Live walkthrough of a {users} scenario end to end in under three minutes.",
+        "feasibility_score": rng.randint(5, 9),
+        "innovation_score": rng.randint(4, 9),
+        "impact_score": rng.randint(4, 9),
+        "sources": [f"https://example.com/{hashlib.md5(title.encode()).hexdigest()[:8]}"]
+    }
+
+
+def synthetic_evaluation(rng: random.Random) -> dict:
+    """A plausible, schema-complete critique evaluation."""
+    scores = {key: rng.randint(4, 9) for key in _SCORE_KEYS}
+    overall = round(sum(scores.values()) / len(scores), 1)
+    return {
+        "scores": scores,
+        "overall_score": overall,
+        "verdict": "PASS" if overall >= 7 else "FAIL",
+        "strengths": rng.sample(_STRENGTHS, 2),
+        "weaknesses": rng.sample(_WEAKNESSES, 2),
+        "improvement_suggestions": [f"Narrow the audience to {rng.choice(_USERS)}", "Show a before/after metric in the demo"],
+        "killer_feature_idea": f"Add {rng.choice(_METHODS)} as a stretch goal",
+        "reasoning": f"Solid but unproven; scored {overall}/10."
+    }
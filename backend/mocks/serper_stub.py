@@ -0,0 +1,150 @@
+"""Offline stand-in for the Serper API: an in-process search and a local stub server.
+
+Usage (from backend/):
+    python -m mocks --port 8787
+    SERPER_BASE_URL=http://127.0.0.1:8787 python main.py
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from .fixtures import SEARCH_FIXTURES, fixture_file, search_key
+from .latency import LatencyProfile
+
+# Mean search latency in milliseconds
+MOCK_SEARCH_LATENCY_MS = float(os.getenv("MOCK_SEARCH_LATENCY_MS", "100"))
+# Fraction of searches that fail (503 from the stub server)
+MOCK_SEARCH_FAILURE_RATE = float(os.getenv("MOCK_SEARCH_FAILURE_RATE", "0"))
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"site", "com", "or", "and", "the", "reddit", "medium", "dev", "to", "hackernoon", "twitter"}
+_SITES = ["reddit.com", "dev.to", "medium.com", "news.ycombinator.com", "devpost.com", "github.com"]
+_ANGLES = [
+    "Why is {topic} still so painful?", "I built a tool for {topic}", "Ask: best way to handle {topic}",
+    "Lessons from a year of {topic}", "{topic} is broken - here's what we tried", "Show HN: open-source {topic}",
+]
+
+_profile: Optional[LatencyProfile] = None
+
+
+class MockSearchError(RuntimeError):
+    """Injected search failure (see MOCK_SEARCH_FAILURE_RATE)."""
+    status_code = 503  # transient, like a Serper outage
+
+
+def synthetic_search(query: str, num_results: int = 10) -> dict:
+    """A deterministic, Serper-shaped response built from the query words."""
+    rng = random.Random(hashlib.sha256(query.encode()).hexdigest())
+    words = [w for w in _WORD.findall(query.lower()) if w not in _STOPWORDS] or ["software"]
+    organic = []
+    for position in range(1, num_results + 1):
+        topic = " ".join(rng.sample(words, min(len(words), rng.randint(1, 3))))
+        site = rng.choice(_SITES)
+        organic.append({
+            "title": rng.choice(_ANGLES).format(topic=topic),
+            "link": f"https://{site}/{'-'.join(topic.split())}-{rng.randrange(10**6)}",
+            "snippet": (
+                f"People working on {topic} keep running into the same problem: "
+                f"{rng.choice(words)} tooling is slow, manual and hard to share."
+            ),
+            "position": position
+        })
+    return {
+        "searchParameters": {"q": query, "num": num_results},
+        "organic": organic,
+        "peopleAlsoAsk": [
+            {"question": f"How do I get started with {words[0]}?", "snippet": f"Most teams start {words[0]} small."}
+        ]
+    }
+
+
+def lookup(query: str, search_type: str, num_results: int) -> dict:
+    """The recorded response for a search, or a synthetic one."""
+    recorded = fixture_file(SEARCH_FIXTURES).get(search_key(query, search_type, num_results))
+    if recorded is not None:
+        return recorded["response"]
+    return synthetic_search(query, num_results)
+
+
+async def mock_search(query: str, num_results: int = 10, search_type: str = "search") -> dict:
+    """In-process replacement for a Serper request, used when USE_MOCK is on."""
+    global _profile
+    if _profile is None:
+        _profile = LatencyProfile(MOCK_SEARCH_LATENCY_MS, MOCK_SEARCH_FAILURE_RATE)
+    delay, failed = _profile.draw()
+    await asyncio.sleep(delay)
+    if failed:
+        raise MockSearchError(f"Injected search failure for '{query}'")
+    return lookup(query, search_type, num_results)
+
+
+class StubSerperHandler(BaseHTTPRequestHandler):
+    """Keep-alive capable stand-in for google.serper.dev."""
+
+    protocol_version = "HTTP/1.1"
+    profile = LatencyProfile(0)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            payload = {}
+        delay, failed = self.profile.draw()
+        if delay:
+            time.sleep(delay)
+        if failed:
+            self._reply(503, b'{"message": "injected failure"}')
+            return
+        search_type = self.path.strip("/") or "search"
+        body = json.dumps(lookup(str(payload.get("q", "")), search_type, int(payload.get("num", 10)))).encode()
+        self._reply(200, body)
+
+    def _reply(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(
+    latency_ms: float = MOCK_SEARCH_LATENCY_MS,
+    failure_rate: float = MOCK_SEARCH_FAILURE_RATE,
+    host: str = "127.0.0.1",
+    port: int = 0
+) -> ThreadingHTTPServer:
+    """Start the stub server in a background thread (port 0 picks a free port)."""
+    StubSerperHandler.profile = LatencyProfile(latency_ms, failure_rate)
+    server = ThreadingHTTPServer((host, port), StubSerperHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the Serper API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=MOCK_SEARCH_LATENCY_MS, help="Mean response latency")
+    parser.add_argument("--failure-rate", type=float, default=MOCK_SEARCH_FAILURE_RATE, help="Fraction of 503s")
+    args = parser.parse_args()
+
+    server = start_stub_server(args.latency_ms, args.failure_rate, args.host, args.port)
+    host, port = server.server_address
+    print(f"🧪 Stub Serper listening on http://{host}:{port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,197 @@
+"""Server-Sent Events transport for forge update streams."""
+import asyncio
+import os
+import zlib
+from typing import AsyncGenerator, AsyncIterator, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from metrics import bind_run, count, span, unbind_run
+
+try:
+    import orjson
+
+    def dumps(data) -> bytes:
+        return orjson.dumps(data)
+except ImportError:  # pragma: no cover - orjson is a dependency; stdlib keeps partial installs working
+    import json
+
+    def dumps(data) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode()
+
+# Seconds of silence before a heartbeat comment is sent
+SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))
+# How long to hold a token event to merge it with the ones right behind it
+SSE_COALESCE_MS = float(os.getenv("SSE_COALESCE_MS", "25"))
+# Upper bound on updates merged into one write
+SSE_MAX_BATCH = int(os.getenv("SSE_MAX_BATCH", "64"))
+# gzip the stream for clients that send Accept-Encoding: gzip
+SSE_GZIP = os.getenv("SSE_GZIP", "false").lower() == "true"
+
+HEARTBEAT = b": ping\n\n"
+
+_END = object()
+
+
+def encode_update(session_id: Optional[str], update) -> bytes:
+    """Serialize one ForgeUpdate as an SSE message, omitting empty fields."""
+    if update.stage == "token":
+        data = {
+            "session_id": session_id,
+            "iteration": update.iteration,
+            "stage": update.stage,
+            "agent": update.agent,
+            "delta": update.delta
+        }
+        return b"event: token\ndata: " + dumps(data) + b"\n\n"
+
+    data = {
+        "session_id": session_id,
+        "iteration": update.iteration,
+        "stage": update.stage,
+        "message": update.message
+    }
+    if update.idea is not None:
+        data["idea"] = update.idea
+    if update.evaluation is not None:
+        data["evaluation"] = update.evaluation
+    if update.missing_sources:
+        data["missing_sources"] = update.missing_sources
+    if update.timings:
+        data["timings"] = update.timings
+    if update.usage:
+        data["usage"] = update.usage
+    return b"data: " + dumps(data) + b"\n\n"
+
+
+def encode_error(error: Exception) -> bytes:
+    return b"data: " + dumps({"error": str(error)}) + b"\n\n"
+
+
+def coalesce(updates: list) -> list:
+    """
+    Merge token updates per agent between status updates.
+
+    Interleaved streams (e.g. beam candidates) each collapse into one token
+    event per agent; status updates keep their position in the sequence.
+    """
+    merged = []
+    pending: dict = {}
+    for update in updates:
+        if update.stage != "token":
+            merged.extend(pending.values())
+            pending.clear()
+            merged.append(update)
+            continue
+        key = (update.iteration, update.agent)
+        previous = pending.get(key)
+        if previous is None:
+            pending[key] = update
+        else:
+            pending[key] = type(update)(
+                iteration=update.iteration,
+                stage="token",
+                agent=update.agent,
+                delta=previous.delta + update.delta
+            )
+    merged.extend(pending.values())
+    return merged
+
+
+async def _pump(updates: AsyncIterator, queue: asyncio.Queue) -> None:
+    try:
+        async for update in updates:
+            await queue.put(update)
+    except Exception as e:
+        await queue.put(e)
+    await queue.put(_END)
+
+
+async def _event_stream(
+    request: Request,
+    forge,
+    updates: AsyncIterator,
+    heartbeat: float,
+    coalesce_window: float
+) -> AsyncGenerator[bytes, None]:
+    # Bound before the pump starts, so the run and its flushes share one RunTimings
+    run_token = bind_run(forge.timings)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SSE_MAX_BATCH * 4)
+    pump = asyncio.create_task(_pump(updates, queue))
+    finished = False
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield HEARTBEAT
+                continue
+
+            batch = [item]
+            # Hold token bursts briefly so they go out as one merged event
+            if coalesce_window and getattr(item, "stage", None) == "token":
+                await asyncio.sleep(coalesce_window)
+            while len(batch) < SSE_MAX_BATCH and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            forge_updates = [u for u in batch if u is not _END and not isinstance(u, Exception)]
+            chunk = [encode_update(forge.session_id, u) for u in coalesce(forge_updates)]
+            chunk += [encode_error(u) for u in batch if isinstance(u, Exception)]
+            if chunk:
+                data = b"".join(chunk)
+                count("sse_bytes_total", len(data))
+                with span("sse_flush"):
+                    yield data
+            if _END in batch:
+                finished = True
+                break
+    finally:
+        if not finished:
+            # Client went away: stop the run instead of generating for nobody
+            forge.interrupt()
+        pump.cancel()
+        await asyncio.gather(pump, return_exceptions=True)
+        unbind_run(run_token)
+
+
+async def _gzip_stream(events: AsyncGenerator[bytes, None]) -> AsyncGenerator[bytes, None]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    try:
+        async for chunk in events:
+            # Sync flush so each event reaches the client immediately
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        await events.aclose()
+
+
+def sse_response(
+    request: Request,
+    forge,
+    updates: AsyncIterator,
+    heartbeat: float = SSE_HEARTBEAT_INTERVAL,
+    coalesce_ms: float = SSE_COALESCE_MS,
+    gzip: bool = SSE_GZIP
+) -> StreamingResponse:
+    """
+    Wrap a forge update stream as an SSE response.
+
+    Sends heartbeat comments during quiet periods, merges bursts of token
+    updates, interrupts the run when the client disconnects, and gzips the
+    stream when enabled and accepted by the client.
+    """
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",
+        "X-Session-Id": forge.session_id,
+    }
+    events = _event_stream(request, forge, updates, heartbeat, coalesce_ms / 1000)
+    if gzip and "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+        events = _gzip_stream(events)
+    return StreamingResponse(events, media_type="text/event-stream", headers=headers)
@@ -0,0 +1,473 @@
+"""Persistent store for runs, ideas, evaluations and stage timings (SQLite, WAL mode)."""
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, List, Optional, Tuple
+
+STORE_ENABLED = os.getenv("STORE_ENABLED", "true").lower() == "true"
+STORE_PATH = os.getenv("STORE_PATH", "data/idea_forge.db")
+# Writes are queued and committed together, at most this many per transaction
+STORE_BATCH_SIZE = int(os.getenv("STORE_BATCH_SIZE", "200"))
+# Longest a queued write waits before being committed (seconds)
+STORE_FLUSH_INTERVAL = float(os.getenv("STORE_FLUSH_INTERVAL", "0.5"))
+
+MAX_PAGE_SIZE = 200
+
+# Stages that end a run; anything else as the last stage means it was cut short
+TERMINAL_STAGES = {"complete", "max_iterations", "budget_exceeded", "early_stopped", "interrupted"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    track TEXT NOT NULL,
+    problem_statement TEXT NOT NULL DEFAULT '',
+    threshold INTEGER,
+    max_iterations INTEGER,
+    beam_width INTEGER,
+    status TEXT NOT NULL,
+    iterations INTEGER NOT NULL DEFAULT 0,
+    best_score REAL,
+    final_idea_id TEXT,
+    critique_calls_saved INTEGER NOT NULL DEFAULT 0,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_track_time ON runs (track, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_time ON runs (started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_score ON runs (best_score);
+
+CREATE TABLE IF NOT EXISTS ideas (
+    id TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    track TEXT NOT NULL,
+    title TEXT NOT NULL,
+    score REAL,
+    verdict TEXT,
+    idea TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ideas_run ON ideas (run_id);
+CREATE INDEX IF NOT EXISTS idx_ideas_track_time ON ideas (track, created_at);
+CREATE INDEX IF NOT EXISTS idx_ideas_time ON ideas (created_at);
+CREATE INDEX IF NOT EXISTS idx_ideas_score ON ideas (score, created_at);
+
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idea_id TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    overall_score REAL,
+    verdict TEXT,
+    evaluation TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_idea ON evaluations (idea_id);
+CREATE INDEX IF NOT EXISTS idx_evaluations_run ON evaluations (run_id);
+
+CREATE TABLE IF NOT EXISTS timings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_timings_run ON timings (run_id);
+"""
+
+_STOP = object()
+
+
+class IdeaStore:
+    """
+    Embedded store for forge history.
+
+    Writes never block the event loop: they are queued and a background
+    thread commits them in batches. Reads run in the default executor on
+    their own connection, which WAL mode lets proceed alongside writes.
+    """
+
+    def __init__(
+        self,
+        path: str = STORE_PATH,
+        batch_size: int = STORE_BATCH_SIZE,
+        flush_interval: float = STORE_FLUSH_INTERVAL
+    ):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._write_db = self._connect()
+        self._write_db.executescript(SCHEMA)
+        self._write_db.commit()
+        self._read_db = self._connect()
+        self._read_lock = threading.Lock()
+
+        self._writes: queue.Queue = queue.Queue()
+        self.writes_committed = 0
+        self.batches_committed = 0
+        self._writer = threading.Thread(target=self._write_loop, name="idea-store", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # -- writes ---------------------------------------------------------
+
+    def start_run(self, run_id: str, state) -> None:
+        """Record a run as started."""
+        self._enqueue(
+            "INSERT OR REPLACE INTO runs (id, mode, track, problem_statement, threshold,"
+            " max_iterations, beam_width, status, started_at) VALUES (?, ?, ?, ?, ?, ?, ?, 'running', ?)",
+            (run_id, state.mode.value, state.track, state.problem_statement, state.threshold,
+             state.max_iterations, state.beam_width, time.time())
+        )
+
+    def add_idea(self, run_id: str, iteration: int, track: str, idea: dict) -> str:
+        """Record a generated idea; returns its ID for linking evaluations."""
+        idea_id = uuid.uuid4().hex
+        self._enqueue(
+            "INSERT INTO ideas (id, run_id, iteration, track, title, idea, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (idea_id, run_id, iteration, track, idea.get("title") or idea.get("name") or "Untitled",
+             json.dumps(idea), time.time())
+        )
+        return idea_id
+
+    def add_evaluation(self, run_id: str, idea_id: str, evaluation: dict) -> None:
+        """Record an evaluation and denormalize its score onto the idea."""
+        score = evaluation.get("overall_score")
+        verdict = evaluation.get("verdict")
+        self._enqueue(
+            "INSERT INTO evaluations (idea_id, run_id, overall_score, verdict, evaluation, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (idea_id, run_id, score, verdict, json.dumps(evaluation), time.time())
+        )
+        self._enqueue("UPDATE ideas SET score = ?, verdict = ? WHERE id = ?", (score, verdict, idea_id))
+
+    def add_timing(self, run_id: str, iteration: int, stage: str, started_at: float, duration_ms: float) -> None:
+        """Record how long a stage of a run took."""
+        self._enqueue(
+            "INSERT INTO timings (run_id, iteration, stage, started_at, duration_ms) VALUES (?, ?, ?, ?, ?)",
+            (run_id, iteration, stage, started_at, duration_ms)
+        )
+
+    def finish_run(
+        self,
+        run_id: str,
+        status: str,
+        iterations: int,
+        best_score: Optional[float],
+        final_idea_id: Optional[str],
+        critique_calls_saved: int = 0
+    ) -> None:
+        """Record a run's outcome."""
+        self._enqueue(
+            "UPDATE runs SET status = ?, iterations = ?, best_score = ?, final_idea_id = ?,"
+            " critique_calls_saved = ?, finished_at = ? WHERE id = ?",
+            (status, iterations, best_score, final_idea_id, critique_calls_saved, time.time(), run_id)
+        )
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued write is committed. Returns False on timeout."""
+        done = threading.Event()
+        self._writes.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Commit outstanding writes and close the database."""
+        self._writes.put(_STOP)
+        self._writer.join()
+        self._write_db.close()
+        with self._read_lock:
+            self._read_db.close()
+
+    def _enqueue(self, sql: str, params: tuple) -> None:
+        self._writes.put((sql, params))
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._writes.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Flush requests and shutdown commit immediately instead of waiting out the interval
+            while len(batch) < self.batch_size and isinstance(batch[-1], tuple):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._writes.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            writes = [item for item in batch if isinstance(item, tuple)]
+            if writes:
+                try:
+                    with self._write_db:
+                        for sql, params in writes:
+                            self._write_db.execute(sql, params)
+                    self.writes_committed += len(writes)
+                    self.batches_committed += 1
+                except sqlite3.Error as e:
+                    print(f"⚠️ Failed to write {len(writes)} record(s) to the idea store: {e}")
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if batch[-1] is _STOP:
+                return
+
+    # -- reads ----------------------------------------------------------
+
+    async def list_runs(
+        self,
+        track: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """Most recent runs first, paginated with an opaque cursor."""
+        where, params = [], []
+        if track:
+            where.append("track = ?")
+            params.append(track)
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        return await self._page(
+            "SELECT * FROM runs", where, params, "started_at", limit, cursor, self._run_row
+        )
+
+    async def list_ideas(
+        self,
+        track: Optional[str] = None,
+        min_score: Optional[float] = None,
+        verdict: Optional[str] = None,
+        sort: str = "recent",
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Ideas across all runs, paginated with an opaque cursor.
+
+        Args:
+            track: Only ideas from this track
+            min_score: Only ideas scored at least this high
+            verdict: Only ideas with this verdict (PASS/FAIL)
+            sort: "recent" (newest first) or "score" (highest first)
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            cursor: ``next_cursor`` from the previous page
+        """
+        where, params = [], []
+        if track:
+            where.append("track = ?")
+            params.append(track)
+        if min_score is not None:
+            where.append("score >= ?")
+            params.append(min_score)
+        if verdict:
+            where.append("verdict = ?")
+            params.append(verdict)
+        order = "score" if sort == "score" else "created_at"
+        if order == "score":
+            where.append("score IS NOT NULL")
+        return await self._page(
+            "SELECT * FROM ideas", where, params, order, limit, cursor, self._idea_row
+        )
+
+    def ideas_since(
+        self,
+        after: Optional[Tuple[float, str]] = None,
+        before: Optional[float] = None,
+        limit: int = 1000
+    ) -> List[dict]:
+        """
+        Ideas created after ``after`` (created_at, id) and before ``before``, oldest first.
+
+        Synchronous - meant for background jobs (e.g. incremental index
+        builds) running off the event loop. Pass a ``before`` safely older
+        than the flush interval so batched writes can't land behind the cursor.
+        """
+        where, params = [], []
+        if after is not None:
+            where.append("(created_at > ? OR (created_at = ? AND id > ?))")
+            params += [after[0], after[0], after[1]]
+        if before is not None:
+            where.append("created_at < ?")
+            params.append(before)
+        sql = "SELECT * FROM ideas"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at, id LIMIT ?"
+        return [self._idea_row(row) for row in self._read(sql, tuple(params + [limit]))]
+
+    async def get_run(self, run_id: str) -> Optional[dict]:
+        """A run with its ideas, evaluations and stage timings."""
+        def query() -> Optional[dict]:
+            run = self._read("SELECT * FROM runs WHERE id = ?", (run_id,))
+            if not run:
+                return None
+            ideas = self._read("SELECT * FROM ideas WHERE run_id = ? ORDER BY created_at", (run_id,))
+            evaluations = self._read(
+                "SELECT * FROM evaluations WHERE run_id = ? ORDER BY created_at", (run_id,)
+            )
+            timings = self._read(
+                "SELECT iteration, stage, started_at, duration_ms FROM timings"
+                " WHERE run_id = ? ORDER BY started_at", (run_id,)
+            )
+            by_idea = {}
+            for row in evaluations:
+                by_idea[row["idea_id"]] = json.loads(row["evaluation"])
+            result = self._run_row(run[0])
+            result["ideas"] = [
+                {**self._idea_row(row), "evaluation": by_idea.get(row["id"])} for row in ideas
+            ]
+            result["timings"] = [dict(row) for row in timings]
+            return result
+
+        return await asyncio.get_running_loop().run_in_executor(None, query)
+
+    async def _page(
+        self,
+        select: str,
+        where: List[str],
+        params: List[Any],
+        order: str,
+        limit: int,
+        cursor: Optional[str],
+        convert
+    ) -> dict:
+        # Keyset pagination on (order column, id): stable under concurrent inserts
+        # and as cheap on page 1000 as on page 1
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        if cursor:
+            value, last_id = _decode_cursor(cursor)
+            where = where + [f"({order} < ? OR ({order} = ? AND id < ?))"]
+            params = params + [value, value, last_id]
+        sql = select
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order} DESC, id DESC LIMIT ?"
+
+        rows = await asyncio.get_running_loop().run_in_executor(
+            None, self._read, sql, tuple(params + [limit + 1])
+        )
+        items = [convert(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = f"{last[order]}|{last['id']}"
+        return {"items": items, "next_cursor": next_cursor}
+
+    def _read(self, sql: str, params: tuple) -> List[sqlite3.Row]:
+        with self._read_lock:
+            return self._read_db.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _run_row(row: sqlite3.Row) -> dict:
+        return dict(row)
+
+    @staticmethod
+    def _idea_row(row: sqlite3.Row) -> dict:
+        data = dict(row)
+        data["idea"] = json.loads(data["idea"])
+        return data
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        value, last_id = cursor.rsplit("|", 1)
+        return float(value), last_id
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+class RunRecorder:
+    """
+    Mirrors one forge run into an IdeaStore as its updates stream by.
+
+    New entries in the forge's ideas/evaluations lists are written after
+    each update, and the time between consecutive stage updates is
+    recorded as that stage's duration.
+    """
+
+    def __init__(self, store: IdeaStore, forge):
+        self.store = store
+        self.forge = forge
+        self.run_id = forge.session_id or uuid.uuid4().hex[:12]
+        self._started = False
+        self._idea_ids: List[str] = []
+        self._evaluations_seen = 0
+        self._stage: Optional[Tuple[str, int, float]] = None
+        self._last_stage: Optional[str] = None
+
+    def observe(self, update=None) -> None:
+        """Persist whatever the forge state gained since the last update."""
+        state = self.forge.state
+        if state is None:
+            return
+        if not self._started:
+            self.store.start_run(self.run_id, state)
+            self._started = True
+
+        for idea in state.ideas_generated[len(self._idea_ids):]:
+            self._idea_ids.append(
+                self.store.add_idea(self.run_id, state.current_iteration, state.track, idea)
+            )
+        for index in range(self._evaluations_seen, len(state.evaluations)):
+            if index < len(self._idea_ids):
+                self.store.add_evaluation(self.run_id, self._idea_ids[index], state.evaluations[index])
+                self._evaluations_seen = index + 1
+
+        if update is not None and update.stage != "token":
+            self._close_stage()
+            self._stage = (update.stage, update.iteration, time.time())
+
+    def finish(self, status: Optional[str] = None) -> None:
+        """Record the run's outcome; ``status`` defaults to the last stage seen."""
+        self.observe()
+        self._close_stage()
+        state = self.forge.state
+        if state is None:
+            return
+        if status is None:
+            status = self._last_stage
+            if status not in TERMINAL_STAGES:
+                # Stream ended early, e.g. the client disconnected
+                status = "interrupted" if state.is_interrupted else "incomplete"
+        scores = [
+            e["overall_score"] for e in state.evaluations
+            if isinstance(e.get("overall_score"), (int, float))
+        ]
+        final_idea_id = None
+        if state.final_idea is not None:
+            for idea, idea_id in zip(state.ideas_generated, self._idea_ids):
+                if idea is state.final_idea:
+                    final_idea_id = idea_id
+        self.store.finish_run(
+            self.run_id,
+            status=status,
+            iterations=state.current_iteration or (1 if state.ideas_generated else 0),
+            best_score=max(scores) if scores else None,
+            final_idea_id=final_idea_id,
+            critique_calls_saved=state.critique_calls_saved
+        )
+
+    def _close_stage(self) -> None:
+        if self._stage is None:
+            return
+        stage, iteration, started_at = self._stage
+        self.store.add_timing(self.run_id, iteration, stage, started_at, (time.time() - started_at) * 1000)
+        self._last_stage = stage
+        self._stage = None
@@ -0,0 +1,329 @@
+"""Shared fixtures: the suite runs offline, with search and model calls stubbed."""
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+# Set before any backend module reads its config at import time
+os.environ.setdefault("SERPER_API_KEY", "test-key")
+# Agents build their model clients offline; tests stub every model call
+os.environ.setdefault("USE_OPENAI", "true")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+# The API's history store and retrieval index would otherwise write to backend/data
+os.environ.setdefault("STORE_ENABLED", "false")
+os.environ.setdefault("RETRIEVAL_MODE", "off")
+
+import httpx
+import pytest
+
+from agents.critique import CritiqueAgent
+from agents.forge import IdeaForge
+from agents.researcher import ResearcherAgent, SearchResults
+from agents.sessions import SessionRegistry
+from store import IdeaStore
+from tools import resilience, set_search_client
+
+
+class SearchStub:
+    """Answers Serper requests in-process and records them."""
+
+    def __init__(self):
+        self.requests = []
+        # Queries containing any of these fail with HTTP 400
+        self.failing = set()
+        # The next this many requests fail with HTTP 503
+        self.outages = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        query = json.loads(request.content)["q"]
+        if any(marker in query for marker in self.failing):
+            return httpx.Response(400, json={"message": "bad request"})
+        if self.outages:
+            self.outages -= 1
+            return httpx.Response(503, json={"message": "service unavailable"})
+        return httpx.Response(200, json={"organic": [
+            {"title": f"Result for {query}", "link": "https://example.com/result", "snippet": query}
+        ]})
+
+    @property
+    def queries(self) -> list:
+        return [json.loads(request.content)["q"] for request in self.requests]
+
+
+@pytest.fixture(autouse=True)
+def closed_circuits(monkeypatch):
+    """Retry without backoff, and close the shared upstreams' circuits after each test."""
+    monkeypatch.setattr(resilience, "RETRY_BASE_DELAY", 0)
+    yield
+    for upstream in resilience._upstreams.values():
+        upstream.breaker.record_success()
+
+
+@pytest.fixture
+def search_stub():
+    """Install a shared Serper client answered by a SearchStub."""
+    stub = SearchStub()
+    set_search_client(httpx.AsyncClient(transport=httpx.MockTransport(stub.handle)))
+    yield stub
+    set_search_client(None)
+
+
+@pytest.fixture
+def researcher() -> ResearcherAgent:
+    """A researcher built on the test model config, without a search client of its own."""
+    return ResearcherAgent()
+
+
+class ScriptedModel:
+    """
+    Answers an agent pool's calls with canned replies (the last one repeats)
+    and records the prompts. An exception among the replies is raised instead.
+    """
+
+    def __init__(self, *replies: str):
+        self.replies = list(replies)
+        self.prompts = []
+
+    async def run(self, prompt: str, on_token=None, **kwargs):
+        self.prompts.append(prompt)
+        reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        if on_token:
+            on_token(reply)
+        return SimpleNamespace(content=reply)
+
+
+IDEA_REPLY = json.dumps({
+    "title": "Queue Radar",
+    "problem": "Patients wait hours without knowing where they are in line",
+    "solution": "Live queue positions over SMS",
+    "unique_angle": "Works on any phone",
+    "tech_stack": ["FastAPI", "Twilio"]
+})
+
+
+@pytest.fixture
+def researcher_model(researcher, monkeypatch) -> ScriptedModel:
+    """Stub the researcher's model calls; each returns IDEA_REPLY unless ``replies`` is reset."""
+    model = ScriptedModel(IDEA_REPLY)
+    monkeypatch.setattr(researcher.agents, "run", model.run)
+    return model
+
+
+EVALUATION_REPLY = json.dumps({
+    "scores": {"innovation": 6, "feasibility": 8, "impact": 7},
+    "overall_score": 7,
+    "strengths": ["Clear user"],
+    "weaknesses": ["Crowded space"],
+    "improvement_suggestions": ["Integrate with clinic systems"]
+})
+
+
+@pytest.fixture
+def critique() -> CritiqueAgent:
+    """A critique agent built on the test model config, with its own empty cache."""
+    return CritiqueAgent()
+
+
+@pytest.fixture
+def critique_model(critique, monkeypatch) -> ScriptedModel:
+    """Stub the critique's model calls; each returns EVALUATION_REPLY unless ``replies`` is reset."""
+    model = ScriptedModel(EVALUATION_REPLY)
+    monkeypatch.setattr(critique.agents, "run", model.run)
+    return model
+
+
+class ScriptedProviders:
+    """
+    Replaces run_agent for routed model calls, answering per model id.
+
+    A script is a list of steps: a string is streamed as one delta, a
+    number is a pause in seconds, and an exception is raised. A model's
+    entry in ``scripts`` is one script for every call, or a list of
+    scripts, one per call (the last repeats). The reply is the model id.
+    """
+
+    def __init__(self):
+        self.scripts = {}
+        self.started = []
+        self.cancelled = []
+
+    async def run_agent(self, agent, prompt: str, on_token=None):
+        model_id = agent.model.id
+        self.started.append(model_id)
+        script = self.scripts.get(model_id, [])
+        if script and isinstance(script[0], list):
+            script = script.pop(0) if len(script) > 1 else script[0]
+        try:
+            for step in script:
+                if isinstance(step, Exception):
+                    raise step
+                if isinstance(step, str):
+                    if on_token:
+                        on_token(step)
+                else:
+                    await asyncio.sleep(step)
+        except asyncio.CancelledError:
+            self.cancelled.append(model_id)
+            raise
+        return SimpleNamespace(content=model_id)
+
+
+@pytest.fixture
+def providers(monkeypatch) -> ScriptedProviders:
+    """Script the model calls made through every ModelRouter."""
+    import agents.routing
+
+    scripted = ScriptedProviders()
+    monkeypatch.setattr(agents.routing, "run_agent", scripted.run_agent)
+    return scripted
+
+
+class FakeResearcher:
+    """Stands in for ResearcherAgent: canned searches and distinct ideas, no model calls."""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.searches = 0
+        # (mode, keyword arguments) of every generation request
+        self.calls = []
+        self.inflight = 0
+        self.peak = 0
+        # Re-propose the same idea under a new title every time
+        self.same_idea = False
+
+    async def search_for_problems(self, track: str, requirements: str = "") -> SearchResults:
+        return await self._search()
+
+    async def search_for_winners(self, track: str, requirements: str = "") -> SearchResults:
+        return await self._search()
+
+    async def generate_idea_independent(self, track: str, requirements: str = "", **kwargs) -> dict:
+        return await self._generate("independent", kwargs)
+
+    async def generate_idea_depth(self, **kwargs) -> dict:
+        return await self._generate("depth", kwargs)
+
+    async def _search(self) -> SearchResults:
+        self.searches += 1
+        await asyncio.sleep(self.delay)
+        return SearchResults(results={"winners": {"organic": []}})
+
+    async def _generate(self, mode: str, kwargs: dict) -> dict:
+        n = len(self.calls)
+        self.calls.append((mode, kwargs))
+        self.inflight += 1
+        self.peak = max(self.peak, self.inflight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.inflight -= 1
+        on_token = kwargs.get("on_token")
+        if on_token:
+            for delta in (f"Idea {n}", " draft"):
+                on_token(delta)
+        # Every idea gets its own vocabulary, so none reads as a near-duplicate
+        v = 0 if self.same_idea else n
+        return {
+            "title": f"Idea {n}",
+            "problem": " ".join(f"problem{v}x{i}" for i in range(6)),
+            "solution": " ".join(f"solution{v}x{i}" for i in range(6)),
+            "unique_angle": f"angle{v}",
+            "tech_stack": [f"tool{v}"],
+        }
+
+
+class FakeCritique:
+    """Stands in for CritiqueAgent, scoring ideas from ``scores`` (the last one repeats)."""
+
+    def __init__(self):
+        self.scores = [5]
+        self.delay = 0.0
+        self.evaluated = []
+
+    async def evaluate_idea(
+        self,
+        idea: dict,
+        track: str = "",
+        problem_statement: str = "",
+        threshold: int = 7,
+        on_token=None,
+        **kwargs
+    ) -> dict:
+        self.evaluated.append(idea)
+        await asyncio.sleep(self.delay)
+        if on_token:
+            on_token(f"Scoring {idea['title']}")
+        score = self.scores.pop(0) if len(self.scores) > 1 else self.scores[0]
+        return {
+            "overall_score": score,
+            "verdict": "PASS" if score >= threshold else "FAIL",
+            "scores": {"feasibility": score, "innovation": score},
+            "weaknesses": [f"weak spot in {idea['title']}"],
+        }
+
+    async def evaluate_ideas(
+        self,
+        ideas: list,
+        track: str = "",
+        problem_statement: str = "",
+        threshold: int = 7,
+        **kwargs
+    ) -> list:
+        return [await self.evaluate_idea(idea, track, problem_statement, threshold) for idea in ideas]
+
+    def get_improvement_feedback(self, evaluation: dict) -> str:
+        return f"Weaknesses to address: {', '.join(evaluation['weaknesses'])}"
+
+
+@pytest.fixture
+def fake_researcher() -> FakeResearcher:
+    return FakeResearcher()
+
+
+@pytest.fixture
+def fake_critique() -> FakeCritique:
+    return FakeCritique()
+
+
+@pytest.fixture
+def forge(fake_researcher, fake_critique) -> IdeaForge:
+    """A forge over the fake agents."""
+    return IdeaForge(researcher=fake_researcher, critique=fake_critique)
+
+
+@pytest.fixture
+def registry(fake_researcher, fake_critique) -> SessionRegistry:
+    """A session registry over the fake agents."""
+    registry = SessionRegistry()
+    registry.researcher, registry.critique = fake_researcher, fake_critique
+    return registry
+
+
+@pytest.fixture
+def store(tmp_path) -> IdeaStore:
+    """An idea store in a temporary directory, flushing writes almost immediately."""
+    store = IdeaStore(str(tmp_path / "ideas.db"), flush_interval=0.01)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def client():
+    """The API under a TestClient, so its lifespan runs."""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def fake_client(client, fake_researcher, fake_critique):
+    """The API client, with its registry running the fake agents."""
+    import main
+
+    main.registry.researcher, main.registry.critique = fake_researcher, fake_critique
+    return client
@@ -0,0 +1,32 @@
+"""Tests for the session endpoints."""
+import main
+
+
+def test_stop_requires_a_session(client):
+    assert client.post("/api/depth/stop").status_code == 400
+
+
+def test_stop_unknown_session(client):
+    assert client.post("/api/depth/stop", params={"session_id": "missing"}).status_code == 404
+    assert client.post("/api/depth/missing/stop").status_code == 404
+
+
+def test_stop_targets_only_the_named_session(client):
+    first, second = main.registry.create(), main.registry.create()
+
+    response = client.post("/api/depth/stop", headers={"X-Session-Id": first.session_id})
+
+    assert response.status_code == 200
+    assert response.json()["session_id"] == first.session_id
+    assert first.cancel_requested
+    assert not second.cancel_requested
+
+    assert client.post(f"/api/depth/{second.session_id}/stop").status_code == 200
+    assert second.cancel_requested
+
+
+def test_session_status(client):
+    forge = main.registry.create()
+
+    assert client.get(f"/api/status/{forge.session_id}").json()["status"] == "idle"
+    assert client.get("/api/status/missing").status_code == 404
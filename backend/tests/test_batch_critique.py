@@ -0,0 +1,128 @@
+"""Tests for batch critique and its use in beam mode."""
+import asyncio
+import json
+
+from agents.forge import IdeaForge
+from conftest import EVALUATION_REPLY
+
+
+def _ideas(count: int) -> list:
+    return [{"title": f"Idea {n}", "solution": f"solution {n}"} for n in range(count)]
+
+
+def _batch_reply(*scores_by_id) -> str:
+    """A batch reply scoring idea ``id`` with ``score`` for each (id, score) pair."""
+    return json.dumps({"evaluations": [
+        {"id": idea_id, "overall_score": score, "scores": {"innovation": score}} for idea_id, score in scores_by_id
+    ]})
+
+
+def _evaluate(critique, ideas: list, threshold: int = 7, **kwargs) -> list:
+    return asyncio.run(critique.evaluate_ideas(ideas, "Healthcare", "Clinic wait times", threshold, **kwargs))
+
+
+def test_one_call_scores_the_batch_in_order(critique, critique_model):
+    # Replies come back out of order, with ids echoed in varying forms
+    critique_model.replies = [_batch_reply((3, 9), (1, 4), ("Idea id 2", 7))]
+
+    evaluations = _evaluate(critique, _ideas(3))
+
+    assert [e["overall_score"] for e in evaluations] == [4, 7, 9]
+    assert [e["verdict"] for e in evaluations] == ["FAIL", "PASS", "PASS"]
+    assert all("id" not in e for e in evaluations)
+    assert len(critique_model.prompts) == 1
+    assert "Idea id 3" in critique_model.prompts[0]
+
+
+def test_batch_results_populate_the_cache(critique, critique_model):
+    ideas = _ideas(2)
+    critique_model.replies = [_batch_reply((1, 8), (2, 5))]
+    _evaluate(critique, ideas)
+
+    evaluation = asyncio.run(critique.evaluate_idea(ideas[0], "Healthcare", "Clinic wait times", threshold=8))
+
+    assert evaluation["verdict"] == "PASS"
+    assert len(critique_model.prompts) == 1
+
+
+def test_cached_ideas_are_left_out_of_the_batch(critique, critique_model):
+    ideas = _ideas(3)
+    asyncio.run(critique.evaluate_idea(ideas[0], "Healthcare", "Clinic wait times"))
+    critique_model.replies = [_batch_reply((1, 6), (2, 6))]
+
+    evaluations = _evaluate(critique, ideas)
+
+    assert [e["overall_score"] for e in evaluations] == [7, 6, 6]
+    assert "Idea 0" not in critique_model.prompts[1]
+
+
+def test_ideas_missing_from_the_reply_are_scored_individually(critique, critique_model):
+    critique_model.replies = [_batch_reply((1, 4), (2, 4)), EVALUATION_REPLY]
+
+    evaluations = _evaluate(critique, _ideas(3))
+
+    assert [e["overall_score"] for e in evaluations] == [4, 4, 7]
+    assert len(critique_model.prompts) == 2
+
+
+def test_a_failed_batch_call_falls_back_to_single_calls(critique, critique_model):
+    critique_model.replies = [RuntimeError("provider down"), EVALUATION_REPLY]
+
+    evaluations = _evaluate(critique, _ideas(3))
+
+    assert [e["overall_score"] for e in evaluations] == [7, 7, 7]
+    assert len(critique_model.prompts) == 4
+
+
+def test_batches_share_the_limiter(critique, critique_model):
+    inflight = peak = 0
+
+    async def run(prompt: str, on_token=None, **kwargs):
+        nonlocal inflight, peak
+        inflight += 1
+        peak = max(peak, inflight)
+        await asyncio.sleep(0.01)
+        inflight -= 1
+        return await critique_model.run(prompt, on_token=on_token)
+
+    critique.agents.run = run
+    critique_model.replies = [_batch_reply((1, 5), (2, 5))]
+
+    async def evaluate():
+        return await critique.evaluate_ideas(
+            _ideas(6), "Healthcare", "Clinic wait times", batch_size=2, limiter=asyncio.Semaphore(1)
+        )
+
+    assert len(asyncio.run(evaluate())) == 6
+    assert len(critique_model.prompts) == 3
+    assert peak == 1
+
+
+def test_each_call_streams_under_its_own_label(critique, critique_model):
+    replies = [_batch_reply((1, 5), (2, 5)), _batch_reply((1, 5)), EVALUATION_REPLY]
+    critique_model.replies = list(replies)
+    streamed = []
+
+    def token_sink(label: str):
+        return lambda delta: streamed.append((label, delta))
+
+    _evaluate(critique, _ideas(4), batch_size=2, token_sink=token_sink)
+
+    # Batch 1 drops idea 3, so it is re-scored on its own
+    assert streamed == [("batch0", replies[0]), ("batch1", replies[1]), ("3", replies[2])]
+
+
+def test_beam_candidates_are_critiqued_in_one_batch(fake_researcher, critique, critique_model):
+    critique_model.replies = [_batch_reply((1, 5), (2, 6), (3, 5))]
+    forge = IdeaForge(researcher=fake_researcher, critique=critique)
+
+    async def run():
+        return [update async for update in forge.run_depth(
+            "Healthcare", "Clinic wait times", max_iterations=1, beam_width=3, stream_tokens=True
+        )]
+
+    updates = asyncio.run(run())
+
+    assert len(critique_model.prompts) == 1
+    critique_tokens = [u for u in updates if u.stage == "token" and u.agent.startswith("critique")]
+    assert [(u.agent, u.delta) for u in critique_tokens] == [("critique:batch0", critique_model.replies[0])]
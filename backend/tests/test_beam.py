@@ -0,0 +1,66 @@
+"""Tests for beam-search depth mode."""
+import asyncio
+
+
+def _run(forge, **kwargs) -> list:
+    async def run():
+        return [
+            update async for update in forge.run_depth("Healthcare", "Clinic wait times", **kwargs)
+        ]
+    return asyncio.run(run())
+
+
+def test_every_candidate_is_generated_and_critiqued(forge, fake_researcher, fake_critique):
+    updates = _run(forge, max_iterations=2, beam_width=3)
+
+    assert len(fake_researcher.calls) == 6
+    assert len(fake_critique.evaluated) == 6
+    variations = [kwargs["variation"] for _, kwargs in fake_researcher.calls[:3]]
+    assert len(set(variations)) == 3
+    assert updates[-1].stage == "max_iterations"
+
+
+def test_best_candidate_decides_the_iteration(forge, fake_critique):
+    fake_critique.scores = [5, 8, 6]
+
+    updates = _run(forge, max_iterations=3, beam_width=3)
+
+    assert updates[-1].stage == "complete"
+    assert updates[-1].idea["title"] == "Idea 1"
+    assert updates[-1].evaluation["overall_score"] == 8
+
+
+def test_survivors_feed_the_next_round(forge, fake_researcher, fake_critique):
+    fake_critique.scores = [4, 6, 5, 4]
+
+    _run(forge, max_iterations=2, beam_width=3, beam_keep=2)
+
+    feedback = [kwargs["feedback"] for _, kwargs in fake_researcher.calls[3:]]
+    assert "Idea 1" in feedback[0]
+    assert "Idea 2" in feedback[1]
+    assert "Idea 1" in feedback[2]
+
+
+def test_beam_concurrency_bounds_generation(forge, fake_researcher):
+    fake_researcher.delay = 0.01
+
+    _run(forge, max_iterations=1, beam_width=4, beam_concurrency=2)
+
+    assert fake_researcher.peak == 2
+
+
+def test_failed_candidates_are_dropped(forge, fake_researcher, fake_critique):
+    generate = fake_researcher.generate_idea_depth
+
+    async def flaky(**kwargs):
+        idea = await generate(**kwargs)
+        if idea["title"] == "Idea 1":
+            raise TimeoutError("model call timed out")
+        return idea
+
+    fake_researcher.generate_idea_depth = flaky
+
+    updates = _run(forge, max_iterations=1, beam_width=3)
+
+    assert [idea["title"] for idea in fake_critique.evaluated] == ["Idea 0", "Idea 2"]
+    assert updates[-1].stage == "max_iterations"
@@ -0,0 +1,109 @@
+"""Tests for the benchmark helpers and regression checks."""
+import asyncio
+import json
+
+import httpx
+
+from benchmarks.bench_e2e import stage_latencies
+from benchmarks.bench_micro import build_cases, time_case
+from benchmarks.common import compare_results, distribution, flatten, report_regressions, save_results
+from verify_stream import read_stream
+
+
+def _baseline(tmp_path, *results) -> str:
+    path = str(tmp_path / "results" / "baseline.json")
+    save_results(path, "test", list(results), {"runs": 1})
+    return path
+
+
+def test_distribution_reports_percentiles_in_ms():
+    stats = distribution([i / 1000 for i in range(1, 101)])
+
+    assert stats == {"p50": 51.0, "p95": 96.0, "p99": 100.0, "mean": 50.5, "max": 100.0}
+    assert distribution([]) == {}
+
+
+def test_flatten_keeps_numbers_only():
+    flat = flatten({"name": "depth", "run_ms": {"p50": 10, "p99": 30}, "failed": False, "runs_per_s": 4.5})
+
+    assert flat == {"run_ms.p50": 10, "run_ms.p99": 30, "runs_per_s": 4.5}
+
+
+def test_saved_results_carry_run_metadata(tmp_path):
+    path = _baseline(tmp_path, {"name": "depth", "run_ms": {"p50": 10}})
+
+    with open(path) as f:
+        document = json.load(f)
+
+    assert document["benchmark"] == "test"
+    assert document["config"] == {"runs": 1}
+    assert {"timestamp", "git_commit", "python", "platform"} <= document.keys()
+
+
+def test_compare_flags_slowdowns_and_throughput_drops(tmp_path):
+    path = _baseline(
+        tmp_path,
+        {"name": "depth", "run_ms": {"p50": 100, "p99": 200, "max": 300}, "runs_per_s": 10.0},
+        {"name": "independent", "run_ms": {"p50": 100}},
+    )
+    results = [
+        # p50 within tolerance, p99 and throughput regressed, max is never gated on
+        {"name": "depth", "run_ms": {"p50": 105, "p99": 260, "max": 900}, "runs_per_s": 5.0},
+        {"name": "independent", "run_ms": {"p50": 50}},
+        {"name": "new-scenario", "run_ms": {"p50": 1000}},
+    ]
+
+    regressions = compare_results(results, path)
+
+    assert regressions == [
+        "depth run_ms.p99: 200 -> 260 (+30%)",
+        "depth runs_per_s: 10.0 -> 5.0 (-50%)",
+    ]
+    assert report_regressions(regressions, path) == 1
+    assert report_regressions([], path) == 0
+
+
+def test_compare_ignores_changes_below_the_noise_floor(tmp_path):
+    path = _baseline(tmp_path, {"name": "parse.clean", "p50_us": 2.0})
+
+    assert compare_results([{"name": "parse.clean", "p50_us": 2.9}], path) == []
+    assert compare_results([{"name": "parse.clean", "p50_us": 3.5}], path, tolerance=0.5) == [
+        "parse.clean p50_us: 2.0 -> 3.5 (+75%)"
+    ]
+
+
+def test_stage_latencies_time_each_stage_until_the_next():
+    latencies = stage_latencies([(0.0, "researching"), (1.0, "evaluating"), (1.5, "researching"), (3.5, "complete")])
+
+    assert dict(latencies) == {"researching": [1.0, 2.0], "evaluating": [0.5]}
+
+
+def test_read_stream_records_status_stages():
+    body = (
+        b'data: {"stage": "researching"}\n\n'
+        b'event: token\ndata: {"stage": "token", "delta": "Hi"}\n\n'
+        b": heartbeat\n\n"
+        b'data: {"error": "search down"}\n\n'
+    )
+
+    async def run():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await read_stream(client, "http://test/api/depth", {})
+
+    stats = asyncio.run(run())
+
+    assert [stage for _, stage in stats["stages"]] == ["researching", "error"]
+    assert stats["token_events"] == 1
+
+
+def test_micro_cases_run_and_report_throughput():
+    cases = build_cases()
+
+    for fn in cases.values():
+        fn()
+    result = time_case(cases["parse.clean"], duration=0.01, batch=4)
+
+    assert result["calls"] % 4 == 0 and result["calls"] > 0
+    assert result["ops_per_s"] > 0
+    assert result["p50_us"] <= result["p99_us"]
@@ -0,0 +1,74 @@
+"""Tests for the TTL + LRU cache and search result caching."""
+import asyncio
+import time
+
+from tools import search_web
+from tools.cache import TTLCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_the_ttl():
+    cache = TTLCache(ttl=0.01)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    time.sleep(0.02)
+
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = TTLCache(path=path, namespace="search")
+    cache.set("key", {"organic": [1, 2]})
+    cache.close()
+
+    reopened = TTLCache(path=path, namespace="search")
+    assert reopened.get("key") == {"organic": [1, 2]}
+    assert reopened.stats()["disk_hits"] == 1
+    other = TTLCache(path=path, namespace="other")
+    assert other.get("key") is None
+    other.close()
+
+
+def test_disk_tier_answers_for_evicted_entries(tmp_path):
+    cache = TTLCache(max_size=1, path=str(tmp_path / "cache.db"))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.flush(timeout=5)
+
+    assert cache.get("a") == 1
+    assert cache.stats()["disk_hits"] == 1
+    cache.close()
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = TTLCache(path=path)
+    cache.set("key", 1)
+    cache.clear()
+    cache.close()
+
+    assert TTLCache(path=path).get("key") is None
+
+
+def test_repeated_and_concurrent_searches_share_one_request(search_stub):
+    async def run():
+        first = await asyncio.gather(*(search_web("cached  Query") for _ in range(3)))
+        return first, await search_web("CACHED query")
+
+    concurrent, repeated = asyncio.run(run())
+
+    assert len(search_stub.requests) == 1
+    assert all(result == repeated for result in concurrent)
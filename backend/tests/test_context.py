@@ -0,0 +1,91 @@
+"""Tests for the ranked, token-budgeted search context."""
+import asyncio
+
+from agents.researcher import SearchResults
+from tools.context import (
+    NO_RESULTS,
+    build_context,
+    count_tokens,
+    dedupe_records,
+    flatten_results,
+    rank_records,
+)
+
+
+def _hit(title: str, snippet: str, link: str) -> dict:
+    return {"title": title, "snippet": snippet, "link": link}
+
+
+def test_flatten_keeps_organic_hits_and_answers():
+    records = flatten_results({
+        "reddit": {
+            "organic": [_hit("Clinic  wait\ntimes", "x" * 50, "https://reddit.com/a"), _hit("", "", "")],
+            "peopleAlsoAsk": [{"question": "Why are waits long?", "snippet": "Staffing", "link": "https://q.com"}],
+            "sitelinks": [{"title": "ignored"}],
+        },
+        "blogs": "not a response",
+    }, snippet_chars=20)
+
+    assert [(r.title, r.source) for r in records] == [
+        ("Clinic wait times", "reddit"),
+        ("Why are waits long?", "reddit"),
+    ]
+    assert len(records[0].snippet) <= 21
+
+
+def test_dedupe_by_url_and_by_title_per_domain():
+    records = flatten_results({"web": {"organic": [
+        _hit("Original", "a", "https://www.example.com/post/"),
+        _hit("Mirror", "b", "https://example.com/post"),
+        _hit("Original", "c", "https://example.com/other"),
+        _hit("Original", "d", "https://elsewhere.com/post"),
+    ]}})
+
+    assert [r.snippet for r in dedupe_records(records)] == ["a", "d"]
+
+
+def test_rank_prefers_relevant_records_and_spreads_domains():
+    records = flatten_results({"web": {"organic": [
+        _hit("Cooking tips", "pasta", "https://food.com/1"),
+        _hit("Clinic wait times", "clinic wait", "https://a.com/1"),
+        _hit("Clinic wait apps", "clinic wait", "https://a.com/2"),
+        _hit("Clinic waiting", "clinic wait", "https://b.com/1"),
+    ]}})
+
+    assert [r.link for r in rank_records(records, "clinic wait times", domain_decay=1)] == [
+        "https://a.com/1", "https://a.com/2", "https://b.com/1", "https://food.com/1"
+    ]
+    assert [r.link for r in rank_records(records, "clinic wait times", domain_decay=0.1)][:2] == [
+        "https://a.com/1", "https://b.com/1"
+    ]
+
+
+def test_context_fits_the_budget():
+    results = {"web": {"organic": [
+        _hit(f"Result {i}", "clinic wait " * 10, f"https://site{i}.com") for i in range(50)
+    ]}}
+
+    context = build_context(results, "clinic wait", budget=200)
+
+    assert 0 < count_tokens(context) <= 200
+    assert build_context({}, "clinic wait") == NO_RESULTS
+
+
+def test_context_can_be_limited_to_sources():
+    results = {
+        "reddit": {"organic": [_hit("From reddit", "", "https://reddit.com/1")]},
+        "blogs": {"organic": [_hit("From a blog", "", "https://blog.com/1")]},
+    }
+
+    assert build_context(results, "", sources=["blogs"]) == "- From a blog (https://blog.com/1)"
+
+
+def test_generation_prompt_carries_the_packed_context(researcher, researcher_model):
+    search = SearchResults(results={"winners": {"organic": [
+        _hit("Clinic queue winner", "Won with live queues", "https://devpost.com/queue")
+    ]}})
+
+    asyncio.run(researcher.generate_idea_depth("Healthcare", "Clinic wait times", search=search))
+
+    assert "- Clinic queue winner: Won with live queues (https://devpost.com/queue)" in researcher_model.prompts[0]
+    assert '"organic"' not in researcher_model.prompts[0]
@@ -0,0 +1,58 @@
+"""Tests for the content-addressed critique cache."""
+import asyncio
+
+from conftest import EVALUATION_REPLY
+
+IDEA = {"title": "Queue Radar", "solution": "Live queue positions over SMS"}
+
+
+def _evaluate(critique, idea=IDEA, threshold: int = 7, track: str = "Healthcare") -> dict:
+    return asyncio.run(critique.evaluate_idea(idea, track, "Clinic wait times", threshold))
+
+
+def test_score_is_reused_across_thresholds(critique, critique_model):
+    assert _evaluate(critique, threshold=7)["verdict"] == "PASS"
+    assert _evaluate(critique, threshold=8)["verdict"] == "FAIL"
+    assert len(critique_model.prompts) == 1
+    assert "hreshold" not in critique_model.prompts[0]
+
+
+def test_equivalent_ideas_share_a_key(critique, critique_model):
+    _evaluate(critique)
+    _evaluate(critique, {"solution": "Live  queue positions\nover SMS", "title": " Queue Radar "})
+
+    assert len(critique_model.prompts) == 1
+    assert critique.get_cache_stats()["hits"] == 1
+
+
+def test_context_is_part_of_the_key(critique, critique_model):
+    _evaluate(critique)
+    _evaluate(critique, track="Education")
+
+    assert len(critique_model.prompts) == 2
+
+
+def test_concurrent_duplicates_share_one_call(critique, critique_model):
+    async def run():
+        return await asyncio.gather(*(
+            critique.evaluate_idea(IDEA, "Healthcare", "Clinic wait times", threshold)
+            for threshold in (6, 7, 8)
+        ))
+
+    verdicts = [evaluation["verdict"] for evaluation in asyncio.run(run())]
+
+    assert verdicts == ["PASS", "PASS", "FAIL"]
+    assert len(critique_model.prompts) == 1
+
+
+def test_unparseable_replies_are_not_cached(critique, critique_model):
+    # The reply and its repair both fail, so the first evaluation falls back
+    critique_model.replies = ["not json", "still not json", EVALUATION_REPLY]
+
+    assert _evaluate(critique)["overall_score"] == 0
+    assert _evaluate(critique)["overall_score"] == 7
+    assert len(critique_model.prompts) == 3
+
+
+def test_cache_stats_are_reported(client):
+    assert "critique_cache" in client.get("/api/status").json()
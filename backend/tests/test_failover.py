@@ -0,0 +1,126 @@
+"""Tests for model call deadlines, failover and hedged requests."""
+import asyncio
+
+import pytest
+
+import config
+from agents.routing import ModelRouter, ModelTimeoutError
+from mocks import LatencyProfile, MockModel
+
+
+def _models(*model_ids: str) -> list:
+    return [(MockModel(LatencyProfile(0), model_id=model_id), model_id) for model_id in model_ids]
+
+
+def _router(*model_ids: str, fallbacks=(), **kwargs) -> ModelRouter:
+    kwargs.setdefault("timeout", 1.0)
+    kwargs.setdefault("hedge_delay", 0)
+    return ModelRouter(_models(*model_ids), "Hackathon Researcher", "", fallbacks=fallbacks, explore_rate=0, **kwargs)
+
+
+def _run(router: ModelRouter, on_token=None):
+    return asyncio.run(router.run("Track/Domain: Healthcare", on_token=on_token))
+
+
+def test_a_stuck_call_times_out_and_fails_over(providers):
+    router = _router("stuck", "steady", timeout=0.05)
+    providers.scripts["stuck"] = [5]
+
+    assert _run(router).content == "steady"
+    assert (router.timeouts, router.failovers) == (1, 1)
+    assert providers.cancelled == ["stuck"]
+
+
+def test_the_last_error_is_raised_when_every_model_fails(providers):
+    router = _router("stuck", timeout=0.05)
+    providers.scripts["stuck"] = [5]
+
+    with pytest.raises(ModelTimeoutError, match="stuck did not answer within 0.05s"):
+        _run(router)
+    # Callers that catch asyncio timeouts still see one
+    assert issubclass(ModelTimeoutError, asyncio.TimeoutError)
+
+
+def test_fallback_models_are_tried_after_the_role_models(providers):
+    primary, backup = _models("first", "second")
+    fallback, = _models("fallback")
+    router = ModelRouter(
+        [primary, backup], "Hackathon Researcher", "", fallbacks=[fallback, primary], timeout=1.0, hedge_delay=0
+    )
+    providers.scripts["first"] = [RuntimeError("first down")]
+    providers.scripts["second"] = [RuntimeError("second down")]
+
+    assert _run(router).content == "fallback"
+    assert providers.started == ["first", "second", "fallback"]
+    # A fallback that is already one of the role's models is not tried twice
+    assert [route.model_id for route in router.fallbacks] == ["fallback"]
+
+
+def test_a_slow_call_is_hedged_and_the_first_answer_wins(providers):
+    router = _router("slow", "fast", hedge_delay=0.02)
+    router.routes[0].latency, router.routes[1].latency = 0.01, 0.02
+    providers.scripts["slow"] = [5]
+
+    assert _run(router).content == "fast"
+    assert (router.hedges, router.hedge_wins, router.failovers) == (1, 1, 0)
+    assert providers.cancelled == ["slow"]
+
+
+def test_a_prompt_answer_is_not_hedged(providers):
+    router = _router("quick", "other", hedge_delay=0.5)
+    router.routes[0].latency, router.routes[1].latency = 0.01, 0.02
+
+    assert _run(router).content == "quick"
+    assert router.hedges == 0
+    assert providers.started == ["quick"]
+
+
+def test_failover_after_streaming_does_not_repeat_tokens(providers):
+    router = _router("flaky", "steady")
+    providers.scripts["flaky"] = ["Que", "ue", RuntimeError("connection reset")]
+    providers.scripts["steady"] = ["Queue Radar"]
+    deltas = []
+
+    assert _run(router, deltas.append).content == "steady"
+    assert deltas == ["Que", "ue"]
+
+
+def test_failover_before_any_token_streams_the_next_answer(providers):
+    router = _router("down", "steady")
+    providers.scripts["down"] = [RuntimeError("connection refused")]
+    providers.scripts["steady"] = ["Queue", " Radar"]
+    deltas = []
+
+    _run(router, deltas.append)
+
+    assert deltas == ["Queue", " Radar"]
+
+
+def test_a_hedge_never_streams(providers):
+    router = _router("slow", "fast", hedge_delay=0.02)
+    router.routes[0].latency, router.routes[1].latency = 0.01, 0.02
+    providers.scripts["slow"] = ["Slow start", 5]
+    providers.scripts["fast"] = ["Fast answer"]
+    deltas = []
+
+    assert _run(router, deltas.append).content == "fast"
+    assert deltas == ["Slow start"]
+
+
+def test_both_hedged_calls_failing_fails_over(providers):
+    router = _router("a", "b", "c", hedge_delay=0.01)
+    for route, latency in zip(router.routes, (0.01, 0.02, 0.03)):
+        route.latency = latency
+    providers.scripts["a"] = [0.02, RuntimeError("a down")]
+    providers.scripts["b"] = [RuntimeError("b down")]
+
+    assert _run(router).content == "c"
+    assert router.failovers == 1
+
+
+def test_status_lists_the_fallback_models(monkeypatch):
+    monkeypatch.setenv("LLM_FALLBACK_MODEL", "openai:gpt-4o-mini")
+
+    assert config.get_role_model_names()["fallback"] == ["openai:gpt-4o-mini"]
+    assert [model_id for _, model_id in config.get_fallback_models()] == ["gpt-4o-mini"]
+    assert set(_router("only").stats()) >= {"calls", "hedges", "hedge_wins", "failovers", "timeouts", "models"}
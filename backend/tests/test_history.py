@@ -0,0 +1,83 @@
+"""Tests for the rolling history of rejected depth ideas."""
+import asyncio
+
+from agents.history import IdeaHistory, summarize
+from agents.researcher import SearchResults
+from tools.context import count_tokens
+
+
+def _idea(n: int) -> dict:
+    return {"title": f"Idea {n}", "solution": "long solution " * 20, "unique_angle": f"angle {n}"}
+
+
+def _evaluation(score: int = 5) -> dict:
+    return {"overall_score": score, "scores": {"feasibility": 7, "innovation": 3, "impact": 4, "notes": "n/a"}}
+
+
+def test_summary_is_one_line_with_the_weakest_dimensions():
+    line = summarize(_idea(1), _evaluation())
+
+    assert line == "- Idea 1 [5/10] weak: innovation 3, impact 4 - angle 1"
+
+
+def test_summary_clips_long_fields():
+    line = summarize({"title": "word " * 50, "solution": "gist " * 100}, {})
+
+    assert "\n" not in line
+    assert line.startswith("- word") and "[?/10]" in line
+    assert len(line) < 260
+
+
+def test_oldest_ideas_are_evicted_to_stay_within_budget():
+    history = IdeaHistory(budget=60)
+    for n in range(20):
+        history.add(_idea(n), _evaluation())
+
+    assert history.tokens <= 60
+    assert count_tokens(history.render()) <= 60
+    assert "Idea 19" in history.render()
+    assert "Idea 0 " not in history.render()
+    assert history.total_added == 20
+
+
+def test_a_single_idea_over_budget_is_still_kept():
+    history = IdeaHistory(budget=1)
+    history.add(_idea(1), _evaluation())
+
+    assert len(history) == 1
+
+
+def test_render_is_cached_until_an_idea_is_added():
+    history = IdeaHistory()
+    history.add(_idea(1), _evaluation())
+    first = history.render()
+
+    assert history.render() is first
+    history.add(_idea(2), _evaluation())
+    assert history.render() is not first
+
+
+def test_depth_prompts_carry_the_rejected_ideas(forge, fake_researcher):
+    async def run():
+        return [update async for update in forge.run_depth("Healthcare", "Clinic wait times", max_iterations=3)]
+
+    asyncio.run(run())
+
+    histories = [kwargs["history"] for _, kwargs in fake_researcher.calls]
+    assert not histories[0]
+    assert histories[1].startswith("- Idea 0 [5/10]")
+    assert "Idea 0" in histories[2] and "Idea 1" in histories[2]
+
+
+def test_generation_prompt_includes_history_and_feedback(researcher, researcher_model):
+    asyncio.run(researcher.generate_idea_depth(
+        "Healthcare",
+        "Clinic wait times",
+        history="- Queue Board [4/10] weak: innovation 3",
+        feedback="Be bolder",
+        search=SearchResults(results={}),
+    ))
+
+    prompt = researcher_model.prompts[0]
+    assert "- Queue Board [4/10] weak: innovation 3" in prompt
+    assert "Critique feedback: Be bolder" in prompt
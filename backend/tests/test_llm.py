@@ -0,0 +1,109 @@
+"""Tests for running agent calls without blocking the event loop."""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import agents.llm as llm
+from agents.llm import run_agent
+
+
+class SyncOnlyModel:
+    """A provider model whose async path is unimplemented."""
+    id = "sync-only"
+
+
+class FakeAgent:
+    """An agno-style agent whose ``run`` blocks for ``delay`` seconds."""
+
+    def __init__(self, model, delay: float = 0.0, native: bool = True):
+        self.name = "Hackathon Researcher"
+        self.instructions = ""
+        self.model = model
+        self.delay = delay
+        self.native = native
+        self.threads = []
+
+    def run(self, prompt: str):
+        self.threads.append(threading.current_thread().name)
+        time.sleep(self.delay)
+        return SimpleNamespace(content=f"sync: {prompt}", metrics=None)
+
+    async def arun(self, prompt: str):
+        if not self.native:
+            raise NotImplementedError
+        self.threads.append(threading.current_thread().name)
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(content=f"async: {prompt}", metrics=None)
+
+
+@pytest.fixture(autouse=True)
+def llm_state(monkeypatch):
+    """Start each test with no models marked sync-only and a fresh executor."""
+    monkeypatch.setattr(llm, "_sync_only_models", set())
+    yield
+    llm.shutdown_llm_executor()
+
+
+def _ticks_during(call) -> tuple:
+    """Run ``call`` alongside a ticker; returns its response and how often the loop ticked."""
+    async def run():
+        ticks = 0
+        task = asyncio.create_task(call())
+        while not task.done():
+            ticks += 1
+            await asyncio.sleep(0.005)
+        return task.result(), ticks
+
+    return asyncio.run(run())
+
+
+def test_native_async_calls_run_on_the_event_loop():
+    agent = FakeAgent(SimpleNamespace(id="native"), delay=0.05)
+
+    response, ticks = _ticks_during(lambda: run_agent(agent, "idea"))
+
+    assert response.content == "async: idea"
+    assert agent.threads == ["MainThread"]
+    assert ticks > 3
+
+
+def test_sync_only_providers_fall_back_to_the_executor():
+    agent = FakeAgent(SyncOnlyModel(), delay=0.05, native=False)
+
+    response, ticks = _ticks_during(lambda: run_agent(agent, "idea"))
+
+    assert response.content == "sync: idea"
+    assert agent.threads[0].startswith("llm")
+    assert ticks > 3
+    assert SyncOnlyModel in llm._sync_only_models
+
+
+def test_known_sync_only_models_skip_the_async_attempt():
+    agent = FakeAgent(SyncOnlyModel(), native=False)
+    llm._sync_only_models.add(SyncOnlyModel)
+    agent.arun = None
+
+    assert asyncio.run(run_agent(agent, "idea")).content == "sync: idea"
+
+
+def test_executor_mode_always_uses_the_thread_pool(monkeypatch):
+    monkeypatch.setattr(llm, "LLM_ASYNC_MODE", "executor")
+    agent = FakeAgent(SimpleNamespace(id="native"))
+
+    assert asyncio.run(run_agent(agent, "idea")).content == "sync: idea"
+    assert agent.threads[0].startswith("llm")
+
+
+def test_concurrent_sync_calls_overlap():
+    agents = [FakeAgent(SyncOnlyModel(), delay=0.1, native=False) for _ in range(4)]
+
+    async def run():
+        return await asyncio.gather(*(run_agent(agent, "idea") for agent in agents))
+
+    start = time.perf_counter()
+    asyncio.run(run())
+
+    assert time.perf_counter() - start < 0.3
@@ -0,0 +1,135 @@
+"""Tests for timing spans, per-update timings and the metrics endpoint."""
+import asyncio
+
+import pytest
+
+import metrics
+from metrics import MetricsRegistry, RunTimings, bind_run, count, span, unbind_run
+
+
+@pytest.fixture
+def metrics_registry(monkeypatch) -> MetricsRegistry:
+    """A fresh metrics registry in place of the process-wide one."""
+    fresh = MetricsRegistry(buckets=(0.1, 1.0))
+    monkeypatch.setattr(metrics, "registry", fresh)
+    return fresh
+
+
+def test_spans_feed_the_histogram_and_the_bound_run(metrics_registry):
+    timings = RunTimings()
+    token = bind_run(timings)
+    try:
+        with span("search"):
+            pass
+        with span("model", "critique"):
+            pass
+    finally:
+        unbind_run(token)
+    with span("search"):
+        pass
+
+    rendered = metrics_registry.render()
+    assert 'ideaforge_span_duration_seconds_count{span="search"} 2' in rendered
+    assert 'ideaforge_span_duration_seconds_bucket{span="model",label="critique",le="+Inf"} 1' in rendered
+    assert set(timings.totals) == {"search", "model.critique"}
+
+
+def test_errors_are_counted_but_cancellation_is_not(metrics_registry):
+    with pytest.raises(RuntimeError):
+        with span("search"):
+            raise RuntimeError("search down")
+    with pytest.raises(asyncio.CancelledError):
+        with span("search"):
+            raise asyncio.CancelledError()
+
+    assert 'ideaforge_span_errors_total{span="search"} 1' in metrics_registry.render()
+
+
+def test_spans_in_child_tasks_belong_to_the_run(metrics_registry):
+    timings = RunTimings()
+
+    async def child():
+        with span("search"):
+            await asyncio.sleep(0)
+
+    async def run():
+        token = bind_run(timings)
+        try:
+            await asyncio.gather(asyncio.create_task(child()), asyncio.create_task(child()))
+        finally:
+            unbind_run(token)
+
+    asyncio.run(run())
+
+    assert timings.drain().keys() == {"search", "elapsed"}
+
+
+def test_drain_returns_only_what_was_spent_since_the_last_drain():
+    timings = RunTimings()
+    timings.add("search", timings._started, 0.25)
+
+    first = timings.drain()
+    second = timings.drain()
+
+    assert first["search"] == 250.0 and first["elapsed"] >= 0
+    assert set(second) == {"elapsed"}
+    assert timings.summary() == {"totals_ms": {"search": 250.0}}
+
+
+def test_full_mode_keeps_the_span_log():
+    timings = RunTimings(keep_spans=True)
+    timings.add("model.researcher", timings._started + 0.5, 1.25)
+
+    assert timings.summary()["spans"] == [{"span": "model.researcher", "start_ms": 500.0, "duration_ms": 1250.0}]
+
+
+def test_render_is_prometheus_text(metrics_registry):
+    metrics_registry.observe("span_duration_seconds", (("span", "parse"),), 0.05)
+    metrics_registry.observe("span_duration_seconds", (("span", "parse"),), 0.5)
+    metrics_registry.inc("updates_total", (("stage", 'say "hi"\n'),), 2)
+
+    lines = metrics_registry.render({"active_runs": 3}).splitlines()
+
+    assert lines[:7] == [
+        "# HELP ideaforge_span_duration_seconds span duration seconds",
+        "# TYPE ideaforge_span_duration_seconds histogram",
+        'ideaforge_span_duration_seconds_bucket{span="parse",le="0.1"} 1',
+        'ideaforge_span_duration_seconds_bucket{span="parse",le="1.0"} 2',
+        'ideaforge_span_duration_seconds_bucket{span="parse",le="+Inf"} 2',
+        'ideaforge_span_duration_seconds_sum{span="parse"} 0.550000',
+        'ideaforge_span_duration_seconds_count{span="parse"} 2',
+    ]
+    assert 'ideaforge_updates_total{stage="say \\"hi\\"\\n"} 2' in lines
+    assert lines[-2:] == ["# TYPE ideaforge_active_runs gauge", "ideaforge_active_runs 3"]
+
+
+def test_off_mode_records_nothing(metrics_registry, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_MODE", "off")
+
+    with span("search"):
+        pass
+    count("updates_total", stage="complete")
+
+    assert metrics_registry.render() == "\n"
+
+
+def test_status_updates_carry_their_timings(forge):
+    async def run():
+        return [update async for update in forge.run_depth("Healthcare", "Clinic wait times", max_iterations=2)]
+
+    updates = asyncio.run(run())
+
+    assert all("elapsed" in update.timings for update in updates)
+    assert forge.get_status()["timings"] == {"totals_ms": {}}
+
+
+def test_metrics_endpoint(client):
+    with span("search"):
+        pass
+
+    response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'ideaforge_span_duration_seconds_count{span="search"}' in response.text
+    assert "ideaforge_active_runs 0" in response.text
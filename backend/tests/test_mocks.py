@@ -0,0 +1,145 @@
+"""Tests for the offline provider and Serper mocks."""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import mocks.fixtures as fixtures_module
+import mocks.provider as provider_module
+import mocks.serper_stub as serper_stub_module
+import tools.serper as serper
+from agents.llm import build_agent, run_agent
+from mocks import LatencyProfile, MockAgent, MockModel, MockProviderError, record_llm, start_stub_server
+from mocks.fixtures import FixtureFile, search_key
+from mocks.serper_stub import synthetic_search
+
+PROMPT = "Track/Domain: Healthcare\nGenerate one idea."
+
+
+@pytest.fixture
+def fixtures_dir(tmp_path, monkeypatch):
+    """Point recording and replay at a throwaway fixtures directory."""
+    def fixture_file(name: str) -> FixtureFile:
+        return FixtureFile(tmp_path / name)
+
+    for module in (fixtures_module, provider_module, serper_stub_module):
+        monkeypatch.setattr(module, "fixture_file", fixture_file)
+    return tmp_path
+
+
+def _agent(name: str = "Hackathon Researcher", **profile) -> MockAgent:
+    return MockAgent(name=name, model=MockModel(LatencyProfile(profile.pop("latency_ms", 0), **profile)))
+
+
+def test_fixed_latency_is_exact_and_failure_rate_one_always_fails():
+    profile = LatencyProfile(250, failure_rate=1, distribution="fixed")
+
+    assert [profile.draw() for _ in range(3)] == [(0.25, True)] * 3
+
+
+def test_seeded_profiles_draw_the_same_sequence():
+    first = LatencyProfile(100, failure_rate=0.5, distribution="lognormal", seed="s")
+    second = LatencyProfile(100, failure_rate=0.5, distribution="lognormal", seed="s")
+
+    assert [first.draw() for _ in range(20)] == [second.draw() for _ in range(20)]
+
+
+def test_lognormal_latency_keeps_the_configured_mean():
+    profile = LatencyProfile(100, distribution="lognormal", spread=0.5, seed="mean")
+
+    delays = [profile.draw()[0] for _ in range(5000)]
+
+    assert sum(delays) / len(delays) == pytest.approx(0.1, rel=0.05)
+
+
+def test_unknown_distribution_is_rejected():
+    with pytest.raises(ValueError):
+        LatencyProfile(100, distribution="pareto")
+
+
+def test_synthetic_replies_are_deterministic_and_complete(fixtures_dir):
+    idea = json.loads(_agent().reply(PROMPT))
+
+    assert json.loads(_agent().reply(PROMPT)) == idea
+    assert "Healthcare" in idea["title"]
+    assert {"problem", "solution", "tech_stack", "unique_angle", "feasibility_score"} <= idea.keys()
+
+
+def test_critique_replies_score_every_batch_id(fixtures_dir):
+    critic = _agent("Hackathon Critique")
+
+    single = json.loads(critic.reply("Idea: Queue Radar"))
+    batch = json.loads(critic.reply("Idea id 1: A\nIdea id 2: B"))
+
+    assert single["verdict"] == ("PASS" if single["overall_score"] >= 7 else "FAIL")
+    assert [e["id"] for e in batch["evaluations"]] == [1, 2]
+
+
+def test_recorded_exchanges_are_replayed(fixtures_dir, monkeypatch):
+    monkeypatch.setattr(fixtures_module, "RECORD_FIXTURES", True)
+
+    record_llm("Hackathon Researcher", PROMPT, '{"title": "Recorded"}')
+
+    assert _agent().reply(PROMPT) == '{"title": "Recorded"}'
+    assert _agent().reply(PROMPT + " again") != '{"title": "Recorded"}'
+
+
+def test_mock_agent_streams_through_run_agent(fixtures_dir):
+    agent = build_agent(MockModel(LatencyProfile(0)), "Hackathon Researcher", "")
+    chunks = []
+
+    response = asyncio.run(run_agent(agent, PROMPT, on_token=chunks.append))
+
+    assert isinstance(agent, MockAgent)
+    assert len(chunks) > 1
+    assert "".join(chunks) == response.content == agent.reply(PROMPT)
+
+
+def test_injected_failures_raise(fixtures_dir):
+    agent = _agent(failure_rate=1)
+
+    with pytest.raises(MockProviderError):
+        asyncio.run(run_agent(agent, PROMPT))
+    with pytest.raises(MockProviderError):
+        agent.run(PROMPT)
+
+
+def test_in_process_search_replaces_serper(fixtures_dir, monkeypatch):
+    monkeypatch.setattr(serper, "SERPER_MOCK", True)
+    monkeypatch.setattr(serper_stub_module, "_profile", LatencyProfile(0))
+
+    response = asyncio.run(serper.search_web("clinic wait times mock", num_results=5))
+
+    assert response == synthetic_search("clinic wait times mock", 5)
+    assert len(response["organic"]) == 5
+
+
+def test_stub_server_answers_like_serper(fixtures_dir):
+    FixtureFile(fixtures_dir / "search.jsonl").record(
+        search_key("Recorded  Query", "news", 3), response={"organic": [{"title": "Recorded"}]}
+    )
+    server = start_stub_server(latency_ms=0)
+    host, port = server.server_address
+    try:
+        with httpx.Client(base_url=f"http://{host}:{port}") as client:
+            synthetic = client.post("/search", json={"q": "clinic wait", "num": 4})
+            recorded = client.post("/news", json={"q": "recorded query", "num": 3})
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert synthetic.json() == synthetic_search("clinic wait", 4)
+    assert recorded.json() == {"organic": [{"title": "Recorded"}]}
+
+
+def test_stub_server_injects_failures(fixtures_dir):
+    server = start_stub_server(latency_ms=0, failure_rate=1)
+    host, port = server.server_address
+    try:
+        response = httpx.post(f"http://{host}:{port}/search", json={"q": "clinic wait"})
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response.status_code == 503
@@ -0,0 +1,90 @@
+"""Tests for JSON extraction, repair and JSON mode."""
+import asyncio
+import json
+
+import config
+from agents.parsing import extract_json, parse_or_repair, repair_json
+from agents.researcher import SearchResults
+from conftest import IDEA_REPLY, ScriptedModel
+
+
+def test_extract_ignores_braces_in_prose_and_strings():
+    text = 'Sure! {not json} Here it is: {"title": "Use {braces}", "tags": ["a"]} Hope that helps {:)}'
+
+    assert extract_json(text) == {"title": "Use {braces}", "tags": ["a"]}
+
+
+def test_extract_takes_the_first_object_with_the_required_keys():
+    text = '{"scores": {"innovation": 5}} then {"overall_score": 6, "scores": {}}'
+
+    assert extract_json(text, required=("overall_score",)) == {"overall_score": 6, "scores": {}}
+    assert extract_json("no json here") is None
+
+
+def test_extract_repairs_common_mistakes():
+    text = """```json
+{
+  'title': 'Queue Radar',  // working name
+  ready: True,
+  "notes": "line one
+line two",
+  "stack": ["FastAPI", "Twilio",],
+  "risk": None,
+"""
+
+    assert extract_json(text) == {
+        "title": "Queue Radar",
+        "ready": True,
+        "notes": "line one\nline two",
+        "stack": ["FastAPI", "Twilio"],
+        "risk": None,
+    }
+
+
+def test_repair_handles_typographic_quotes_and_escaped_apostrophes():
+    assert json.loads(repair_json("{“title”: ‘It\\'s fine’}")) == {"title": "It's fine"}
+
+
+def test_unparseable_reply_gets_one_repair_request():
+    model = ScriptedModel(IDEA_REPLY)
+
+    idea = asyncio.run(parse_or_repair("I could not produce JSON", model))
+
+    assert idea["title"] == "Queue Radar"
+    assert len(model.prompts) == 1
+    assert "I could not produce JSON" in model.prompts[0]
+
+
+def test_failed_repair_request_falls_back_instead_of_raising():
+    model = ScriptedModel(RuntimeError("provider down"))
+
+    assert asyncio.run(parse_or_repair("not json", model)) is None
+
+
+def test_researcher_falls_back_when_the_repair_fails(researcher, researcher_model):
+    researcher_model.replies = ["not json", RuntimeError("provider down")]
+
+    idea = asyncio.run(researcher.generate_idea_independent("Healthcare", search=SearchResults(results={})))
+
+    assert idea["name"] == "parsing_error"
+    assert len(researcher_model.prompts) == 2
+
+
+def test_json_mode_is_set_on_the_provider_model(monkeypatch):
+    from agno.models.openai import OpenAIChat
+
+    model = OpenAIChat(id="gpt-4o", api_key="test-key")
+    assert config.enable_json_mode(model)
+    assert model.request_params["response_format"] == {"type": "json_object"}
+
+    monkeypatch.setattr(config, "LLM_JSON_MODE", False)
+    assert not config.enable_json_mode(OpenAIChat(id="gpt-4o", api_key="test-key"))
+
+
+def test_json_mode_leaves_other_providers_alone():
+    class Groq:
+        request_params = None
+
+    model = Groq()
+    assert not config.enable_json_mode(model)
+    assert model.request_params is None
@@ -0,0 +1,74 @@
+"""Tests for the depth-mode search prefetch."""
+import asyncio
+
+import pytest
+
+import cli
+
+
+def _pending_tasks() -> list:
+    return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+
+def test_search_is_fetched_once_per_run(forge, fake_researcher):
+    async def run():
+        return [update async for update in forge.run_depth("Healthcare", "Clinic wait times", max_iterations=4)]
+
+    updates = asyncio.run(run())
+
+    assert updates[-1].stage == "max_iterations"
+    assert fake_researcher.searches == 1
+
+
+def test_search_failure_ends_the_run(forge, fake_researcher):
+    async def broken_search(*args, **kwargs):
+        raise ConnectionError("search backend unreachable")
+
+    fake_researcher.search_for_winners = broken_search
+
+    async def run():
+        async for _ in forge.run_depth("Healthcare", "Clinic wait times", max_iterations=2):
+            pass
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+
+def test_closing_a_run_early_cancels_the_prefetch(forge, fake_researcher):
+    fake_researcher.delay = 10
+
+    async def run():
+        updates = forge.run_depth("Healthcare", "Clinic wait times", max_iterations=3)
+        first = await updates.__anext__()
+        await updates.aclose()
+        return first, _pending_tasks()
+
+    first, pending = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert first.stage == "researching"
+    assert len(pending) == 1  # just the wait_for wrapper's inner task
+
+
+def test_cli_closes_the_run_when_it_stops_reading(forge, fake_critique, monkeypatch, capsys):
+    fake_critique.scores = [9]
+    monkeypatch.setattr(cli, "IdeaForge", lambda **kwargs: forge)
+
+    async def run():
+        await cli.run_depth("Healthcare", "Clinic wait times", max_iterations=3)
+        return _pending_tasks()
+
+    assert asyncio.run(run()) == []
+    assert "FINAL RESULT" in capsys.readouterr().out
+
+
+def test_closing_a_session_stream_cancels_the_prefetch(registry, fake_researcher):
+    fake_researcher.delay = 10
+    forge = registry.create()
+
+    async def run():
+        updates = registry.run_depth(forge, track="Healthcare", problem_statement="Clinic wait times")
+        await updates.__anext__()
+        await updates.aclose()
+        return _pending_tasks()
+
+    assert len(asyncio.run(asyncio.wait_for(run(), timeout=5))) == 1
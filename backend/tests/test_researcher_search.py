@@ -0,0 +1,54 @@
+"""Tests for the researcher's concurrent search fan-out."""
+import asyncio
+import time
+
+
+async def _answer(value: dict, delay: float = 0) -> dict:
+    await asyncio.sleep(delay)
+    return value
+
+
+async def _fail() -> dict:
+    raise ConnectionError("search backend unreachable")
+
+
+def test_slow_and_failing_sources_are_reported_missing(researcher):
+    outcome = asyncio.run(researcher.run_searches(
+        {"fast": _answer({"organic": []}), "slow": _answer({}, delay=1), "broken": _fail()},
+        query_timeout=0.05
+    ))
+
+    assert outcome.results == {"fast": {"organic": []}}
+    assert sorted(outcome.missing) == ["broken", "slow"]
+
+
+def test_budget_bounds_the_whole_fan_out(researcher):
+    started = time.monotonic()
+    outcome = asyncio.run(researcher.run_searches(
+        {"fast": _answer({"organic": []}), "slow": _answer({}, delay=1)},
+        query_timeout=5,
+        budget=0.05
+    ))
+
+    assert time.monotonic() - started < 0.5
+    assert outcome.missing == ["slow"]
+
+
+def test_sources_run_concurrently(researcher):
+    started = time.monotonic()
+    outcome = asyncio.run(researcher.run_searches(
+        {f"source{i}": _answer({"i": i}, delay=0.1) for i in range(5)}
+    ))
+
+    assert time.monotonic() - started < 0.3
+    assert len(outcome.results) == 5
+
+
+def test_problem_search_keeps_the_sources_that_answered(researcher, search_stub):
+    search_stub.failing.add("site:reddit.com")
+
+    outcome = asyncio.run(researcher.search_for_problems("Partial Results Track"))
+
+    assert outcome.missing == ["reddit"]
+    assert "Partial Results Track" in outcome.results["blogs"]["organic"][0]["snippet"]
+    assert len(search_stub.requests) == 2
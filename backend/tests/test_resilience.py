@@ -0,0 +1,199 @@
+"""Tests for rate limits, jittered retries, circuit breakers and stale search results."""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import tools.serper as serper
+from agents.routing import ModelRouter
+from mocks import LatencyProfile, MockModel, MockProviderError
+from tools.cache import TTLCache
+from tools.resilience import CircuitBreaker, CircuitOpenError, TokenBucket, Upstream, classify, retry_after
+
+
+class StatusError(Exception):
+    """An SDK-style error carrying an HTTP status."""
+
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+class RateLimitError(Exception):
+    pass
+
+
+def _call(upstream: Upstream, outcomes: list):
+    """Call through ``upstream``; each attempt takes the next outcome (an exception is raised)."""
+    attempts = []
+
+    async def attempt():
+        attempts.append(len(attempts))
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def run():
+        try:
+            return await upstream.call(attempt)
+        finally:
+            run.attempts = len(attempts)
+
+    return run
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=50, burst=2)
+
+    async def run():
+        return [await bucket.acquire() for _ in range(3)]
+
+    start = time.perf_counter()
+    waits = asyncio.run(run())
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.02, abs=0.005)
+    assert time.perf_counter() - start >= 0.015
+    assert asyncio.run(TokenBucket(rate=0).acquire()) == 0.0
+
+
+def test_errors_are_classified_by_status_and_type():
+    assert classify(StatusError(429)) == "retry"
+    assert classify(StatusError(503)) == "retry"
+    assert classify(StatusError(400)) == "ignore"
+    assert classify(RateLimitError()) == "retry"
+    assert classify(httpx.ConnectError("refused")) == "retry"
+    assert classify(asyncio.TimeoutError()) == "fail"
+    assert classify(ValueError("bad json")) == "ignore"
+    assert classify(MockProviderError("injected")) == "retry"
+
+
+def test_retry_after_reads_the_response_header():
+    assert retry_after(StatusError(429, {"retry-after": "2"})) == 2.0
+    assert retry_after(StatusError(429, {"retry-after": "soon"})) is None
+    assert retry_after(ValueError()) is None
+
+
+def test_transient_errors_are_retried():
+    upstream = Upstream("test", attempts=3, rate=0)
+    run = _call(upstream, [StatusError(503), StatusError(429), "ok"])
+
+    assert asyncio.run(run()) == "ok"
+    assert run.attempts == 3
+    assert (upstream.retries, upstream.breaker.state) == (2, "closed")
+
+
+def test_client_errors_are_not_retried_or_counted():
+    upstream = Upstream("test", attempts=3, rate=0)
+    run = _call(upstream, [StatusError(400), "ok"])
+
+    with pytest.raises(StatusError):
+        asyncio.run(run())
+    assert run.attempts == 1
+    assert upstream.breaker.failures == 0
+
+
+def test_backoff_honours_retry_after(monkeypatch):
+    upstream = Upstream("test", attempts=2, rate=0)
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr("tools.resilience.asyncio.sleep", sleep)
+    asyncio.run(_call(upstream, [StatusError(429, {"retry-after": "1.5"}), "ok"])())
+
+    assert sleeps == [1.5]
+
+
+def test_the_circuit_opens_then_probes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    upstream = Upstream("test", attempts=1, rate=0, breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(StatusError):
+            asyncio.run(_call(upstream, [StatusError(503)])())
+    assert breaker.state == "open"
+
+    rejected = _call(upstream, ["ok"])
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(rejected())
+    assert rejected.attempts == 0 and upstream.rejected == 1
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow() and not breaker.allow()
+    breaker.release()
+    assert asyncio.run(_call(upstream, ["ok"])()) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_a_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow()
+    assert breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_model_retries_stream_each_delta_once(providers):
+    router = ModelRouter(
+        [(MockModel(LatencyProfile(0), model_id="flaky"), "flaky")], "Hackathon Researcher", "", hedge_delay=0
+    )
+    providers.scripts["flaky"] = [["Que", "ue", StatusError(503)], ["Queue Radar"]]
+    deltas = []
+
+    response = asyncio.run(router.run("Track/Domain: Healthcare", on_token=deltas.append))
+
+    assert response.content == "flaky"
+    assert providers.started == ["flaky", "flaky"]
+    assert deltas == ["Que", "ue"]
+    assert router.failovers == 0
+
+
+def test_an_open_circuit_fails_over_to_the_next_provider(providers):
+    flaky, steady = MockModel(LatencyProfile(0), model_id="flaky"), MockModel(LatencyProfile(0), model_id="steady")
+    router = ModelRouter([(flaky, "flaky"), (steady, "steady")], "Hackathon Researcher", "", hedge_delay=0)
+    flaky_route, steady_route = router.routes
+    flaky_route.upstream = Upstream("flaky", rate=0, breaker=CircuitBreaker(failure_threshold=1))
+    steady_route.upstream = Upstream("steady", rate=0)
+    flaky_route.latency, steady_route.latency = 0.01, 0.02
+    flaky_route.upstream.breaker.record_failure()
+
+    assert asyncio.run(router.run("Track/Domain: Healthcare")).content == "steady"
+    assert providers.started == ["steady"]
+    assert flaky_route.upstream.rejected == 1
+
+
+def test_searches_retry_through_an_outage(search_stub):
+    search_stub.outages = 2
+
+    response = asyncio.run(serper.search_web("clinic wait times outage"))
+
+    assert response["organic"][0]["title"] == "Result for clinic wait times outage"
+    assert len(search_stub.requests) == 3
+
+
+def test_bad_search_requests_fail_without_retrying(search_stub):
+    search_stub.failing.add("broken query")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(serper.search_web("broken query"))
+    assert len(search_stub.requests) == 1
+
+
+def test_expired_results_answer_while_serper_is_down(search_stub, monkeypatch):
+    monkeypatch.setattr(serper, "search_cache", TTLCache(ttl=0.01, stale_ttl=60, namespace="serper"))
+    query = "clinic wait times stale"
+    fresh = asyncio.run(serper.search_web(query))
+    time.sleep(0.02)
+    search_stub.outages = 10
+
+    assert asyncio.run(serper.search_web(query)) == fresh
+    assert len(search_stub.requests) == 4
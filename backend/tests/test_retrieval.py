@@ -0,0 +1,104 @@
+"""Tests for the local retrieval index and its use as a search source."""
+import asyncio
+
+import pytest
+
+import agents.retrieval as retrieval_module
+from agents.researcher import ResearcherAgent
+from agents.retrieval import RetrievalIndex
+
+SEEDS = 3
+QUEUE_IDEA = {
+    "title": "Queue Radar",
+    "problem": "Patients wait hours in clinics without knowing their place in line",
+    "solution": "Live queue positions and SMS alerts",
+}
+
+
+@pytest.fixture
+def index(tmp_path, store, monkeypatch) -> RetrievalIndex:
+    """An index over the seeds and ``store``, which picks up ideas as soon as they are written."""
+    monkeypatch.setattr(retrieval_module, "STORE_SETTLE_SECONDS", 0)
+    return RetrievalIndex(store, directory=str(tmp_path / "retrieval"))
+
+
+def _store_ideas(store, *ideas, track: str = "Healthcare") -> None:
+    for idea in ideas:
+        store.add_idea("run-r", 1, track, idea)
+    store.flush()
+
+
+def test_a_new_index_holds_the_seed_ideas(index):
+    assert len(index) == SEEDS
+    assert index.query("carbon footprint analyzer", k=1)[0]["title"].startswith("CarbonLens")
+
+
+def test_refresh_appends_stored_ideas_once(index, store):
+    _store_ideas(store, QUEUE_IDEA)
+
+    assert index.refresh() == 1
+    assert index.refresh() == 0
+    assert index.query("clinic queue wait", k=1)[0]["title"] == "Queue Radar"
+
+
+def test_the_index_reopens_from_disk(index, store, tmp_path):
+    _store_ideas(store, QUEUE_IDEA)
+    index.refresh()
+
+    reopened = RetrievalIndex(store, directory=str(tmp_path / "retrieval"))
+
+    assert len(reopened) == SEEDS + 1
+    assert reopened.refresh() == 0
+
+
+def test_an_inconsistent_index_is_rebuilt(index, store, tmp_path):
+    _store_ideas(store, QUEUE_IDEA)
+    index.refresh()
+    vectors = tmp_path / "retrieval" / "vectors.f32"
+    vectors.write_bytes(vectors.read_bytes()[:-4])
+
+    assert len(RetrievalIndex(store, directory=str(tmp_path / "retrieval"))) == SEEDS + 1
+
+
+def test_same_track_ideas_get_a_boost(index, store):
+    idea = {"title": "Clinic Queue", "solution": "clinic queue alerts"}
+    _store_ideas(store, {**idea, "title": "Education Queue"}, track="Education")
+    _store_ideas(store, {**idea, "title": "Healthcare Queue"}, track="Healthcare")
+    index.refresh()
+
+    assert index.query("clinic queue alerts", track="Education", k=1)[0]["title"] == "Education Queue"
+    assert index.query("clinic queue alerts", track="Healthcare", k=1)[0]["title"] == "Healthcare Queue"
+
+
+def test_search_is_shaped_like_a_serper_response(index):
+    response = asyncio.run(index.search("carbon footprint", k=2))
+
+    assert [hit["position"] for hit in response["organic"]] == [1, 2]
+    assert {"title", "snippet", "link"} <= set(response["organic"][0])
+
+
+def test_local_mode_skips_live_search(index, search_stub):
+    researcher = ResearcherAgent(retrieval=index, retrieval_mode="local")
+
+    outcome = asyncio.run(researcher.search_for_winners("Local Mode Track"))
+
+    assert list(outcome.results) == ["local"]
+    assert search_stub.requests == []
+
+
+def test_fallback_mode_fills_in_for_a_failed_source(index, search_stub):
+    researcher = ResearcherAgent(retrieval=index, retrieval_mode="fallback")
+    search_stub.failing.add("winner project devpost")
+
+    outcome = asyncio.run(researcher.search_for_winners("Fallback Mode Track"))
+
+    assert outcome.missing == ["winners"]
+    assert set(outcome.results) == {"blogs", "local"}
+
+
+def test_fallback_mode_stays_out_of_the_way_when_search_succeeds(index, search_stub):
+    researcher = ResearcherAgent(retrieval=index, retrieval_mode="fallback")
+
+    outcome = asyncio.run(researcher.search_for_winners("Healthy Search Track"))
+
+    assert set(outcome.results) == {"winners", "blogs"}
@@ -0,0 +1,181 @@
+"""Tests for per-role model configuration and latency-aware routing."""
+import asyncio
+import random
+
+import pytest
+
+import config
+from agents.critique import CritiqueAgent
+from agents.routing import ModelRouter
+from conftest import EVALUATION_REPLY, ScriptedModel
+from mocks import LatencyProfile, MockModel, MockProviderError
+
+ROLE_VARS = ("RESEARCHER_MODEL", "CRITIQUE_MODEL", "CRITIQUE_DRAFT_MODEL", "CRITIQUE_FINAL_MODEL")
+
+
+@pytest.fixture
+def role_env(monkeypatch):
+    """Clear the per-role model variables; returns a setter for them."""
+    for var in ROLE_VARS:
+        monkeypatch.delenv(var, raising=False)
+    return monkeypatch.setenv
+
+
+def _model(model_id: str, latency_ms: float = 0, failure_rate: float = 0) -> tuple:
+    return MockModel(LatencyProfile(latency_ms, failure_rate, distribution="fixed"), model_id=model_id), model_id
+
+
+def _router(*models, explore_rate: float = 0.0, seed: int = 0) -> ModelRouter:
+    return ModelRouter(list(models), "Hackathon Researcher", "", explore_rate=explore_rate, rng=random.Random(seed))
+
+
+def _served_by(router: ModelRouter, calls: int) -> list:
+    async def run():
+        served = []
+        for _ in range(calls):
+            served.append(router.pick().model_id)
+            await router.run("Track/Domain: Healthcare")
+        return served
+
+    return asyncio.run(run())
+
+
+def test_model_specs_name_a_provider_or_use_the_default():
+    assert config.parse_model_spec(" groq : llama-3.1-8b-instant ") == ("groq", "llama-3.1-8b-instant")
+    assert config.parse_model_spec("gpt-4o-mini") == ("openai", "gpt-4o-mini")
+    with pytest.raises(ValueError):
+        config.parse_model_spec("acme:model-1")
+
+
+def test_roles_fall_back_through_their_variables(role_env):
+    role_env("CRITIQUE_MODEL", "openai:gpt-4o-mini")
+    role_env("CRITIQUE_FINAL_MODEL", "openai:gpt-4o, gpt-4-turbo")
+
+    assert [model_id for _, model_id in config.get_role_models("researcher")] == ["gpt-4o"]
+    assert [model_id for _, model_id in config.get_role_models("critique_draft")] == ["gpt-4o-mini"]
+    assert [model_id for _, model_id in config.get_role_models("critique_final")] == ["gpt-4o", "gpt-4-turbo"]
+    names = config.get_role_model_names()
+    assert names["researcher"] == ["gpt-4o"]
+    assert names["critique_draft"] == ["openai:gpt-4o-mini"]
+    assert names["critique_final"] == ["openai:gpt-4o", "gpt-4-turbo"]
+
+
+def test_roles_share_models_and_provider_clients(role_env):
+    role_env("RESEARCHER_MODEL", "openai:gpt-4o")
+    role_env("CRITIQUE_MODEL", "openai:gpt-4o,openai:gpt-4o-mini")
+
+    (researcher_model, _), = config.get_role_models("researcher")
+    (critique_model, _), (mini_model, _) = config.get_role_models("critique_draft")
+
+    assert researcher_model is critique_model
+    assert mini_model.client is researcher_model.client
+    assert mini_model.async_client is researcher_model.async_client
+
+
+def test_mock_mode_keeps_the_configured_names(role_env, monkeypatch):
+    monkeypatch.setenv("USE_MOCK", "true")
+    role_env("RESEARCHER_MODEL", "openai:gpt-4o,groq:llama-3.1-8b-instant")
+
+    models = config.get_role_models("researcher")
+
+    assert all(isinstance(model, MockModel) for model, _ in models)
+    assert [model.id for model, _ in models] == ["gpt-4o", "llama-3.1-8b-instant"]
+
+
+def test_untried_models_go_first_then_the_fastest_wins():
+    router = _router(_model("slow", 20), _model("fast", 1))
+
+    served = _served_by(router, 5)
+
+    assert sorted(served[:2]) == ["fast", "slow"]
+    assert served[2:] == ["fast"] * 3
+    assert [(route.model_id, route.calls) for route in router.routes] == [("slow", 1), ("fast", 4)]
+
+
+def test_busy_models_look_slower():
+    router = _router(_model("a"), _model("b"))
+    first, second = router.routes
+    first.latency, second.latency = 0.010, 0.015
+
+    assert router.pick() is first
+    first.inflight = first.pool.size
+    assert router.pick() is second
+
+
+def test_exploration_spreads_calls():
+    router = _router(_model("slow", 5), _model("fast", 0), explore_rate=1.0, seed=3)
+
+    served = _served_by(router, 12)
+
+    assert served.count("slow") > 1
+
+
+def test_failed_calls_are_penalized():
+    router = _router(_model("flaky", 0, failure_rate=1))
+    flaky, = router.routes
+    flaky.latency = 0.01
+
+    with pytest.raises(MockProviderError):
+        asyncio.run(router.run("Track/Domain: Healthcare"))
+
+    assert flaky.failures == 1 and flaky.inflight == 0
+    assert flaky.latency > 0.01
+
+
+@pytest.fixture
+def staged_critique(role_env, monkeypatch):
+    """A critique with distinct draft and final models, both scripted."""
+    role_env("CRITIQUE_DRAFT_MODEL", "mock:draft")
+    role_env("CRITIQUE_FINAL_MODEL", "mock:final")
+    critique = CritiqueAgent()
+    draft, final = ScriptedModel(EVALUATION_REPLY), ScriptedModel(EVALUATION_REPLY)
+    monkeypatch.setattr(critique.draft, "run", draft.run)
+    monkeypatch.setattr(critique.final, "run", final.run)
+    return critique, draft, final
+
+
+def _evaluation(score: int) -> str:
+    return EVALUATION_REPLY.replace('"overall_score": 7', f'"overall_score": {score}')
+
+
+def test_final_model_confirms_passing_drafts(staged_critique):
+    critique, draft, final = staged_critique
+    draft.replies = [_evaluation(9)]
+    final.replies = [_evaluation(6)]
+
+    evaluation = asyncio.run(critique.evaluate_idea({"title": "Queue Radar"}, "Healthcare", "Clinic wait times"))
+
+    assert evaluation["overall_score"] == 6 and evaluation["verdict"] == "FAIL"
+    assert critique.model_id == "draft>final"
+
+
+def test_failing_drafts_skip_the_final_model(staged_critique):
+    critique, draft, final = staged_critique
+    draft.replies = [_evaluation(4)]
+
+    evaluation = asyncio.run(critique.evaluate_idea({"title": "Queue Radar"}, "Healthcare", "Clinic wait times"))
+
+    assert evaluation["overall_score"] == 4
+    assert final.prompts == []
+
+
+def test_batch_drafts_are_confirmed_individually(staged_critique):
+    critique, draft, final = staged_critique
+    draft.replies = ['{"evaluations": [{"id": 1, "overall_score": 8}, {"id": 2, "overall_score": 3}]}']
+    final.replies = [_evaluation(9)]
+    ideas = [{"title": "Queue Radar"}, {"title": "Wait Board"}]
+
+    evaluations = asyncio.run(critique.evaluate_ideas(ideas, "Healthcare", "Clinic wait times"))
+
+    assert [e["overall_score"] for e in evaluations] == [9, 3]
+    assert len(final.prompts) == 1 and "Queue Radar" in final.prompts[0]
+
+
+def test_single_model_critique_has_no_final_stage(role_env):
+    role_env("CRITIQUE_MODEL", "mock:judge")
+
+    critique = CritiqueAgent()
+
+    assert critique.final is None
+    assert critique.model_id == "judge"
+    assert set(critique.routing_stats()) == {"critique_draft"}
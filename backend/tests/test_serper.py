@@ -0,0 +1,46 @@
+"""Tests for the pooled Serper client."""
+import asyncio
+import json
+
+import httpx
+
+import tools.serper as serper
+from tools import close_search_client, create_search_client, get_search_client, search_web, set_search_client
+
+
+def test_search_goes_through_the_shared_client(search_stub):
+    results = asyncio.run(search_web("pooled client query", num_results=5))
+
+    assert results["organic"][0]["snippet"] == "pooled client query"
+    request = search_stub.requests[0]
+    assert request.headers["X-API-KEY"] == "test-key"
+    assert json.loads(request.content) == {"q": "pooled client query", "num": 5}
+
+
+def test_explicit_client_overrides_the_shared_one(search_stub):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"organic": []})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    assert asyncio.run(search_web("explicit client query", client=client)) == {"organic": []}
+    assert len(seen) == 1
+    assert search_stub.requests == []
+
+
+def test_create_search_client_settings():
+    client = create_search_client(timeout=3)
+    assert client.timeout.read == 3
+    assert client.timeout.connect == serper.SERPER_CONNECT_TIMEOUT
+    assert str(client.base_url).rstrip("/") == serper.SERPER_BASE_URL
+    asyncio.run(client.aclose())
+
+
+def test_close_search_client_releases_the_shared_client():
+    client = create_search_client()
+    set_search_client(client)
+    asyncio.run(close_search_client())
+    assert get_search_client() is None
+    assert client.is_closed
@@ -0,0 +1,70 @@
+"""Tests for the session registry and per-session interrupts."""
+import asyncio
+
+from agents.sessions import SessionRegistry
+
+
+async def _stages(registry: SessionRegistry, forge, max_iterations: int = 5) -> list:
+    return [
+        update.stage
+        async for update in registry.run_depth(
+            forge, track="Healthcare", problem_statement="Clinic wait times", max_iterations=max_iterations
+        )
+    ]
+
+
+def test_stopping_one_session_leaves_the_other_running(registry, fake_researcher):
+    fake_researcher.delay = 0.01
+    first, second = registry.create(), registry.create()
+
+    async def run():
+        runs = asyncio.gather(_stages(registry, first), _stages(registry, second))
+        await asyncio.sleep(0.03)
+        registry.get(first.session_id).interrupt()
+        return await runs
+
+    first_stages, second_stages = asyncio.run(run())
+
+    assert first_stages[-1] == "interrupted"
+    assert second_stages[-1] == "max_iterations"
+    assert second_stages.count("rejected") == 5
+
+
+def test_runs_beyond_the_limit_wait_for_a_slot(fake_researcher, fake_critique):
+    registry = SessionRegistry(max_concurrent_runs=1)
+    registry.researcher, registry.critique = fake_researcher, fake_critique
+    first, second = registry.create(), registry.create()
+
+    async def run():
+        return await asyncio.gather(_stages(registry, first, 1), _stages(registry, second, 1))
+
+    first_stages, second_stages = asyncio.run(run())
+
+    assert first_stages[0] != "queued"
+    assert second_stages[0] == "queued"
+    assert second_stages[-1] == "max_iterations"
+
+
+def test_independent_run_stopped_before_it_starts(forge, fake_researcher):
+    forge.interrupt()
+
+    result = asyncio.run(forge.run_independent("Healthcare"))
+
+    assert result["success"] is False
+    assert result["idea"] is None
+    assert fake_researcher.searches == 0
+
+
+def test_independent_run_checks_for_interrupts_after_searching(forge, fake_researcher):
+    search = fake_researcher.search_for_problems
+
+    async def search_then_stop(*args, **kwargs):
+        forge.interrupt()
+        return await search(*args, **kwargs)
+
+    fake_researcher.search_for_problems = search_then_stop
+
+    result = asyncio.run(forge.run_independent("Healthcare"))
+
+    assert result["success"] is False
+    assert fake_researcher.calls == []
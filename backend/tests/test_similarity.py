@@ -0,0 +1,96 @@
+"""Tests for near-duplicate detection in depth mode."""
+import asyncio
+
+import numpy as np
+import pytest
+
+import agents.forge as forge_module
+from agents.similarity import DuplicateFilter, IdeaIndex, embed, idea_text, load_seed_index
+
+IDEA = {
+    "title": "Queue Radar",
+    "problem": "Patients wait hours in clinics without knowing their place in line",
+    "solution": "Live queue positions and SMS alerts when it is almost your turn",
+    "unique_angle": "Works on any phone",
+    "tech_stack": ["FastAPI", "Twilio"],
+}
+
+
+def _similarity(a: dict, b: dict) -> float:
+    return float(embed(idea_text(a)) @ embed(idea_text(b)))
+
+
+def test_embeddings_are_unit_length():
+    assert np.linalg.norm(embed(idea_text(IDEA))) == pytest.approx(1.0)
+    assert not embed("").any()
+
+
+def test_renamed_idea_is_a_near_duplicate_and_a_new_one_is_not():
+    renamed = {**IDEA, "title": "LineLess", "name": "LineLess"}
+    unrelated = {
+        "title": "Study Buddy",
+        "problem": "Students forget material between lectures",
+        "solution": "Spaced repetition quizzes generated from lecture notes",
+        "tech_stack": ["React"],
+    }
+
+    assert _similarity(IDEA, renamed) >= 0.85
+    assert _similarity(IDEA, unrelated) < 0.3
+
+
+def test_index_grows_past_its_capacity():
+    ideas = [{"title": f"Idea {n}", "solution": f"solution number {n} words{n}"} for n in range(5)]
+    index = IdeaIndex(capacity=1)
+    for idea in ideas:
+        index.add(idea)
+
+    label, similarity = index.nearest(embed(idea_text(ideas[3])))
+
+    assert len(index) == 5
+    assert label == "Idea 3"
+    assert similarity == pytest.approx(1.0)
+
+
+def test_seed_index_is_copied_per_run():
+    first = load_seed_index()
+    first.add(IDEA)
+
+    assert len(load_seed_index()) == len(first) - 1 > 0
+
+
+def test_filter_indexes_fresh_ideas_and_flags_repeats():
+    duplicates = DuplicateFilter()
+
+    assert duplicates.check(IDEA)[0] is None
+    match, similarity = duplicates.check({**IDEA, "title": "Queue Radar 2"})
+    assert match == "Queue Radar"
+    assert similarity >= duplicates.threshold
+
+
+def _run(forge, **kwargs) -> list:
+    async def run():
+        return [update async for update in forge.run_depth("Healthcare", "Clinic wait times", **kwargs)]
+    return asyncio.run(run())
+
+
+def test_duplicates_skip_the_critique_and_steer_the_next_generation(forge, fake_researcher, fake_critique):
+    fake_researcher.same_idea = True
+
+    updates = _run(forge, max_iterations=3)
+
+    assert [u.stage for u in updates].count("duplicate") == 2
+    assert len(fake_critique.evaluated) == 1
+    assert "Too similar to earlier ideas" in fake_researcher.calls[2][1]["feedback"]
+    assert forge.get_status()["critique_calls_saved"] == 2
+    assert updates[-1].stage == "max_iterations"
+    assert "2 critique call(s) saved" in updates[-1].message
+
+
+def test_duplicate_filter_can_be_disabled(forge, fake_researcher, fake_critique, monkeypatch):
+    monkeypatch.setattr(forge_module, "DUPLICATE_FILTER", False)
+    fake_researcher.same_idea = True
+
+    updates = _run(forge, max_iterations=3)
+
+    assert "duplicate" not in [u.stage for u in updates]
+    assert len(fake_critique.evaluated) == 3
@@ -0,0 +1,109 @@
+"""Tests for the SSE transport."""
+import asyncio
+import json
+import zlib
+
+import sse
+from agents.forge import ForgeUpdate
+
+
+class FakeRequest:
+    """The slice of a Starlette request the transport reads."""
+
+    def __init__(self):
+        self.headers = {}
+        self.disconnected = False
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+def _token(agent: str, delta: str, iteration: int = 1) -> ForgeUpdate:
+    return ForgeUpdate(iteration=iteration, stage="token", agent=agent, delta=delta)
+
+
+def test_status_updates_omit_empty_fields():
+    message = sse.encode_update("s1", ForgeUpdate(iteration=1, stage="researching", message="Searching"))
+
+    assert message.startswith(b"data: ") and message.endswith(b"\n\n")
+    assert json.loads(message[len(b"data: "):]) == {
+        "session_id": "s1", "iteration": 1, "stage": "researching", "message": "Searching"
+    }
+
+
+def test_token_updates_are_named_events():
+    message = sse.encode_update("s1", _token("researcher", "Hel"))
+
+    event, data = message.split(b"\n", 1)
+    assert event == b"event: token"
+    assert json.loads(data[len(b"data: "):])["delta"] == "Hel"
+
+
+def test_coalesce_merges_tokens_per_agent_between_status_updates():
+    status = ForgeUpdate(iteration=1, stage="critiquing", message="Critiquing")
+    merged = sse.coalesce([
+        _token("researcher:0", "Hel"),
+        _token("researcher:1", "Wor"),
+        _token("researcher:0", "lo"),
+        status,
+        _token("critique", "ok"),
+    ])
+
+    assert [(u.stage, u.agent, u.delta) for u in merged] == [
+        ("token", "researcher:0", "Hello"),
+        ("token", "researcher:1", "Wor"),
+        ("critiquing", "", ""),
+        ("token", "critique", "ok"),
+    ]
+
+
+def test_heartbeats_fill_quiet_periods_and_a_disconnect_interrupts_the_run(forge):
+    request = FakeRequest()
+
+    async def quiet():
+        await asyncio.sleep(10)
+        yield ForgeUpdate(iteration=1, stage="complete")
+
+    async def run():
+        events = sse._event_stream(request, forge, quiet(), heartbeat=0.01, coalesce_window=0)
+        first = await events.__anext__()
+        request.disconnected = True
+        rest = [chunk async for chunk in events]
+        return first, rest
+
+    first, rest = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert first == sse.HEARTBEAT
+    assert rest == []
+    assert forge.cancel_requested
+
+
+def test_run_errors_are_sent_as_error_events(forge):
+    async def failing():
+        yield ForgeUpdate(iteration=1, stage="researching", message="Searching")
+        raise RuntimeError("search down")
+
+    async def run():
+        events = sse._event_stream(FakeRequest(), forge, failing(), heartbeat=5, coalesce_window=0)
+        return b"".join([chunk async for chunk in events])
+
+    body = asyncio.run(run())
+
+    assert b'"stage":"researching"' in body
+    assert b'data: {"error":"search down"}' in body
+    assert not forge.cancel_requested
+
+
+def test_gzip_flushes_every_event():
+    async def events():
+        yield b"data: one\n\n"
+        yield b"data: two\n\n"
+
+    async def run():
+        return [chunk async for chunk in sse._gzip_stream(events())]
+
+    decompressor = zlib.decompressobj(31)
+    chunks = asyncio.run(run())
+
+    assert decompressor.decompress(chunks[0]) == b"data: one\n\n"
+    assert decompressor.decompress(chunks[1]) == b"data: two\n\n"
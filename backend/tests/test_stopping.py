@@ -0,0 +1,102 @@
+"""Tests for adaptive early stopping of depth runs."""
+import asyncio
+
+import pytest
+
+from agents.stopping import EarlyStopper, chance_to_reach, fit_trend
+
+
+def _observe(stopper: EarlyStopper, scores: list) -> list:
+    return [stopper.observe(iteration, {"overall_score": score}) for iteration, score in enumerate(scores, 1)]
+
+
+def test_fit_trend_is_a_least_squares_line():
+    level, slope, spread = fit_trend([4, 5, 6])
+
+    assert (level, slope, spread) == pytest.approx((6, 1, 0))
+    assert fit_trend([5]) == (5, 0.0, 0.0)
+
+
+def test_a_flat_trend_far_below_the_threshold_has_little_chance():
+    assert chance_to_reach([4, 4, 4, 4], 8, remaining=6) < 0.01
+    assert chance_to_reach([5, 6, 7], 8, remaining=4) > 0.5
+    assert chance_to_reach([4, 4, 4], 8, remaining=0) == 0.0
+
+
+def test_adaptive_runs_stop_once_the_threshold_is_out_of_reach():
+    stopper = EarlyStopper("adaptive", threshold=8, max_iterations=10)
+
+    assert _observe(stopper, [4, 4, 4]) == [False, False, True]
+    assert stopper.iterations_saved == 7
+    assert "weakest" not in stopper.describe()
+
+
+def test_rising_scores_keep_the_run_going():
+    stopper = EarlyStopper("adaptive", threshold=8, max_iterations=10)
+
+    assert not any(_observe(stopper, [4, 5, 6, 7]))
+    assert stopper.iterations_saved == 0
+
+
+def test_off_never_stops_but_still_estimates():
+    stopper = EarlyStopper("off", threshold=8, max_iterations=10)
+
+    assert not any(_observe(stopper, [3, 3, 3, 3]))
+    assert stopper.stats()["probability"] < 0.05
+
+
+def test_unparseable_critiques_are_not_scores():
+    stopper = EarlyStopper("adaptive", threshold=8, max_iterations=10)
+
+    assert not any(_observe(stopper, [0, 4, 0, 4]))
+    assert stopper.scores == [4, 4]
+
+
+def test_unknown_policies_are_rejected():
+    with pytest.raises(ValueError, match="Unknown early stop policy"):
+        EarlyStopper("eager", threshold=8, max_iterations=10)
+
+
+def test_weakest_dimensions_are_reported():
+    stopper = EarlyStopper("adaptive", threshold=8, max_iterations=10)
+    for iteration in range(1, 4):
+        stopper.observe(iteration, {"overall_score": 4, "scores": {"feasibility": 6, "innovation": 3}})
+
+    assert [name for name, _, _ in stopper.weakest(1)] == ["innovation"]
+    assert "weakest: innovation 3.0" in stopper.describe()
+    assert set(stopper.stats()["dimensions"]) == {"feasibility", "innovation"}
+
+
+def test_an_early_stopped_run_ends_with_the_best_idea(forge, fake_critique):
+    fake_critique.scores = [4, 5, 4, 4]
+
+    async def run():
+        return [u async for u in forge.run_depth(
+            "Healthcare", "Clinic wait times", max_iterations=10, early_stop="adaptive"
+        )]
+
+    updates = asyncio.run(run())
+    final = updates[-1]
+
+    assert final.stage == "early_stopped"
+    assert final.evaluation["overall_score"] == 5
+    assert "Stopped early" in final.message
+    status = forge.get_status()["early_stop"]
+    assert status["policy"] == "adaptive"
+    assert status["iterations_saved"] == 10 - final.iteration
+
+
+def test_early_stopped_runs_are_recorded_as_finished(registry, store, fake_critique):
+    registry.store = store
+    fake_critique.scores = [4]
+    forge = registry.create()
+
+    async def run():
+        return [u async for u in registry.run_depth(
+            forge, track="Store Track", problem_statement="Clinic wait times", max_iterations=10, early_stop="adaptive"
+        )]
+
+    asyncio.run(run())
+    store.flush()
+
+    assert asyncio.run(store.get_run(forge.session_id))["status"] == "early_stopped"
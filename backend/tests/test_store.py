@@ -0,0 +1,106 @@
+"""Tests for the persistent run and idea store."""
+import asyncio
+
+import pytest
+
+TRACK = "Store Track"
+
+
+def _idea(n: int) -> dict:
+    return {"title": f"Stored idea {n}"}
+
+
+def _stream(registry, forge, **kwargs) -> list:
+    async def run():
+        return [update async for update in registry.run_depth(
+            forge, track=TRACK, problem_statement="Clinic wait times", **kwargs
+        )]
+    return asyncio.run(run())
+
+
+def test_a_depth_run_is_recorded_with_its_ideas_and_timings(registry, store, fake_critique):
+    registry.store = store
+    fake_critique.scores = [4, 6]
+    forge = registry.create()
+
+    _stream(registry, forge, max_iterations=2)
+    store.flush()
+    run = asyncio.run(store.get_run(forge.session_id))
+
+    assert run["status"] == "max_iterations"
+    assert run["iterations"] == 2
+    assert run["best_score"] == 6
+    assert [(idea["title"], idea["score"]) for idea in run["ideas"]] == [("Idea 0", 4), ("Idea 1", 6)]
+    assert run["final_idea_id"] == run["ideas"][1]["id"]
+    assert run["ideas"][1]["evaluation"]["verdict"] == "FAIL"
+    assert {"researching", "evaluating", "rejected"} <= {t["stage"] for t in run["timings"]}
+
+
+def test_an_abandoned_stream_is_recorded_as_incomplete(registry, store):
+    registry.store = store
+    forge = registry.create()
+
+    async def run():
+        updates = registry.run_depth(forge, track=TRACK, problem_statement="Clinic wait times")
+        await updates.__anext__()
+        await updates.aclose()
+
+    asyncio.run(run())
+    store.flush()
+
+    assert asyncio.run(store.get_run(forge.session_id))["status"] == "incomplete"
+
+
+def test_pages_are_stable_under_inserts(store):
+    for n in range(5):
+        store.add_idea("run-a", 1, TRACK, _idea(n))
+    store.flush()
+
+    first = asyncio.run(store.list_ideas(limit=2))
+    store.add_idea("run-a", 2, TRACK, _idea(5))
+    store.flush()
+    titles = [idea["title"] for idea in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = asyncio.run(store.list_ideas(limit=2, cursor=cursor))
+        titles += [idea["title"] for idea in page["items"]]
+        cursor = page["next_cursor"]
+
+    assert titles == [f"Stored idea {n}" for n in range(4, -1, -1)]
+
+
+def test_ideas_filter_and_sort_by_score(store):
+    for n, score in enumerate([3, 8, 6]):
+        idea_id = store.add_idea("run-b", 1, TRACK, _idea(n))
+        store.add_evaluation("run-b", idea_id, {"overall_score": score, "verdict": "PASS" if score >= 7 else "FAIL"})
+    store.add_idea("run-b", 1, "Other Track", _idea(9))
+    store.flush()
+
+    page = asyncio.run(store.list_ideas(track=TRACK, min_score=5, sort="score"))
+
+    assert [(idea["title"], idea["score"]) for idea in page["items"]] == [("Stored idea 1", 8), ("Stored idea 2", 6)]
+    assert len(asyncio.run(store.list_ideas(verdict="PASS"))["items"]) == 1
+
+
+def test_writes_are_committed_in_batches(tmp_path):
+    from store import IdeaStore
+
+    store = IdeaStore(str(tmp_path / "batched.db"), flush_interval=0.5)
+    for n in range(50):
+        store.add_idea("run-c", 1, TRACK, _idea(n))
+    store.flush()
+    try:
+        assert store.writes_committed == 50
+        assert store.batches_committed < 5
+    finally:
+        store.close()
+
+
+def test_bad_cursors_are_rejected(store):
+    with pytest.raises(ValueError):
+        asyncio.run(store.list_runs(cursor="not-a-cursor"))
+
+
+def test_history_endpoints_report_a_disabled_store(client):
+    assert client.get("/api/history/runs").status_code == 503
+    assert client.get("/api/history/ideas").status_code == 503
@@ -0,0 +1,115 @@
+"""Tests for token streaming from the agents to the SSE endpoints."""
+import asyncio
+import json
+from types import SimpleNamespace
+
+from agents.llm import run_agent
+
+
+class StreamingAgent:
+    """An agent whose arun(stream=True) replays ``events``."""
+
+    name = "Streaming Agent"
+
+    def __init__(self, events: list):
+        self.events = events
+
+    def arun(self, prompt: str, stream: bool = False, **kwargs):
+        async def replay():
+            for event in self.events:
+                yield event
+        return replay()
+
+
+class SyncOnlyModel:
+    pass
+
+
+class SyncOnlyAgent:
+    """An agent whose provider only implements the sync entry point."""
+
+    name = "Sync Agent"
+
+    def __init__(self):
+        self.model = SyncOnlyModel()
+
+    async def arun(self, prompt: str, stream: bool = False, **kwargs):
+        raise NotImplementedError
+
+    def run(self, prompt: str):
+        return SimpleNamespace(content="full reply")
+
+
+def _event(name: str, content) -> SimpleNamespace:
+    return SimpleNamespace(event=name, content=content)
+
+
+def _collect(updates) -> list:
+    async def run():
+        return [update async for update in updates]
+    return asyncio.run(run())
+
+
+def test_run_agent_forwards_content_events_only():
+    agent = StreamingAgent([
+        _event("RunStarted", "ignored"),
+        _event("RunContent", "Hello"),
+        _event("ToolCallStarted", "ignored"),
+        _event("RunContent", ", world"),
+        _event("RunContent", None),
+    ])
+    deltas = []
+
+    response = asyncio.run(run_agent(agent, "prompt", on_token=deltas.append))
+
+    assert deltas == ["Hello", ", world"]
+    assert response.content == "Hello, world"
+
+
+def test_sync_only_provider_delivers_the_reply_in_one_chunk():
+    deltas = []
+
+    response = asyncio.run(run_agent(SyncOnlyAgent(), "prompt", on_token=deltas.append))
+
+    assert deltas == ["full reply"]
+    assert response.content == "full reply"
+
+
+def test_independent_stream_yields_each_token_once(forge):
+    updates = _collect(forge.stream_independent("Healthcare", stream_tokens=True))
+
+    tokens = [(update.agent, update.delta) for update in updates if update.stage == "token"]
+    assert tokens == [("researcher", "Idea 0"), ("researcher", " draft")]
+    assert updates[-1].stage == "complete"
+    assert updates[-1].idea["title"] == "Idea 0"
+
+
+def test_tokens_are_opt_in(forge):
+    updates = _collect(forge.run_depth("Healthcare", "Clinic wait times", max_iterations=1))
+
+    assert "token" not in [update.stage for update in updates]
+
+
+def test_depth_stream_labels_researcher_and_critique_tokens(forge):
+    updates = _collect(forge.run_depth(
+        "Healthcare", "Clinic wait times", max_iterations=1, stream_tokens=True
+    ))
+
+    tokens = [(update.agent, update.delta) for update in updates if update.stage == "token"]
+    assert tokens == [("researcher", "Idea 0"), ("researcher", " draft"), ("critique", "Scoring Idea 0")]
+
+
+def test_independent_stream_endpoint_sends_token_events(fake_client):
+    response = fake_client.post("/api/independent/stream", json={"track": "Healthcare"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    messages = [message for message in response.text.split("\n\n") if message]
+    tokens = [
+        json.loads(message.split("data: ", 1)[1])
+        for message in messages if message.startswith("event: token")
+    ]
+    assert "".join(token["delta"] for token in tokens) == "Idea 0 draft"
+    assert all(token["session_id"] == response.headers["X-Session-Id"] for token in tokens)
+    final = json.loads(messages[-1].split("data: ", 1)[1])
+    assert final["stage"] == "complete"
+    assert final["idea"]["title"] == "Idea 0"
@@ -0,0 +1,165 @@
+"""Tests for token usage, cost estimates and the depth token budget."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import config
+from agents.llm import run_agent
+from agents.usage import RunUsage, Usage, bind_usage, call_usage, reported_tokens, unbind_usage
+from mocks import LatencyProfile, MockAgent, MockModel
+
+
+@pytest.fixture
+def prices(monkeypatch):
+    """Set LLM_PRICES for one test; it is parsed on first use."""
+    def set_prices(value: str) -> None:
+        monkeypatch.setattr(config, "LLM_PRICES", value)
+        monkeypatch.setattr(config, "_overrides", None)
+    return set_prices
+
+
+def test_reported_tokens_reads_every_agno_shape():
+    assert reported_tokens(SimpleNamespace(input_tokens=120, output_tokens=30)) == (120, 30)
+    # agno 1.x: one entry per model request
+    assert reported_tokens({"input_tokens": [100, 20], "output_tokens": [10, 5]}) == (120, 15)
+    assert reported_tokens({"prompt_tokens": 7, "completion_tokens": 3}) == (7, 3)
+    assert reported_tokens(SimpleNamespace(input_tokens=0, output_tokens=0)) is None
+    assert reported_tokens(None) is None
+
+
+def test_reported_usage_is_priced_per_model():
+    response = SimpleNamespace(content="ignored", metrics={"input_tokens": 1_000_000, "output_tokens": 100_000})
+
+    usage = call_usage("gpt-4o", "prompt", response)
+
+    assert (usage.input_tokens, usage.output_tokens, usage.calls) == (1_000_000, 100_000, 1)
+    assert usage.cost_usd == pytest.approx(3.5)
+    assert not usage.estimated
+
+
+def test_missing_usage_is_estimated_from_the_text():
+    usage = call_usage("mystery-model", "Generate an idea", SimpleNamespace(content="Queue Radar"), "Be terse")
+
+    assert usage.estimated
+    assert usage.input_tokens > usage.output_tokens > 0
+    assert usage.cost_usd is None
+
+
+def test_dated_model_ids_fall_back_to_their_base_price(prices):
+    prices("")
+
+    assert config.get_model_price("gpt-4o-mini-2024-07-18") == (0.15, 0.60)
+    assert config.get_model_price("gpt-4o-2024-08-06") == (2.50, 10.00)
+    assert config.get_model_price("gpt-5") is None
+
+
+def test_price_overrides_replace_single_models(prices):
+    prices('{"gpt-4o": [1, 2], "my-model": ["0.5", 1]}')
+
+    assert config.get_model_price("gpt-4o") == (1.0, 2.0)
+    assert config.get_model_price("my-model") == (0.5, 1.0)
+    assert config.get_model_price("gpt-4o-mini") == (0.15, 0.60)
+
+
+def test_malformed_price_overrides_are_ignored(prices):
+    prices('{"gpt-4o": 3}')
+
+    assert config.get_model_price("gpt-4o") == (2.50, 10.00)
+
+
+def test_an_unpriced_call_makes_the_total_cost_unknown():
+    total = Usage()
+    total.add(Usage(input_tokens=10, output_tokens=5, cost_usd=0.01, calls=1))
+    total.add(Usage(input_tokens=1, output_tokens=1, cost_usd=None, calls=1, estimated=True))
+
+    assert total.to_dict() == {
+        "input_tokens": 11, "output_tokens": 6, "total_tokens": 17, "cost_usd": None, "calls": 2, "estimated": True
+    }
+
+
+def test_run_usage_attributes_calls_to_iterations():
+    run = RunUsage()
+    run.iteration = 1
+    run.record("researcher", "gpt-4o", Usage(input_tokens=100, output_tokens=50, calls=1))
+    run.iteration = 2
+    run.record("critique", "gpt-4o", Usage(input_tokens=10, output_tokens=5, calls=1))
+
+    snapshot = run.snapshot()
+    summary = run.summary()
+
+    assert snapshot["total_tokens"] == 165
+    assert snapshot["iteration"]["total_tokens"] == 15
+    assert [u["total_tokens"] for u in summary["by_iteration"].values()] == [150, 15]
+    assert [(c["iteration"], c["role"]) for c in summary["calls"]] == [(1, "researcher"), (2, "critique")]
+
+
+def test_streamed_calls_record_the_reported_usage():
+    agent = MockAgent(name="Hackathon Researcher", model=MockModel(LatencyProfile(0)), instructions="Be terse")
+    run = RunUsage()
+    chunks = []
+
+    async def call():
+        token = bind_usage(run)
+        try:
+            return await run_agent(agent, "Track/Domain: Healthcare", on_token=chunks.append)
+        finally:
+            unbind_usage(token)
+
+    response = asyncio.run(call())
+
+    # The final run output only carries metrics; its content is not streamed twice
+    assert "".join(chunks) == response.content
+    assert response.metrics.output_tokens > 0
+    assert run.summary()["calls"] == [{
+        "iteration": 0,
+        "role": "researcher",
+        "model": "mock",
+        "input_tokens": response.metrics.input_tokens,
+        "output_tokens": response.metrics.output_tokens,
+        "total_tokens": response.metrics.input_tokens + response.metrics.output_tokens,
+        "cost_usd": 0.0,
+        "calls": 1,
+        "estimated": False,
+    }]
+
+
+def _bill_critique(forge, fake_critique, tokens: int) -> None:
+    """Make each critique call report ``tokens`` of usage to the run."""
+    evaluate = fake_critique.evaluate_idea
+
+    async def evaluate_idea(*args, **kwargs):
+        forge.usage.record("critique", "gpt-4o", Usage(input_tokens=tokens, calls=1))
+        return await evaluate(*args, **kwargs)
+
+    fake_critique.evaluate_idea = evaluate_idea
+
+
+def test_status_updates_carry_the_usage_so_far(forge, fake_critique):
+    _bill_critique(forge, fake_critique, 100)
+
+    async def run():
+        return [u async for u in forge.run_depth("Healthcare", "Clinic wait times", max_iterations=2)]
+
+    updates = asyncio.run(run())
+
+    assert updates[-1].usage["total_tokens"] == 200
+    assert updates[-1].usage["iteration"]["total_tokens"] == 100
+    assert forge.get_status()["usage"]["totals"]["calls"] == 2
+
+
+def test_token_budget_ends_the_run_with_the_best_idea(forge, fake_critique):
+    fake_critique.scores = [4, 6, 5]
+    _bill_critique(forge, fake_critique, 400)
+
+    async def run():
+        return [u async for u in forge.run_depth(
+            "Healthcare", "Clinic wait times", max_iterations=5, token_budget=1000
+        )]
+
+    final = asyncio.run(run())[-1]
+
+    assert final.stage == "budget_exceeded"
+    assert final.iteration == 3
+    assert final.evaluation["overall_score"] == 6
+    assert "1200/1000" in final.message
@@ -1,3 +1,32 @@
-from .serper import search_web, search_reddit, search_hackathon_winners, search_tech_blogs
+from .serper import (
+    search_web,
+    search_reddit,
+    search_hackathon_winners,
+    search_tech_blogs,
+    create_search_client,
+    set_search_client,
+    get_search_client,
+    close_search_client,
+    get_search_cache_stats,
+)
+from .cache import TTLCache
+from .resilience import CircuitOpenError, get_upstream, get_upstream_stats
+from .context import build_context, count_tokens
 
-__all__ = ["search_web", "search_reddit", "search_hackathon_winners", "search_tech_blogs"]
+__all__ = [
+    "search_web",
+    "search_reddit",
+    "search_hackathon_winners",
+    "search_tech_blogs",
+    "create_search_client",
+    "set_search_client",
+    "get_search_client",
+    "close_search_client",
+    "get_search_cache_stats",
+    "TTLCache",
+    "CircuitOpenError",
+    "get_upstream",
+    "get_upstream_stats",
+    "build_context",
+    "count_tokens",
+]
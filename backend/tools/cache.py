@@ -0,0 +1,231 @@
+"""In-memory TTL + LRU cache with an optional SQLite tier."""
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a fixed TTL.
+
+    Values must be JSON-serializable when a disk tier is configured. The
+    memory tier is checked first; on a miss the SQLite tier (if any) is
+    consulted and a hit is promoted back into memory. Disk lookups are
+    primary-key reads; writes never block the caller, as a background
+    thread commits them.
+
+    With ``stale_ttl``, expired entries are kept that much longer for
+    ``get_stale``, so callers can serve an old value when the source is down.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 512,
+        ttl: float = 3600,
+        path: Optional[str] = None,
+        namespace: str = "default",
+        stale_ttl: float = 0
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.namespace = namespace
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = self._connect(path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            # Expired rows are otherwise only removed when looked up
+            self._db.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time() - stale_ttl,))
+            self._db.commit()
+            self._writes = queue.Queue()
+            self._writer = threading.Thread(
+                target=self._write_loop, args=(self._connect(path),), name=f"cache-{namespace}", daemon=True
+            )
+            self._writer.start()
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a stable cache key from JSON-serializable parts."""
+        raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key``, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if expires_at + self.stale_ttl <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+
+            row = self._disk_get(key, now)
+            if row is not None:
+                value, expires_at = row
+                self._store(key, value, expires_at)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+            self.misses += 1
+            return None
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Return the value for ``key`` even if expired (within ``stale_ttl``), or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] + self.stale_ttl > now:
+                return entry[1]
+            row = self._disk_get(key, now - self.stale_ttl)
+            return row[0] if row is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store ``value`` under ``key`` in every configured tier."""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+        self._enqueue(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (self.namespace, key, json.dumps(value), expires_at)
+        )
+
+    def clear(self) -> None:
+        """Drop every entry in this cache's namespace."""
+        with self._lock:
+            self._entries.clear()
+        self._enqueue("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued disk write is committed. Returns False on timeout."""
+        if self._writes is None:
+            return True
+        done = threading.Event()
+        self._writes.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Commit outstanding writes and close the disk tier, if any."""
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "persistent": self._db is not None
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: str, value: Any, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at <= now:
+            if expires_at + self.stale_ttl <= now:
+                self._enqueue("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                self.expirations += 1
+            return None
+        return json.loads(value), expires_at
+
+    def _enqueue(self, sql: str, params: tuple) -> None:
+        if self._writes is not None:
+            self._writes.put((sql, params))
+
+    def _write_loop(self, db: sqlite3.Connection) -> None:
+        """Commit queued writes, batching whatever arrived while the last commit ran."""
+        while True:
+            item = self._writes.get()
+            pending = [item]
+            while True:
+                try:
+                    pending.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            for item in pending:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    continue
+                else:
+                    try:
+                        db.execute(*item)
+                    except sqlite3.Error as e:
+                        print(f"⚠️ Cache write failed: {e}")
+            db.commit()
+            for item in pending:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if stop:
+                db.close()
+                return
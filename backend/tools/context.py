@@ -0,0 +1,213 @@
+"""Context builder - turns raw search responses into compact, ranked prompt context."""
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+# Token budget for the search-results section of a generation prompt
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1000"))
+# Snippets longer than this many characters are trimmed before packing
+CONTEXT_SNIPPET_CHARS = int(os.getenv("CONTEXT_SNIPPET_CHARS", "300"))
+# Score multiplier applied for each record already taken from the same domain
+CONTEXT_DOMAIN_DECAY = float(os.getenv("CONTEXT_DOMAIN_DECAY", "0.7"))
+
+NO_RESULTS = "(no search results)"
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in",
+    "is", "it", "of", "on", "or", "that", "the", "this", "to", "with", "you", "your",
+}
+
+_encoding = None
+
+
+def _get_encoding():
+    """Load the tiktoken encoding once; None when it can't be loaded (e.g. offline on first use)."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the token count of ``text``.
+
+    Uses tiktoken's cl100k_base encoding. If the encoding can't be
+    loaded, falls back to the usual ~4 characters per token approximation.
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+@dataclass
+class SearchRecord:
+    """One search hit reduced to the fields worth showing a model."""
+    title: str
+    snippet: str
+    link: str
+    source: str = ""
+    position: int = 0
+    score: float = 0.0
+
+    @property
+    def domain(self) -> str:
+        host = urlsplit(self.link).netloc.lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def render(self) -> str:
+        line = f"- {self.title}"
+        if self.snippet:
+            line += f": {self.snippet}"
+        if self.link:
+            line += f" ({self.link})"
+        return line
+
+
+def flatten_results(results: Dict[str, dict], snippet_chars: int = CONTEXT_SNIPPET_CHARS) -> List[SearchRecord]:
+    """
+    Flatten Serper responses into title/snippet/link records.
+
+    Args:
+        results: Mapping of source name to a raw Serper response
+        snippet_chars: Maximum snippet length kept per record
+
+    Returns:
+        Records from every source's organic results and "people also ask"
+        answers, in source order
+    """
+    records = []
+    for source, response in results.items():
+        if not isinstance(response, dict):
+            continue
+        for hit in response.get("organic", []):
+            records.append(SearchRecord(
+                title=_clean(hit.get("title", "")),
+                snippet=_trim(_clean(hit.get("snippet", "")), snippet_chars),
+                link=hit.get("link", ""),
+                source=source,
+                position=hit.get("position", len(records) + 1)
+            ))
+        for hit in response.get("peopleAlsoAsk", []):
+            records.append(SearchRecord(
+                title=_clean(hit.get("question", "")),
+                snippet=_trim(_clean(hit.get("snippet", "")), snippet_chars),
+                link=hit.get("link", ""),
+                source=source,
+                position=len(records) + 1
+            ))
+    return [r for r in records if r.title or r.snippet]
+
+
+def dedupe_records(records: Iterable[SearchRecord]) -> List[SearchRecord]:
+    """Drop records whose URL, or whose title on the same domain, was already seen."""
+    seen_links = set()
+    seen_titles = set()
+    unique = []
+    for record in records:
+        link_key = _normalize_url(record.link)
+        title_key = (record.domain, record.title.lower())
+        if (link_key and link_key in seen_links) or title_key in seen_titles:
+            continue
+        seen_links.add(link_key)
+        seen_titles.add(title_key)
+        unique.append(record)
+    return unique
+
+
+def rank_records(
+    records: List[SearchRecord],
+    query: str,
+    domain_decay: float = CONTEXT_DOMAIN_DECAY
+) -> List[SearchRecord]:
+    """
+    Order records by relevance to ``query``, favouring domain diversity.
+
+    Relevance is term overlap with the query (title matches count double)
+    plus a small prior for the search engine's own position. Each record
+    already picked from a domain scales later ones from it by ``domain_decay``.
+    """
+    terms = set(_terms(query))
+    for record in records:
+        title_terms = Counter(_terms(record.title))
+        snippet_terms = Counter(_terms(record.snippet))
+        overlap = sum(2 * title_terms[t] + snippet_terms[t] for t in terms)
+        record.score = overlap / (1 + len(terms)) + 1 / (1 + record.position)
+
+    ranked = []
+    remaining = list(records)
+    taken: Counter = Counter()
+    while remaining:
+        best = max(remaining, key=lambda r: r.score * domain_decay ** taken[r.domain])
+        remaining.remove(best)
+        taken[best.domain] += 1
+        ranked.append(best)
+    return ranked
+
+
+def pack_records(records: List[SearchRecord], budget: int) -> str:
+    """Render records in order, skipping any that would overflow ``budget`` tokens."""
+    lines = []
+    used = 0
+    for record in records:
+        line = record.render()
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            continue
+        lines.append(line)
+        used += cost
+    return "\n".join(lines) if lines else NO_RESULTS
+
+
+def build_context(
+    results: Dict[str, dict],
+    query: str,
+    budget: int = CONTEXT_TOKEN_BUDGET,
+    sources: Optional[List[str]] = None
+) -> str:
+    """
+    Build the search-results section of a prompt.
+
+    Args:
+        results: Mapping of source name to a raw Serper response
+        query: Text the records are ranked against (track, requirements...)
+        budget: Maximum tokens for the rendered context
+        sources: Only use these sources (default: all)
+
+    Returns:
+        One compact line per result, most relevant first, within ``budget``
+    """
+    if sources is not None:
+        results = {s: results[s] for s in sources if s in results}
+    records = dedupe_records(flatten_results(results))
+    return pack_records(rank_records(records, query), budget)
+
+
+def _terms(text: str) -> List[str]:
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS and len(w) > 1]
+
+
+def _clean(text: str) -> str:
+    return " ".join(str(text).split())
+
+
+def _trim(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def _normalize_url(link: str) -> str:
+    parts = urlsplit(link.strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return f"{host}{parts.path.rstrip('/')}"
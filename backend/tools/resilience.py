@@ -0,0 +1,256 @@
+"""Client-side resilience for upstream calls: token-bucket rate limits, jittered retries and circuit breakers."""
+import asyncio
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from metrics import count
+
+# Attempts per search request and per model call when the error is retryable (429, 5xx, connection errors)
+SEARCH_RETRY_ATTEMPTS = int(os.getenv("SEARCH_RETRY_ATTEMPTS", "3"))
+LLM_RETRY_ATTEMPTS = int(os.getenv("LLM_RETRY_ATTEMPTS", "3"))
+# Backoff before retry n is uniform in [0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**n)] seconds
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.25"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "4"))
+# Consecutive failures that open an upstream's circuit, and seconds before it lets a probe through
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+# HTTP statuses worth retrying: rate limited, or the upstream is having trouble
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+# Provider SDK exceptions without a status code that are still transient
+_TRANSIENT_NAMES = ("Timeout", "Connection", "RateLimit", "ServiceUnavailable", "InternalServer", "Overloaded")
+
+
+class CircuitOpenError(RuntimeError):
+    """The upstream's circuit is open; the call was not attempted."""
+
+
+class TokenBucket:
+    """
+    Async token bucket: ``rate`` requests per second with bursts up to ``burst``.
+
+    A rate of 0 disables limiting. Waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> float:
+        """Take one token, waiting if needed; returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            wait = 0.0
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                await asyncio.sleep(wait)
+                self._refill()
+            self.tokens -= 1
+            return wait
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class CircuitBreaker:
+    """
+    Closed until ``failure_threshold`` consecutive failures, then open: calls
+    fail fast for ``reset_timeout`` seconds. After that one probe call is let
+    through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (claims the probe slot when half-open)."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; returns True if this opened (or re-opened) the circuit."""
+        self.failures += 1
+        if self._probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+            self._probing = False
+            return True
+        return False
+
+    def release(self) -> None:
+        """End a probe that neither succeeded nor failed (e.g. cancelled)."""
+        self._probing = False
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header on the error's response, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(exc: BaseException) -> str:
+    """
+    How an upstream error should be handled.
+
+    Returns:
+        "retry" for transient errors (retried and counted against the
+        circuit), "fail" for errors that count against the circuit but
+        aren't worth repeating (missed deadlines), "ignore" for the caller's
+        own errors (bad request, unparseable input)
+    """
+    if isinstance(exc, asyncio.TimeoutError):
+        return "fail"
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return "retry" if status in RETRYABLE_STATUSES else "ignore"
+    name = type(exc).__name__
+    if any(part in name for part in _TRANSIENT_NAMES):
+        return "retry"
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return "retry"
+    try:
+        import httpx
+        if isinstance(exc, httpx.TransportError):
+            return "retry"
+    except ImportError:
+        pass
+    return "ignore"
+
+
+class Upstream:
+    """
+    Rate limit, retry policy and circuit breaker for one upstream service.
+
+    Rate limits come from ``<NAME>_RATE_LIMIT`` (requests per second, 0 =
+    unlimited) and ``<NAME>_RATE_BURST``, e.g. ``SERPER_RATE_LIMIT=5``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        attempts: int = 1,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        rng: Optional[random.Random] = None
+    ):
+        prefix = name.upper()
+        if rate is None:
+            rate = float(os.getenv(f"{prefix}_RATE_LIMIT", "0"))
+        if burst is None and os.getenv(f"{prefix}_RATE_BURST"):
+            burst = float(os.getenv(f"{prefix}_RATE_BURST"))
+        self.name = name
+        self.attempts = max(1, attempts)
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = breaker or CircuitBreaker()
+        self._rng = rng or random.Random()
+        self.calls = 0
+        self.retries = 0
+        self.rejected = 0
+        self.throttled_s = 0.0
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn()`` under the rate limit, retrying transient errors with jittered backoff.
+
+        ``fn`` is called again for each retry; callers that stream output
+        should make it stop streaming once anything was emitted.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            The last error once retries are exhausted or the error isn't retryable
+        """
+        for attempt in range(self.attempts):
+            if not self.breaker.allow():
+                self.rejected += 1
+                count("upstream_rejected_total", upstream=self.name)
+                raise CircuitOpenError(f"{self.name} circuit is open after {self.breaker.failures} failures")
+            self.throttled_s += await self.bucket.acquire()
+            self.calls += 1
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                kind = classify(e)
+                if kind == "ignore":
+                    self.breaker.release()
+                    raise
+                count("upstream_errors_total", upstream=self.name)
+                if self.breaker.record_failure():
+                    count("upstream_circuit_opens_total", upstream=self.name)
+                    print(f"🔌 {self.name} circuit opened after {self.breaker.failures} failures ({e!r})")
+                if kind != "retry" or attempt == self.attempts - 1 or self.breaker.state != "closed":
+                    raise
+                delay = self._rng.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+                delay = max(delay, min(retry_after(e) or 0.0, RETRY_MAX_DELAY))
+                self.retries += 1
+                count("upstream_retries_total", upstream=self.name)
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    def stats(self) -> dict:
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "calls": self.calls,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "rate_limit": self.bucket.rate or None,
+            "throttled_s": round(self.throttled_s, 3)
+        }
+
+
+_upstreams: Dict[str, Upstream] = {}
+
+
+def get_upstream(name: str, attempts: int = 1) -> Upstream:
+    """The shared Upstream for ``name`` ("serper", "openai", ...), created on first use."""
+    if name not in _upstreams:
+        _upstreams[name] = Upstream(name, attempts=attempts)
+    return _upstreams[name]
+
+
+def get_upstream_stats() -> dict:
+    """Circuit state and counters of every upstream used so far."""
+    return {name: upstream.stats() for name, upstream in sorted(_upstreams.items())}
@@ -1,31 +1,207 @@
 """Serper API tool for web search."""
+import asyncio
 import os
 import httpx
 from typing import Optional
 
+from metrics import count, span
+from mocks import USE_MOCK, mock_search, record_search
+from .cache import TTLCache
+from .resilience import SEARCH_RETRY_ATTEMPTS, get_upstream
+
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
+SERPER_BASE_URL = os.getenv("SERPER_BASE_URL", "https://google.serper.dev").rstrip("/")
+# With USE_MOCK and no SERPER_BASE_URL, searches are answered in-process
+SERPER_MOCK = USE_MOCK and not os.getenv("SERPER_BASE_URL")
+
+# Connection pool settings for the shared client
+SERPER_MAX_CONNECTIONS = int(os.getenv("SERPER_MAX_CONNECTIONS", "20"))
+SERPER_MAX_KEEPALIVE = int(os.getenv("SERPER_MAX_KEEPALIVE", "10"))
+SERPER_KEEPALIVE_EXPIRY = float(os.getenv("SERPER_KEEPALIVE_EXPIRY", "30"))
+SERPER_TIMEOUT = float(os.getenv("SERPER_TIMEOUT", "10"))
+SERPER_CONNECT_TIMEOUT = float(os.getenv("SERPER_CONNECT_TIMEOUT", "5"))
+SERPER_HTTP2 = os.getenv("SERPER_HTTP2", "false").lower() == "true"
+
+# Search result cache
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "512"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", "")
+# Seconds past their TTL that results are kept to answer for Serper while it is failing
+SEARCH_CACHE_STALE_TTL = float(os.getenv("SEARCH_CACHE_STALE_TTL", "86400"))
+
+# Shared client, installed by the FastAPI lifespan or the CLI
+_client: Optional[httpx.AsyncClient] = None
+
+search_cache: Optional[TTLCache] = (
+    TTLCache(
+        max_size=SEARCH_CACHE_SIZE,
+        ttl=SEARCH_CACHE_TTL,
+        path=SEARCH_CACHE_PATH or None,
+        namespace="serper",
+        stale_ttl=SEARCH_CACHE_STALE_TTL
+    )
+    if SEARCH_CACHE_ENABLED else None
+)
+
+# Identical searches already on the wire, so concurrent callers share one request
+_inflight: dict = {}
+
+# Rate limit (SERPER_RATE_LIMIT), retries and circuit breaker for every Serper request
+_upstream = get_upstream("serper", SEARCH_RETRY_ATTEMPTS)
+
+
+def create_search_client(
+    max_connections: int = SERPER_MAX_CONNECTIONS,
+    max_keepalive: int = SERPER_MAX_KEEPALIVE,
+    http2: bool = SERPER_HTTP2,
+    timeout: float = SERPER_TIMEOUT
+) -> httpx.AsyncClient:
+    """
+    Create a pooled, keep-alive HTTP client for Serper requests.
+
+    Args:
+        max_connections: Maximum number of concurrent connections
+        max_keepalive: Maximum number of idle connections kept open
+        http2: Enable HTTP/2 (requires the optional ``h2`` package)
+        timeout: Default read/write/pool timeout in seconds
+
+    Returns:
+        A configured httpx.AsyncClient
+    """
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("⚠️ SERPER_HTTP2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(
+        base_url=SERPER_BASE_URL,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=SERPER_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(timeout, connect=SERPER_CONNECT_TIMEOUT)
+    )
+
+
+def set_search_client(client: Optional[httpx.AsyncClient]) -> None:
+    """Install (or clear) the shared client used when none is passed explicitly."""
+    global _client
+    _client = client
+
+
+def get_search_client() -> Optional[httpx.AsyncClient]:
+    """Return the shared client, if one has been installed."""
+    return _client
+
+
+async def close_search_client() -> None:
+    """Close the shared client and release its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_search_cache_stats() -> dict:
+    """Return search cache counters (or ``{"enabled": False}``)."""
+    if search_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **search_cache.stats()}
+
+
+def _cache_key(query: str, search_type: str, num_results: int) -> str:
+    normalized = " ".join(query.lower().split())
+    return TTLCache.make_key(normalized, search_type, num_results)
 
 
 async def search_web(
     query: str,
     num_results: int = 10,
-    search_type: str = "search"
+    search_type: str = "search",
+    client: Optional[httpx.AsyncClient] = None,
+    timeout: Optional[float] = None
 ) -> dict:
     """
     Search the web using Serper API.
-    
+
+    Requests are rate limited and retried on 429s, 5xx and connection
+    errors. When Serper still fails (or its circuit is open), an expired
+    cached result is returned if one is within SEARCH_CACHE_STALE_TTL;
+    otherwise the error propagates so the caller can mark the source missing.
+
     Args:
         query: Search query string
         num_results: Number of results to return
         search_type: Type of search (search, news, images)
-    
+        client: HTTP client to use (defaults to the shared pooled client)
+        timeout: Per-request timeout override in seconds
+
     Returns:
         Search results as dictionary
     """
+    if search_cache is None:
+        return await _fetch(query, num_results, search_type, client, timeout)
+
+    key = _cache_key(query, search_type, num_results)
+    cached = search_cache.get(key)
+    if cached is not None:
+        count("search_cache_total", result="hit")
+        return cached
+
+    pending = _inflight.get(key)
+    count("search_cache_total", result="shared" if pending is not None else "miss")
+    if pending is None:
+        pending = asyncio.ensure_future(_fetch(query, num_results, search_type, client, timeout))
+        pending.add_done_callback(lambda task: _store_result(key, task))
+        _inflight[key] = pending
+    # Shielded so a caller's timeout doesn't cancel the request for other waiters
+    try:
+        return await asyncio.shield(pending)
+    except Exception as e:
+        stale = search_cache.get_stale(key)
+        if stale is None:
+            raise
+        count("search_cache_total", result="stale")
+        print(f"⚠️ Search for '{query}' failed ({e!r}), serving a cached result")
+        return stale
+
+
+def _store_result(key: str, task: asyncio.Future) -> None:
+    _inflight.pop(key, None)
+    if not task.cancelled() and task.exception() is None:
+        search_cache.set(key, task.result())
+
+
+async def _fetch(
+    query: str,
+    num_results: int,
+    search_type: str,
+    client: Optional[httpx.AsyncClient],
+    timeout: Optional[float]
+) -> dict:
+    """Issue one search request to Serper (rate limited, retried, behind the circuit breaker)."""
+    with span("search"):
+        return await _upstream.call(lambda: _request(query, num_results, search_type, client, timeout))
+
+
+async def _request(
+    query: str,
+    num_results: int,
+    search_type: str,
+    client: Optional[httpx.AsyncClient],
+    timeout: Optional[float]
+) -> dict:
+    if SERPER_MOCK:
+        return await mock_search(query, num_results, search_type)
     if not SERPER_API_KEY:
         raise ValueError("SERPER_API_KEY environment variable not set")
-    
-    url = f"https://google.serper.dev/{search_type}"
+
+    url = f"{SERPER_BASE_URL}/{search_type}"
     headers = {
         "X-API-KEY": SERPER_API_KEY,
         "Content-Type": "application/json"
@@ -34,26 +210,48 @@ async def search_web(
         "q": query,
         "num": num_results
     }
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
+    request_kwargs = {"json": payload, "headers": headers}
+    if timeout is not None:
+        request_kwargs["timeout"] = timeout
+
+    client = client or _client
+    if client is None:
+        # No pool installed (e.g. ad-hoc scripts): fall back to a one-off client
+        async with create_search_client() as one_off:
+            response = await one_off.post(url, **request_kwargs)
+    else:
+        response = await client.post(url, **request_kwargs)
+    response.raise_for_status()
+    data = response.json()
+    record_search(query, search_type, num_results, data)
+    return data
 
 
-async def search_reddit(query: str, num_results: int = 10) -> dict:
+async def search_reddit(
+    query: str,
+    num_results: int = 10,
+    client: Optional[httpx.AsyncClient] = None
+) -> dict:
     """Search Reddit specifically for problems and discussions."""
     reddit_query = f"site:reddit.com {query}"
-    return await search_web(reddit_query, num_results)
+    return await search_web(reddit_query, num_results, client=client)
 
 
-async def search_hackathon_winners(query: str, num_results: int = 10) -> dict:
+async def search_hackathon_winners(
+    query: str,
+    num_results: int = 10,
+    client: Optional[httpx.AsyncClient] = None
+) -> dict:
     """Search for hackathon winning projects."""
     winner_query = f"{query} hackathon winner project devpost"
-    return await search_web(winner_query, num_results)
+    return await search_web(winner_query, num_results, client=client)
 
 
-async def search_tech_blogs(query: str, num_results: int = 10) -> dict:
+async def search_tech_blogs(
+    query: str,
+    num_results: int = 10,
+    client: Optional[httpx.AsyncClient] = None
+) -> dict:
     """Search tech blogs and social media for ideas."""
     blog_query = f"{query} (site:medium.com OR site:dev.to OR site:hackernoon.com OR site:twitter.com)"
-    return await search_web(blog_query, num_results)
+    return await search_web(blog_query, num_results, client=client)
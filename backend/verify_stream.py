@@ -1,27 +1,92 @@
 import httpx
 import asyncio
+import argparse
 import json
 import time
 
-async def test_stream():
-    url = "http://localhost:8000/api/depth"
-    payload = {
-        "track": "FinTech",
-        "problem_statement": "Simplify taxes",
-        "threshold": 7,
-        "max_iterations": 2
-    }
-    
+DEFAULT_URL = "http://localhost:8000/api/depth"
+DEFAULT_PAYLOAD = {
+    "track": "FinTech",
+    "problem_statement": "Simplify taxes",
+    "threshold": 7,
+    "max_iterations": 2
+}
+
+
+async def read_stream(
+    client: httpx.AsyncClient,
+    url: str = DEFAULT_URL,
+    payload: dict = None,
+    headers: dict = None,
+    verbose: bool = False
+) -> dict:
+    """
+    Consume one SSE stream and collect timing statistics.
+
+    Returns:
+        Dict with time to first event, event/heartbeat counts, wire bytes,
+        (elapsed, stage) for every status update and total duration (seconds)
+    """
+    stats = {"ttfe": None, "events": 0, "token_events": 0, "heartbeats": 0, "stages": []}
+    start_time = time.perf_counter()
+
+    async with client.stream(
+        "POST", url, json=payload or DEFAULT_PAYLOAD, headers=headers, timeout=60.0
+    ) as response:
+        if verbose:
+            print(f"Response status: {response.status_code}")
+        event_type = None
+        async for line in response.aiter_lines():
+            if not line:
+                event_type = None
+            elif line.startswith(":"):
+                stats["heartbeats"] += 1
+            elif line.startswith("event:"):
+                event_type = line[6:].strip()
+            elif line.startswith("data:"):
+                elapsed = time.perf_counter() - start_time
+                if stats["ttfe"] is None:
+                    stats["ttfe"] = elapsed
+                stats["events"] += 1
+                if event_type == "token":
+                    stats["token_events"] += 1
+                else:
+                    stats["stages"].append((elapsed, json.loads(line[5:]).get("stage", "error")))
+                if verbose:
+                    print(f"[{elapsed:.2f}s] Received: {line[:100]}...")
+        stats["bytes"] = response.num_bytes_downloaded
+
+    stats["duration"] = time.perf_counter() - start_time
+    return stats
+
+
+async def test_stream(url: str = DEFAULT_URL, payload: dict = None, streams: int = 1):
     print(f"Connecting to {url}...")
-    start_time = time.time()
-    
+
     async with httpx.AsyncClient() as client:
-        async with client.stream("POST", url, json=payload, timeout=60.0) as response:
-            print(f"Response status: {response.status_code}")
-            async for chunk in response.aiter_lines():
-                if chunk:
-                    elapsed = time.time() - start_time
-                    print(f"[{elapsed:.2f}s] Received: {chunk[:100]}...")
+        if streams == 1:
+            stats = await read_stream(client, url, payload, verbose=True)
+            stats.pop("stages")
+            print(json.dumps(stats, indent=2))
+            return
+
+        start_time = time.perf_counter()
+        results = await asyncio.gather(
+            *(read_stream(client, url, payload) for _ in range(streams))
+        )
+        wall = time.perf_counter() - start_time
+        events = sum(r["events"] for r in results)
+        print(f"{streams} streams, {events} events in {wall:.2f}s ({events / wall:.1f} events/s)")
+
 
 if __name__ == "__main__":
-    asyncio.run(test_stream())
+    parser = argparse.ArgumentParser(description="Open SSE stream(s) and print timings")
+    parser.add_argument("--url", default=DEFAULT_URL, help="SSE endpoint")
+    parser.add_argument("--streams", "-n", type=int, default=1, help="Concurrent streams")
+    parser.add_argument("--payload", help="JSON request body")
+    args = parser.parse_args()
+    asyncio.run(test_stream(
+        args.url,
+        json.loads(args.payload) if args.payload else None,
+        args.streams
+    ))
@@ -1,6 +1,6 @@
 "use client"
 
-import { useState, useCallback } from "react"
+import { useState, useCallback, useRef } from "react"
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs"
 import { Button } from "@/components/ui/button"
 import { Card, CardContent, CardHeader, CardTitle, CardDescription } from "@/components/ui/card"
@@ -12,6 +12,7 @@ import { Flame, Search, Layers, Loader2, StopCircle, Sparkles } from "lucide-rea
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
 
 interface ForgeUpdate {
+  session_id?: string
   iteration: number
   stage: string
   message: string
@@ -31,6 +32,7 @@ export function ForgeInterface() {
   const [statusMessage, setStatusMessage] = useState("")
   const [finalIdea, setFinalIdea] = useState<any>(null)
   const [finalEvaluation, setFinalEvaluation] = useState<any>(null)
+  const sessionIdRef = useRef<string | null>(null)
 
   const runIndependent = useCallback(async () => {
     if (!track) return
@@ -66,6 +68,7 @@ export function ForgeInterface() {
     setStatusMessage("Initializing Forge...")
     setFinalIdea(null)
     setFinalEvaluation(null)
+    sessionIdRef.current = null
 
     try {
       const response = await fetch(`${API_URL}/api/depth`, {
@@ -80,6 +83,7 @@ export function ForgeInterface() {
       })
 
       if (!response.ok) throw new Error("Failed to start depth mode")
+      sessionIdRef.current = response.headers.get("X-Session-Id")
 
       const reader = response.body?.getReader()
       const decoder = new TextDecoder()
@@ -113,7 +117,7 @@ export function ForgeInterface() {
                   setStatusMessage(data.message)
                 }
 
-                if (data.stage === "complete" || data.stage === "max_iterations") {
+                if (data.stage === "complete" || data.stage === "max_iterations" || data.stage === "budget_exceeded" || data.stage === "early_stopped") {
                   setFinalIdea(data.idea)
                   setFinalEvaluation(data.evaluation)
                 }
@@ -134,7 +138,9 @@ export function ForgeInterface() {
 
   const stopDepth = useCallback(async () => {
     try {
-      await fetch(`${API_URL}/api/depth/stop`, { method: "POST" })
+      const sessionId = sessionIdRef.current
+      if (!sessionId) return
+      await fetch(`${API_URL}/api/depth/${sessionId}/stop`, { method: "POST" })
     } catch (error) {
       console.error("Error stopping:", error)
     }
@@ -32,12 +32,27 @@ export interface Evaluation {
   reasoning: string
 }
 
+export interface TokenUsage {
+  input_tokens: number
+  output_tokens: number
+  total_tokens: number
+  cost_usd: number | null
+  calls: number
+  estimated: boolean
+}
+
 export interface ForgeUpdate {
+  session_id?: string
   iteration: number
-  stage: "researching" | "evaluating" | "complete" | "rejected" | "interrupted" | "max_iterations"
+  stage: "queued" | "researching" | "generating" | "evaluating" | "complete" | "rejected" | "duplicate" | "interrupted" | "max_iterations" | "budget_exceeded" | "early_stopped" | "token"
   message: string
   idea?: Idea
   evaluation?: Evaluation
+  missing_sources?: string[]
+  agent?: string
+  delta?: string
+  timings?: Record<string, number>
+  usage?: TokenUsage & { iteration: TokenUsage }
   error?: string
 }
 
@@ -51,6 +66,13 @@ export interface DepthRequest {
   problem_statement: string
   threshold: number
   max_iterations: number
+  beam_width?: number
+  beam_keep?: number
+  beam_concurrency?: number
+  stream_tokens?: boolean
+  token_budget?: number
+  early_stop?: "off" | "adaptive"
+  early_stop_cutoff?: number
 }
 
 export interface IdeaResponse {
@@ -58,6 +80,8 @@ export interface IdeaResponse {
   idea: Idea
   mode: string
   evaluation?: Evaluation
+  missing_sources?: string[]
+  session_id?: string
 }
 
 export interface ForgeStatus {
@@ -124,8 +148,8 @@ export async function* runDepth(request: DepthRequest): AsyncGenerator<ForgeUpda
   }
 }
 
-export async function stopDepth(): Promise<void> {
-  await fetch(`${API_URL}/api/depth/stop`, { method: "POST" })
+export async function stopDepth(sessionId: string): Promise<void> {
+  await fetch(`${API_URL}/api/depth/${sessionId}/stop`, { method: "POST" })
 }
 
 export async function getStatus(): Promise<ForgeStatus> {